@@ -0,0 +1,119 @@
+#!/usr/bin/python
+
+from timeit import default_timer
+
+from game import Game
+from game_io import ScriptIO
+from turn_pipeline import EXECUTE_STAGE
+
+class BatchRunner(object):
+    """
+    Plays a recorded command script without a terminal and measures
+    how long each command takes.
+    """
+    def __init__(self, lines, keepOutput = False):
+        """
+        Initializes new batch runner.
+
+        @param lines:        Lines of input, one per line. Includes the
+                             answers to any follow-up prompts (e.g. the
+                             item name after 'equip').
+        @keyword keepOutput: (Optional) Keep the game's output so it can be
+                             retrieved with getOutput(). Discarded by default.
+        """
+        self._io = ScriptIO(lines, keepOutput)
+        self._game = Game(io=self._io)
+        self._game.getPipeline().enableTiming()
+
+        self._turns = 0
+        self._totalTime = 0.0
+        self._commandTimes = {}
+
+    def run(self):
+        """
+        Executes turns until the script runs out or the game quits.
+        """
+        start = default_timer()
+        while True:
+            turnStart = default_timer()
+            try:
+                command = self._game._nextTurn()
+            except (EOFError, SystemExit):
+                break
+            elapsed = default_timer() - turnStart
+
+            self._turns += 1
+            name = command.getName()
+            count, total = self._commandTimes.get(name, (0, 0.0))
+            self._commandTimes[name] = (count + 1, total + elapsed)
+
+        self._totalTime = default_timer() - start
+
+    def getPipeline(self):
+        """
+        Returns the game's turn pipeline, for registering stages
+        before run() is called.
+        """
+        return self._game.getPipeline()
+
+    def getOutput(self):
+        """
+        Returns the game's output (if kept).
+
+        @return:    Output, as a single string.
+        """
+        return self._io.getOutput()
+
+    def getTurns(self):
+        """
+        Returns number of commands executed.
+        """
+        return self._turns
+
+    def getTotalTime(self):
+        """
+        Returns total time spent running the script, in seconds.
+        """
+        return self._totalTime
+
+    def getCommandTimes(self):
+        """
+        Returns the time spent per command.
+
+        @return:    Dictionary mapping command names to
+                    (count, total seconds) tuples.
+        """
+        return self._commandTimes
+
+    def getReport(self):
+        """
+        Returns a throughput report.
+
+        @return:    Report, as a single string.
+        """
+        totalTime = self._totalTime
+        if totalTime > 0:
+            rate = self._turns / totalTime
+        else:
+            rate = 0.0
+
+        lines = []
+        lines.append("Commands executed:     %s" % self._turns)
+        lines.append("Total time:            %.3f s" % totalTime)
+        lines.append("Commands per second:   %.0f" % rate)
+        lines.append("")
+        lines.append("%-20s%10s%14s%14s" % ("Command", "Count", "Total (ms)", "Mean (us)"))
+        for name in sorted(self._commandTimes):
+            count, total = self._commandTimes[name]
+            lines.append("%-20s%10s%14.2f%14.1f" % (name, count, total * 1000, total * 1000000 / count))
+
+        #Time per turn pipeline stage
+        stageTimes = self._game.getPipeline().getTimings()
+        lines.append("")
+        lines.append("%-20s%10s%14s%14s" % ("Stage", "Count", "Total (ms)", "Mean (us)"))
+        for name in self._game.getPipeline().getStageNames() + [EXECUTE_STAGE]:
+            if name in stageTimes:
+                count, total = stageTimes[name]
+                lines.append("%-20s%10s%14.2f%14.1f" % (name, count, total * 1000, total * 1000000 / count))
+
+        return "\n".join(lines)
@@ -0,0 +1,141 @@
+#!/usr/bin/python
+
+"""
+Benchmark for compressed descriptions.
+
+Builds a world with a long, unique description per space and city,
+then compresses it (see compressed_world.py). Reports the memory held
+by descriptions before and after, and the time getDescription() takes
+plain, compressed with every read missing the cache (a walk over the
+whole world) and compressed with every read hitting it (players
+around a few spaces). Also reports the description text still held
+after describing every space (descriptions, decompressed descriptions
+and rendered describe output), with the describe command's bounded
+render cache and with an unbounded one.
+
+Usage (from the repository root):
+    python -m benchmarks.compression_benchmark --spaces 100000
+"""
+
+import argparse
+import random
+import sys
+import time
+
+import game_loader
+import compressed_world
+from compressed_world import compressWorld
+from commands import describe_command
+from commands.describe_command import DescribeCommand
+from util.render_cache import RenderCache
+
+_WORDS = ("the old road winds through quiet hills where hobbits farm and travelers rest "
+          "under great trees beside a river that runs cold from the misty mountains").split()
+
+def _getDescription(rand, words):
+    """
+    Returns a description made of a few sentences of random words.
+    """
+    sentences = []
+    while sum(len(sentence) for sentence in sentences) < words * 6:
+        sentence = " ".join(rand.choice(_WORDS) for i in range(rand.randint(8, 16)))
+        sentences.append(sentence.capitalize() + ".")
+    return " ".join(sentences)
+
+def _getData(numSpaces):
+    """
+    Returns world data for a row of spaces; every tenth has a city.
+    """
+    rand = random.Random(0)
+    data = {"start": "space0", "spaces": [], "cities": {}, "buildings": {}, "exits": []}
+    for i in range(numSpaces):
+        space = {"id": "space%s" % i, "name": "Space %s" % i, "description": _getDescription(rand, 80)}
+        if i % 10 == 0:
+            space["city"] = "city%s" % i
+            data["cities"]["city%s" % i] = {"name": "City %s" % i, "description": _getDescription(rand, 80),
+                    "greeting": "Welcome to City %s" % i}
+        data["spaces"].append(space)
+        if i:
+            data["exits"].append(["space%s" % (i - 1), "east", "space%s" % i])
+    return data
+
+def _descriptionSize(places):
+    """
+    Returns memory held by the places' descriptions (in bytes).
+    """
+    texts = dict((id(place._description), place._description) for place in places)
+    return sum(sys.getsizeof(text) for text in texts.itervalues())
+
+def _timeReads(places, reads):
+    """
+    Returns mean time (in seconds) per getDescription(), reading
+    places in turn until reads descriptions were read.
+    """
+    count = len(places)
+    start = time.time()
+    for i in xrange(reads):
+        places[i % count].getDescription()
+    return (time.time() - start) / reads
+
+def _describeWalk(spaces, renderCache):
+    """
+    Describes every space in turn, as DescribeCommand does, and returns
+    memory held by description text afterwards (in bytes): descriptions,
+    decompressed descriptions and rendered output.
+    """
+    command = DescribeCommand("describe", "Describes the current space.", None)
+    describe_command._renderCache = renderCache
+    for space in spaces:
+        renderCache.render(space, space.getVersion(), lambda: command._render(space))
+
+    rendered = [entry[1] for entry in renderCache._entries.itervalues()]
+    decompressed = compressed_world._cache.values()
+    return _descriptionSize(spaces) + sum(sys.getsizeof(text) for text in rendered + decompressed)
+
+def run(numSpaces, reads):
+    """
+    Runs the benchmark and prints a report.
+
+    @param numSpaces:   Number of spaces in the world.
+    @param reads:       Number of descriptions to read per timing.
+    """
+    world = game_loader.buildWorld(_getData(numSpaces))
+    places = world.getSpaces()
+    places.extend(world.getCity(cityId) for cityId in world.getCityIds())
+    #Fewer places than the cache holds
+    nearby = places[:16]
+
+    spaces = world.getSpaces()
+    renderCache = describe_command._renderCache
+
+    plainSize = _descriptionSize(places)
+    plainMiss = _timeReads(places, reads)
+    plainHit = _timeReads(nearby, reads)
+    plainWalk = _describeWalk(spaces, RenderCache(renderCache._maxSize))
+
+    compressWorld(world)
+    compressedSize = _descriptionSize(places)
+    compressedMiss = _timeReads(places, reads)
+    compressedHit = _timeReads(nearby, reads)
+    compressedWalk = _describeWalk(spaces, RenderCache(renderCache._maxSize))
+    unboundedWalk = _describeWalk(spaces, RenderCache())
+    describe_command._renderCache = renderCache
+
+    print "World:                              %s spaces, %s places with descriptions" % (numSpaces, len(places))
+    print "Descriptions (plain):               %s kB" % (plainSize // 1024)
+    print "Descriptions (zlib):                %s kB" % (compressedSize // 1024)
+    print "Read (plain):                       %.2f us" % (plainMiss * 1000000)
+    print "Read (zlib, cache miss):            %.2f us" % (compressedMiss * 1000000)
+    print "Read (plain, nearby):               %.2f us" % (plainHit * 1000000)
+    print "Read (zlib, cache hit):             %.2f us" % (compressedHit * 1000000)
+    print "Describe walk (plain):              %s kB" % (plainWalk // 1024)
+    print "Describe walk (zlib):               %s kB" % (compressedWalk // 1024)
+    print "Describe walk (zlib, unbounded):    %s kB" % (unboundedWalk // 1024)
+
+if __name__ == '__main__':
+    argParser = argparse.ArgumentParser(description="Compressed description benchmark.")
+    argParser.add_argument("--spaces", type=int, default=100000)
+    argParser.add_argument("--reads", type=int, default=200000)
+    args = argParser.parse_args()
+
+    run(args.spaces, args.reads)
@@ -0,0 +1,143 @@
+#!/usr/bin/python
+
+"""
+Memory benchmark for forked worker processes.
+
+Builds a world with a unique description per space, then forks
+workers that each read every description, greeting, talk table and
+exit, as players would over time, and then play turns that make
+garbage and keep some objects, which lets the garbage collector run.
+Reports the memory each worker had to copy (private dirty memory), with
+the world's read-only data as ordinary objects, moved into shared memory
+by shared_world, and shared with workers that also run
+shared_world.prepareWorker().
+
+Usage (from the repository root):
+    python -m benchmarks.fork_benchmark --spaces 100000 --workers 4 --turns 100000
+"""
+
+import argparse
+import gc
+import os
+
+import game_loader
+import shared_world
+
+def _getData(numSpaces):
+    """
+    Returns world data for a row of spaces; every tenth has a city.
+    """
+    data = {"start": "space0", "spaces": [], "cities": {}, "buildings": {}, "exits": []}
+    for i in range(numSpaces):
+        space = {"id": "space%s" % i, "name": "Space %s" % i,
+                 "description": "Space %s lies in wide, quiet country. " % i * 8}
+        if i % 10 == 0:
+            space["city"] = "city%s" % i
+            data["cities"]["city%s" % i] = {"name": "City %s" % i, "description": "City %s is old. " % i * 8,
+                    "greeting": "Welcome to City %s" % i, "buildings": ["square%s" % i]}
+            data["buildings"]["square%s" % i] = {"type": "square", "name": "Square %s" % i,
+                    "description": "The square of City %s." % i, "greeting": "Hello from Square %s" % i,
+                    "talk": dict(("Person %s" % person, "Person %s of City %s has much to say." % (person, i))
+                                 for person in range(5))}
+        data["spaces"].append(space)
+        if i:
+            data["exits"].append(["space%s" % (i - 1), "east", "space%s" % i])
+    return data
+
+def _privateDirty():
+    """
+    Returns this process's private dirty memory (in kB).
+    """
+    total = 0
+    with open("/proc/self/smaps") as smaps:
+        for line in smaps:
+            if line.startswith("Private_Dirty:"):
+                total += int(line.split()[1])
+    return total
+
+def _work(world, turns):
+    """
+    Reads everything a player could see in world, then plays turns.
+    Each turn leaves garbage with a reference cycle and keeps a record,
+    as sessions, players and latency samples are kept by a server.
+    """
+    for space in world.getSpaces():
+        space.getDescription()
+        space.getExit("east")
+    for buildingId in world.getBuildingIds():
+        building = world.getBuilding(buildingId)
+        building.greetings()
+        building.getTalk()
+
+    history = []
+    for turn in range(turns):
+        garbage = {"turn": turn}
+        garbage["self"] = garbage
+        history.append([turn])
+
+def _measure(numSpaces, workers, turns, share, prepare):
+    """
+    Returns mean private dirty memory (in kB) of workers.
+    Runs in a child process, so each measurement starts afresh.
+    """
+    readFd, writeFd = os.pipe()
+    if os.fork() == 0:
+        os.close(readFd)
+        world = game_loader.buildWorld(_getData(numSpaces))
+        if share:
+            shared_world.shareWorld(world)
+        gc.collect()
+
+        pids = []
+        for i in range(workers):
+            pid = os.fork()
+            if pid == 0:
+                if prepare:
+                    shared_world.prepareWorker()
+                before = _privateDirty()
+                _work(world, turns)
+                os.write(writeFd, "%s\n" % (_privateDirty() - before))
+                os._exit(0)
+            pids.append(pid)
+        for pid in pids:
+            os.waitpid(pid, 0)
+        os._exit(0)
+
+    os.close(writeFd)
+    output = ""
+    while True:
+        chunk = os.read(readFd, 4096)
+        if not chunk:
+            break
+        output += chunk
+    os.close(readFd)
+    os.wait()
+
+    sizes = [int(line) for line in output.split()]
+    return sum(sizes) / float(len(sizes))
+
+def run(numSpaces, workers, turns):
+    """
+    Runs the benchmark and prints a report.
+
+    @param numSpaces:   Number of spaces in the world.
+    @param workers:     Number of worker processes.
+    @param turns:       Number of turns each worker plays.
+    """
+    plain = _measure(numSpaces, workers, turns, False, False)
+    shared = _measure(numSpaces, workers, turns, True, False)
+    prepared = _measure(numSpaces, workers, turns, True, True)
+
+    print "World:                  %s spaces, %s workers, %s turns" % (numSpaces, workers, turns)
+    print "Copied per worker:      %.0f kB (objects)" % plain
+    print "Copied per worker:      %.0f kB (shared data)" % shared
+    print "Copied per worker:      %.0f kB (shared data, worker GC)" % prepared
+
+if __name__ == '__main__':
+    argParser = argparse.ArgumentParser(description="Forked worker memory benchmark.")
+    argParser.add_argument("--spaces", type=int, default=100000)
+    argParser.add_argument("--workers", type=int, default=4)
+    argParser.add_argument("--turns", type=int, default=100000)
+    args = argParser.parse_args()
+
+    run(args.spaces, args.workers, args.turns)
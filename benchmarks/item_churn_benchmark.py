@@ -0,0 +1,89 @@
+#!/usr/bin/python
+
+"""
+Benchmark for adding and removing items.
+
+Fills an ItemSet with shop-generated items, each renamed so that no two
+are identical (identical items would share a stack, and shop_factory
+hands out one object for them), then repeatedly removes a random item
+and adds a new one, as players picking up, dropping,
+buying and selling do. The same churn on a plain list (what ItemSet
+used to store items in) is timed for comparison.
+
+Usage (from the repository root):
+    python -m benchmarks.item_churn_benchmark --sizes 10000 100000
+"""
+
+import argparse
+import copy
+import random
+import time
+
+from factories import shop_factory
+from items.item_set import ItemSet
+
+def _getItems(count, rand, first):
+    """
+    Returns count shop-generated items, numbered from first so that
+    every item is distinct.
+    """
+    items = []
+    for number, template in enumerate(shop_factory.getItems(count, 10, rand), first):
+        item = copy.copy(template)
+        item._name = "%s #%s" % (template.getName(), number)
+        items.append(item)
+    return items
+
+def _churnItemSet(items, newItems, rand):
+    """
+    Returns mean time (in seconds) per remove and add on an ItemSet.
+    """
+    itemSet = ItemSet(list(items))
+    present = list(items)
+    start = time.time()
+    for item in newItems:
+        position = rand.randrange(len(present))
+        itemSet.removeItem(present[position])
+        itemSet.addItem(item)
+        present[position] = item
+    return (time.time() - start) / len(newItems)
+
+def _churnList(items, newItems, rand):
+    """
+    Returns mean time (in seconds) per remove and add on a list.
+    """
+    itemList = list(items)
+    present = list(items)
+    start = time.time()
+    for item in newItems:
+        position = rand.randrange(len(present))
+        itemList.remove(present[position])
+        itemList.append(item)
+        present[position] = item
+    return (time.time() - start) / len(newItems)
+
+def run(sizes, operations):
+    """
+    Runs the benchmark and prints a report.
+
+    @param sizes:       Numbers of items to churn.
+    @param operations:  Number of removes and adds per timing.
+    """
+    rand = random.Random(0)
+    newItems = _getItems(operations, rand, 0)
+    for size in sizes:
+        items = _getItems(size, rand, operations)
+        itemSet = _churnItemSet(items, newItems, random.Random(size))
+        itemList = _churnList(items, newItems, random.Random(size))
+
+        print "Items:                  %s, %s removes and adds" % (size, operations)
+        print "Churn (ItemSet):        %.2f us" % (itemSet * 1000000)
+        print "Churn (list):           %.2f us" % (itemList * 1000000)
+
+if __name__ == '__main__':
+    argParser = argparse.ArgumentParser(description="Item churn benchmark.")
+    argParser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    argParser.add_argument("--operations", type=int, default=20000)
+    args = argParser.parse_args()
+
+    run(args.sizes, args.operations)
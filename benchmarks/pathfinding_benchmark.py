@@ -0,0 +1,81 @@
+#!/usr/bin/python
+
+"""
+Pathfinding benchmark.
+
+Times routes between every pair of spaces in the stock world, with
+and without the next-hop table, then routes between random spaces
+of a generated grid, by breadth-first search and by A*.
+
+Usage (from the repository root):
+    python -m benchmarks.pathfinding_benchmark --side 300 --queries 200
+"""
+
+import argparse
+import random
+import time
+
+import game_loader
+from factories import world_factory
+from pathfinder import Pathfinder
+
+def _timeQueries(pathfinder, pairs, heuristicFor = None):
+    """
+    Returns mean time (in seconds) per route.
+    """
+    start = time.time()
+    for fromSpace, toSpace in pairs:
+        heuristic = None
+        if heuristicFor is not None:
+            heuristic = heuristicFor(toSpace)
+        pathfinder.findPath(fromSpace, toSpace, heuristic)
+    return (time.time() - start) / len(pairs)
+
+def run(side, queries):
+    """
+    Runs the benchmark and prints a report.
+
+    @param side:        Width and height of the generated grid.
+    @param queries:     Number of random routes to time on the grid.
+    """
+    world = game_loader.getWorld()
+    spaces = world.getSpaces()
+    pairs = [(fromSpace, toSpace) for fromSpace in spaces for toSpace in spaces]
+
+    tablePathfinder = Pathfinder(world.getGraph())
+    start = time.time()
+    tablePathfinder.findPath(spaces[0], spaces[0])
+    tableTime = time.time() - start
+    table = _timeQueries(tablePathfinder, pairs)
+    search = _timeQueries(Pathfinder(world.getGraph(), nextHopLimit = 0), pairs)
+
+    print "Stock world:            %s spaces, %s routes" % (len(spaces), len(pairs))
+    print "Next-hop table build:   %.2f ms" % (tableTime * 1000)
+    print "Route (next-hop table): %.1f us" % (table * 1000000)
+    print "Route (search):         %.1f us" % (search * 1000000)
+
+    #Grid spaces are numbered row by row, so distance is easy to bound
+    grid = world_factory.getGridWorld(side, side)
+    gridSpaces = grid.getSpaces()
+    rand = random.Random(0)
+    pairs = [(rand.choice(gridSpaces), rand.choice(gridSpaces)) for i in range(queries)]
+
+    def manhattan(goal):
+        goalY, goalX = divmod(goal.getIndex(), side)
+        return lambda index: abs(index // side - goalY) + abs(index % side - goalX)
+
+    pathfinder = Pathfinder(grid.getGraph(), nextHopLimit = 0)
+    breadthFirst = _timeQueries(pathfinder, pairs)
+    aStar = _timeQueries(pathfinder, pairs, manhattan)
+
+    print "Grid world:             %s spaces, %s routes" % (side * side, queries)
+    print "Route (breadth first):  %.2f ms" % (breadthFirst * 1000)
+    print "Route (A*):             %.2f ms" % (aStar * 1000)
+
+if __name__ == '__main__':
+    argParser = argparse.ArgumentParser(description="Pathfinding benchmark.")
+    argParser.add_argument("--side", type=int, default=300, help="Width and height of grid world.")
+    argParser.add_argument("--queries", type=int, default=200, help="Number of routes on grid world.")
+    args = argParser.parse_args()
+
+    run(args.side, args.queries)
@@ -0,0 +1,156 @@
+#!/usr/bin/python
+
+"""
+Concurrency benchmark for the game server.
+
+Starts a server process and drives many simulated sessions against it
+over loopback. Each session plays a fixed number of turns, waiting for
+the command prompt before sending its next command.
+
+Usage (from the repository root):
+    python -m benchmarks.server_benchmark --sessions 2000 --turns 10
+"""
+
+import argparse
+import asyncore
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import constants
+
+#Commands that do not need follow-up input and leave the world unchanged
+SCRIPT = ["describe", "money", "inventory", "east", "west", "help"]
+
+class SimulatedSession(asyncore.dispatcher):
+    """
+    A single simulated player.
+    """
+    def __init__(self, address, turns, results, map):
+        """
+        Initializes new simulated session and starts connecting.
+
+        @param address:     (host, port) of the server.
+        @param turns:       Number of commands to send before quitting.
+        @param results:     List receiving each turn's latency.
+        @param map:         The client event loop's socket map.
+        """
+        asyncore.dispatcher.__init__(self, map=map)
+        self._turns = turns
+        self._results = results
+        self._sent = 0
+        self._received = ""
+        self._outgoing = ""
+        self._sentAt = None
+
+        self.create_socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.connect(address)
+
+    def handle_connect(self):
+        pass
+
+    def writable(self):
+        return bool(self._outgoing)
+
+    def handle_write(self):
+        sent = self.send(self._outgoing)
+        self._outgoing = self._outgoing[sent:]
+
+    def handle_read(self):
+        data = self.recv(65536)
+        if not data:
+            return
+        self._received = (self._received + data)[-len(constants.COMMAND_PROMPT):]
+
+        #Server is waiting for the next command
+        if self._received == constants.COMMAND_PROMPT:
+            self._received = ""
+            if self._sentAt is not None:
+                self._results.append(time.time() - self._sentAt)
+            self._nextCommand()
+
+    def _nextCommand(self):
+        if self._sent == self._turns:
+            self._outgoing += "quit\nyes\n"
+            self._sentAt = None
+            return
+        command = SCRIPT[self._sent % len(SCRIPT)]
+        self._outgoing += command + "\n"
+        self._sent += 1
+        self._sentAt = time.time()
+
+    def handle_close(self):
+        self.close()
+
+def _residentMemory(pid):
+    """
+    Returns the resident memory (in kB) of a process, or None if unknown.
+    """
+    try:
+        with open("/proc/%s/status" % pid) as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except IOError:
+        pass
+    return None
+
+def _percentile(values, fraction):
+    index = min(int(len(values) * fraction), len(values) - 1)
+    return values[index]
+
+def run(sessions, turns):
+    """
+    Runs the benchmark and prints a report.
+
+    @param sessions:    Number of concurrent sessions.
+    @param turns:       Number of commands per session.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    serverProcess = subprocess.Popen([sys.executable, "server.py", "--port", "0"],
+                                     cwd=root, stdout=subprocess.PIPE)
+    try:
+        banner = serverProcess.stdout.readline()
+        port = int(banner.strip().rsplit(":", 1)[1])
+        idleMemory = _residentMemory(serverProcess.pid)
+
+        map = {}
+        results = []
+        start = time.time()
+        for i in range(sessions):
+            SimulatedSession(("localhost", port), turns, results, map)
+
+        #Sample the server's memory while sessions are running
+        peakMemory = idleMemory
+        while map:
+            asyncore.loop(timeout=.1, use_poll=True, map=map, count=100)
+            peakMemory = max(peakMemory, _residentMemory(serverProcess.pid))
+        elapsed = time.time() - start
+    finally:
+        serverProcess.kill()
+        serverProcess.wait()
+
+    results.sort()
+    print "Sessions:               %s" % sessions
+    print "Commands per session:   %s" % turns
+    print "Commands completed:     %s" % len(results)
+    print "Total time:             %.2f s" % elapsed
+    print "Commands per second:    %.0f" % (len(results) / elapsed)
+    if results:
+        print "Latency p50:            %.2f ms" % (_percentile(results, .50) * 1000)
+        print "Latency p99:            %.2f ms" % (_percentile(results, .99) * 1000)
+        print "Latency max:            %.2f ms" % (results[-1] * 1000)
+    if idleMemory and peakMemory:
+        print "Server memory (idle):   %s kB" % idleMemory
+        print "Server memory (loaded): %s kB" % peakMemory
+        print "Memory per session:     %.1f kB" % ((peakMemory - idleMemory) / float(sessions))
+
+if __name__ == '__main__':
+    argParser = argparse.ArgumentParser(description="Game server concurrency benchmark.")
+    argParser.add_argument("--sessions", type=int, default=2000)
+    argParser.add_argument("--turns", type=int, default=10)
+    args = argParser.parse_args()
+
+    run(args.sessions, args.turns)
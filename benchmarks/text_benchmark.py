@@ -0,0 +1,194 @@
+#!/usr/bin/python
+
+"""
+Memory benchmark for world and item text.
+
+Generates world data the way data/world.json is written: indented
+triple-quoted space descriptions, and chains of shops with the same
+name and near-identical descriptions in many cities. Builds the world
+from JSON with and without text interning and stocks every shop.
+Reports the memory held by distinct text strings, and the resident
+memory taken by loading the world's snapshot in a fresh process.
+Item names are shared either way; they are reported as one string
+per item, as they were before, and as shared strings.
+
+Usage (from the repository root):
+    python -m benchmarks.text_benchmark --spaces 100000
+"""
+
+import argparse
+import cPickle
+import gc
+import json
+import os
+import sys
+import tempfile
+
+import game_loader
+
+#Space descriptions, as written in the data file
+_DESCRIPTIONS = [
+    """
+    The %s is wide and quiet. Farms and hedges line the road,
+    and smoke rises from the chimneys of hobbit holes.
+    """,
+    """
+    Trees crowd the road through the %s. Travelers
+    speak of paths that move when nobody is looking.
+    """,
+    """
+    Grey hills roll away on every side of the %s.
+    """,
+    ]
+
+def _getData(numSpaces):
+    """
+    Returns world data for a row of spaces; every tenth has a city
+    with an inn and an ElvenWares shop.
+    """
+    data = {"start": "space0", "spaces": [], "cities": {}, "buildings": {}, "exits": []}
+    for i in range(numSpaces):
+        #A few regions share descriptions; indentation varies between authors
+        description = _DESCRIPTIONS[i % len(_DESCRIPTIONS)] % ("Region %s" % (i % 50))
+        if i % 2:
+            description = description.replace("\n    ", "\n        ")
+        space = {"id": "space%s" % i, "name": "Space %s" % i, "description": description}
+        if i % 10 == 0:
+            space["city"] = "city%s" % i
+            data["cities"]["city%s" % i] = {"name": "City %s" % i, "description": "An old city. ",
+                    "greeting": "Welcome, traveler!", "buildings": ["inn%s" % i, "shop%s" % i]}
+            data["buildings"]["inn%s" % i] = {"type": "inn", "name": "The Prancing Pony",
+                    "description": "A quiet inn.", "greeting": "Hi, I'm the innkeeper.", "cost": 5}
+            data["buildings"]["shop%s" % i] = {"type": "shop", "name": "ElvenWares",
+                    "description": " ElvenWares! Lots of great elven gear! ",
+                    "greeting": "Welcome to ElvenWares!", "numItems": 10, "quality": i % 20 + 1}
+        data["spaces"].append(space)
+        if i:
+            data["exits"].append(["space%s" % (i - 1), "east", "space%s" % i])
+    return data
+
+def _residentMemory():
+    """
+    Returns this process's resident memory (in kB).
+    """
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+def _textSize(world):
+    """
+    Returns number and size (in bytes) of distinct string objects
+    holding world text, and size of item names as one string per item
+    (as they were before interning) and as distinct strings.
+    """
+    texts = {}
+    def add(text):
+        texts[id(text)] = text
+    for space in world.getSpaces():
+        add(space.getName())
+        add(space.getDescription())
+    names = []
+    for city in (world.getCity(cityId) for cityId in world.getCityIds()):
+        add(city.getName())
+        add(city.getDescription())
+        add(city.greetings())
+    for building in (world.getBuilding(buildingId) for buildingId in world.getBuildingIds()):
+        add(building.getName())
+        add(building.getDescription())
+        add(building.greetings())
+        if hasattr(building, "getItems"):
+            items = building.getItems()
+            for item in items:
+                names.extend([item.getName()] * items.getCount(item))
+
+    distinctNames = dict((id(name), name) for name in names)
+    return [len(texts), sum(sys.getsizeof(text) for text in texts.itervalues()),
+            sum(sys.getsizeof(name) for name in names),
+            sum(sys.getsizeof(name) for name in distinctNames.itervalues())]
+
+def _inChild(function, *args):
+    """
+    Calls function in a child process, so each measurement starts
+    afresh, and returns the list of integers it returns.
+    """
+    readFd, writeFd = os.pipe()
+    if os.fork() == 0:
+        os.close(readFd)
+        os.write(writeFd, " ".join(str(value) for value in function(*args)))
+        os._exit(0)
+
+    os.close(writeFd)
+    output = ""
+    while True:
+        chunk = os.read(readFd, 4096)
+        if not chunk:
+            break
+        output += chunk
+    os.close(readFd)
+    os.wait()
+
+    return [int(value) for value in output.split()]
+
+def _build(contents, internText, snapshotFilename):
+    """
+    Loads world data from JSON, builds the world, stocks every shop and
+    saves the world as a snapshot, the way game_loader.getWorld() does.
+    Returns the values returned by _textSize().
+    """
+    world = game_loader.buildWorld(game_loader._toStr(json.loads(contents)), internText = internText)
+    sizes = _textSize(world)
+    with open(snapshotFilename, "wb") as snapshot:
+        cPickle.dump(world, snapshot, cPickle.HIGHEST_PROTOCOL)
+    return sizes
+
+def _load(snapshotFilename):
+    """
+    Returns the memory (in kB) taken by loading a snapshot.
+    """
+    with open(snapshotFilename, "rb") as snapshot:
+        contents = snapshot.read()
+    gc.collect()
+    before = _residentMemory()
+    world = cPickle.loads(contents)
+    gc.collect()
+    return [_residentMemory() - before]
+
+def _measure(contents, internText):
+    """
+    Returns the memory taken by the built, fully stocked world (in kB),
+    followed by the values returned by _textSize().
+    """
+    fd, snapshotFilename = tempfile.mkstemp(suffix=".snapshot")
+    os.close(fd)
+    try:
+        sizes = _inChild(_build, contents, internText, snapshotFilename)
+        return _inChild(_load, snapshotFilename) + sizes
+    finally:
+        os.remove(snapshotFilename)
+
+def run(numSpaces):
+    """
+    Runs the benchmark and prints a report.
+
+    @param numSpaces:   Number of spaces in the world.
+    """
+    contents = json.dumps(_getData(numSpaces))
+    plainMemory, plainCount, plainSize = _measure(contents, False)[:3]
+    memory, count, size, itemNames, distinctItemNames = _measure(contents, True)
+
+    print "World:                  %s spaces, %s shops" % (numSpaces, numSpaces // 10)
+    print "World text (before):    %s strings, %s kB" % (plainCount, plainSize // 1024)
+    print "World text (after):     %s strings, %s kB" % (count, size // 1024)
+    print "Item names (before):    %s kB" % (itemNames // 1024)
+    print "Item names (after):     %s kB" % (distinctItemNames // 1024)
+    print "Snapshot load (before): %s kB" % plainMemory
+    print "Snapshot load (after):  %s kB" % memory
+
+if __name__ == '__main__':
+    argParser = argparse.ArgumentParser(description="World and item text memory benchmark.")
+    argParser.add_argument("--spaces", type=int, default=100000)
+    args = argParser.parse_args()
+
+    run(args.spaces)
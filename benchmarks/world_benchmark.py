@@ -0,0 +1,73 @@
+#!/usr/bin/python
+
+"""
+Startup benchmark for world loading.
+
+Measures a cold start (building the world from its data file and
+writing the snapshot) and a warm start (loading the snapshot).
+
+Usage (from the repository root):
+    python -m benchmarks.world_benchmark --repeat 20
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import constants
+import game_loader
+
+def _timeLoad(filename, repeat, removeSnapshot):
+    """
+    Returns best time (in seconds) of loading the world.
+    """
+    snapshotFilename = os.path.splitext(filename)[0] + ".snapshot"
+    best = None
+    for i in range(repeat):
+        if removeSnapshot and os.path.exists(snapshotFilename):
+            os.remove(snapshotFilename)
+        start = time.time()
+        game_loader.getWorld(filename)
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def run(repeat, filename = None):
+    """
+    Runs the benchmark and prints a report.
+
+    @param repeat:      Number of loads to time; the best is reported.
+    @keyword filename:  (Optional) World data file. By default,
+                        constants.WORLD_FILE.
+    """
+    if filename is None:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        filename = os.path.join(root, constants.WORLD_FILE)
+
+    #Work on a copy so the game's own snapshot is left alone
+    directory = tempfile.mkdtemp()
+    try:
+        copy = os.path.join(directory, os.path.basename(filename))
+        shutil.copy(filename, copy)
+
+        cold = _timeLoad(copy, repeat, True)
+        warm = _timeLoad(copy, repeat, False)
+        snapshotSize = os.path.getsize(os.path.splitext(copy)[0] + ".snapshot")
+    finally:
+        shutil.rmtree(directory)
+
+    print "World file:             %s (%s bytes)" % (filename, os.path.getsize(filename))
+    print "Snapshot size:          %s bytes" % snapshotSize
+    print "Cold start (build):     %.2f ms" % (cold * 1000)
+    print "Warm start (snapshot):  %.2f ms" % (warm * 1000)
+
+if __name__ == '__main__':
+    argParser = argparse.ArgumentParser(description="World loading benchmark.")
+    argParser.add_argument("--repeat", type=int, default=20)
+    argParser.add_argument("--file", default=None, help="World data file.")
+    args = argParser.parse_args()
+
+    run(args.repeat, args.file)
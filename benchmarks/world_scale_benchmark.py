@@ -0,0 +1,132 @@
+#!/usr/bin/python
+
+"""
+Scale benchmark for the Space graph.
+
+Generates a large world, then walks a player through it at random
+and visits every space breadth first, once through Space.getExit() and
+once through SpaceGraph space numbers. Reports build time, memory per
+space, movement throughput and traversal throughput.
+
+Usage (from the repository root):
+    python -m benchmarks.world_scale_benchmark --kind grid --spaces 1000000
+    python -m benchmarks.world_scale_benchmark --kind random --spaces 100000
+"""
+
+import argparse
+import gc
+import math
+import random
+import time
+
+from factories import world_factory
+from game_io import ScriptIO
+from player import Player
+
+def _residentMemory():
+    """
+    Returns this process's resident memory (in kB), or None if unknown.
+    """
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except IOError:
+        pass
+    return None
+
+def _walk(player, moves, seed):
+    """
+    Moves player in random directions; blocked moves are retried.
+
+    @return:    Number of moves made.
+    """
+    rand = random.Random(seed)
+    directions = [(player.canMoveNorth, player.moveNorth), (player.canMoveSouth, player.moveSouth),
+                  (player.canMoveEast, player.moveEast), (player.canMoveWest, player.moveWest)]
+    made = 0
+    while made < moves:
+        canMove, move = rand.choice(directions)
+        if canMove():
+            move()
+            made += 1
+    return made
+
+def _traverse(start):
+    """
+    Visits every space reachable from start, breadth first.
+
+    @return:    Number of spaces visited.
+    """
+    directions = ["north", "south", "east", "west"]
+    seen = set([id(start)])
+    pending = [start]
+    for space in pending:
+        for direction in directions:
+            other = space.getExit(direction)
+            if other is not None and id(other) not in seen:
+                seen.add(id(other))
+                pending.append(other)
+    return len(pending)
+
+def run(kind, spaces, moves, cityDensity, shopDensity, itemDensity):
+    """
+    Runs the benchmark and prints a report.
+
+    @param kind:        "grid" or "random".
+    @param spaces:      Number of spaces (rounded down to a square for grids).
+    @param moves:       Number of moves in the random walk.
+    @param cityDensity: Fraction of spaces with a city.
+    @param shopDensity: Fraction of cities with a shop.
+    @param itemDensity: Fraction of spaces with an item.
+    """
+    gc.collect()
+    memoryBefore = _residentMemory()
+
+    start = time.time()
+    if kind == "grid":
+        side = int(math.sqrt(spaces))
+        spaces = side * side
+        world = world_factory.getGridWorld(side, side, cityDensity, shopDensity, itemDensity)
+    else:
+        world = world_factory.getRandomWorld(spaces, cityDensity = cityDensity,
+                shopDensity = shopDensity, itemDensity = itemDensity)
+    buildTime = time.time() - start
+
+    gc.collect()
+    memoryAfter = _residentMemory()
+
+    player = Player("Walker", world.getStart(), ScriptIO(keepOutput = False))
+    start = time.time()
+    made = _walk(player, moves, 0)
+    walkTime = time.time() - start
+
+    start = time.time()
+    visited = _traverse(world.getStart())
+    traverseTime = time.time() - start
+
+    start = time.time()
+    graphVisited = len(world.getGraph().getReachable(world.getStart().getIndex()))
+    graphTime = time.time() - start
+
+    print "World:                  %s, %s spaces" % (kind, spaces)
+    print "Build time:             %.2f s (%.1f us per space)" % (buildTime, buildTime * 1000000 / spaces)
+    if memoryBefore and memoryAfter:
+        print "Memory:                 %s kB (%.0f bytes per space)" % \
+                (memoryAfter - memoryBefore, (memoryAfter - memoryBefore) * 1024.0 / spaces)
+    print "Moves per second:       %.0f" % (made / walkTime)
+    print "Traversal:              %.2f s (%.0f spaces per second)" % (traverseTime, visited / traverseTime)
+    print "Traversal by number:    %.2f s (%.0f spaces per second)" % (graphTime, graphVisited / graphTime)
+
+if __name__ == '__main__':
+    argParser = argparse.ArgumentParser(description="Space graph scale benchmark.")
+    argParser.add_argument("--kind", choices=["grid", "random"], default="grid")
+    argParser.add_argument("--spaces", type=int, default=100000)
+    argParser.add_argument("--moves", type=int, default=1000000)
+    argParser.add_argument("--cities", type=float, default=.05, help="Fraction of spaces with a city.")
+    argParser.add_argument("--shops", type=float, default=.5, help="Fraction of cities with a shop.")
+    argParser.add_argument("--items", type=float, default=.1, help="Fraction of spaces with an item.")
+    args = argParser.parse_args()
+
+    run(args.kind, args.spaces, args.moves, args.cities, args.shops, args.items)
@@ -1,5 +1,7 @@
 #!/usr/bin/python
 
+from shared_world import resolveText
+
 class Building(object):
     """
     Generic Building object. Building children include Inns, Shops, and Squares.      
@@ -31,7 +33,7 @@ class Building(object):
 
         @return:    The description of the building.
         """
-        return self._description
+        return resolveText(self._description)
 
     def greetings(self):
         """
@@ -39,7 +41,32 @@ class Building(object):
 
         @return:    The greetings player receives upon entering building.
         """
-        return self._greetings
+        return resolveText(self._greetings)
+
+    def update(self, other):
+        """
+        Copies data from other, an updated version of this building.
+        Used to patch a live world when its data file changes; state
+        that changes during play is kept.
+
+        @param other:   Building of the same class.
+        @return:        True if anything changed, False otherwise.
+        """
+        changed = (self._name, self.getDescription(), self.greetings()) != \
+                  (other._name, other.getDescription(), other.greetings())
+        self._name = other._name
+        self._description = other._description
+        self._greetings = other._greetings
+
+        return changed
+
+    def shareText(self, share):
+        """
+        Hands description and greetings to shared_world.shareWorld()'s
+        share function, and keeps what it returns.
+        """
+        self._description = share(self.getDescription())
+        self._greetings = share(self.greetings())
 
     def enter(self, player):
         """
@@ -2,6 +2,8 @@
 
 from place import Place
 from cities.building import Building
+from util.helpers import sameObjects
+from shared_world import resolveText
 
 class City(Place):
     """
@@ -28,7 +30,7 @@ class City(Place):
         """
         Returns the string that represents a player greeting upon entering the city.
         """
-        return self._greetings
+        return resolveText(self._greetings)
         
     def getBuildings(self):
         """
@@ -36,6 +38,39 @@ class City(Place):
         """
         return self._buildings
 
+    def setBuildings(self, buildings):
+        """
+        Replaces the list of building objects.
+
+        @param buildings:   A list of the buildings in the city.
+        """
+        self._buildings = buildings
+
+    def update(self, other):
+        """
+        Copies data and buildings from other, an updated version
+        of this city.
+
+        @param other:   City.
+        @return:        True if anything changed, False otherwise.
+        """
+        changed = Place.update(self, other)
+        if self.greetings() != other.greetings() or not sameObjects(self._buildings, other._buildings):
+            changed = True
+        self._greetings = other._greetings
+        self._buildings = other._buildings
+
+        return changed
+
+    def shareText(self, share):
+        """
+        Hands description and greetings to a share function (of
+        shared_world.shareWorld() or compressed_world.compressWorld()),
+        and keeps what it returns.
+        """
+        Place.shareText(self, share)
+        self._greetings = share(self.greetings())
+
     def getBuildingString(self, string):
         """
         Returns building object given string parameter.
@@ -65,44 +100,47 @@ class City(Place):
                 buildingDictionary[building.getName()] = building
         return buildingDictionary
     
-    def _printBuildings(self):
+    def _printBuildings(self, io):
         """
         The method for printing buildings in the city
+
+        @param io:           The player's input/output channel.
         """
         
         buildings = self.getBuildings()
         #If there is 1 building
         if isinstance(buildings, Building):
-            print "\t %s\n" % buildings.getName()
+            io.output("\t %s\n" % buildings.getName())
         #If there are multiple buildings
         elif isinstance(buildings, list):
             for building in buildings:
-                print "\t %s" % building.getName()
-            print"\n"
+                io.output("\t %s" % building.getName())
+            io.output("\n")
     
     def enter(self, player):  
         """
         The method for entering the buildings in the city.
         @param player:       The current player
         """
+        io = player.getIO()
 
         buildingDictionary = self._createDictionaryOfBuildings()
 
-        print "Entering %s" % self.getName()
-        print "\n %s \n" % self.getDescription()
+        io.output("Entering %s" % self.getName())
+        io.output("\n %s \n" % self.getDescription())
 
         while True:
-            print "You have found the following:"
+            io.output("You have found the following:")
             
             #Print list of buildings
-            self._printBuildings()
+            self._printBuildings(io)
             
-            print "To go to a building type its name. Otherwise, type 'leave city'"
-            command = raw_input("Where would you like to go?\n")
+            io.output("To go to a building type its name. Otherwise, type 'leave city'")
+            command = io.readLine("Where would you like to go?\n")
             
             #If player chooses to leave the city
             if command == 'leave city':
-                print "Leaving %s.\n" % self.getName()
+                io.output("Leaving %s.\n" % self.getName())
                 return
             #If player selects something other than to leave the city
             while True:
@@ -110,9 +148,8 @@ class City(Place):
                     #Enter building
                     buildingDictionary[command].enter(player)
                     #Player has left building, and chooses what to do next
-                    print "\nYou are now back in %s." % self.getName()
+                    io.output("\nYou are now back in %s." % self.getName())
                     break
                 else:
-                    print "\nI did not recognize %s. Try again." % command
+                    io.output("\nI did not recognize %s. Try again." % command)
                     break
-
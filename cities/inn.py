@@ -1,6 +1,7 @@
 #!/usr/bin/python
 
 from cities.building import Building
+from util.helpers import readChoice
 import constants
 
 class Inn(Building):
@@ -23,16 +24,16 @@ class Inn(Building):
         """
         The events sequence upon player entering inn.
         """
+        io = player.getIO()
 
-        #TODO: No need to create a _player attribute here;
-        #      You can just use 'player' throughout the method.
-        self._player = player
+        #Inns are shared by every session; player is kept local, as
+        #readLine() lets other sessions enter meanwhile
         cost = self.getCost()
 
-        print ""
-        print "- - - %s - - -" % self.getName()
-        print self._greetings + "."
-        print "Cost to stay: %s." % cost
+        io.output()
+        io.output("- - - %s - - -" % self.getName())
+        io.output(self.greetings() + ".")
+        io.output("Cost to stay: %s." % cost)
 
         #Determine player choice
         STAY = 1
@@ -40,34 +41,48 @@ class Inn(Building):
         
         choice = None
         while choice != LEAVE:
-            print """
+            io.output("""
             Would you like to stay for the night?:
             1) Stay
             2) Leave
-            """
-            choice = int(raw_input("Choice? "))
+            """)
+            choice = readChoice(io, "Choice? ")
 
             #Heal option   
             if choice == STAY:
                 #Money check and transfer
-                if self._player.getMoney() >= cost:
-                    self._player.decreaseMoney(cost)
+                if player.getMoney() >= cost:
+                    player.decreaseMoney(cost)
                     #Actual healing operation
-                    self._heal(self._player)
-                    print "%s was healed at %s cost! %s has %s %s remaining." \
-                          % (self._player.getName(), cost, self._player.getName(), self._player.getMoney(), constants.CURRENCY)
+                    self._heal(player)
+                    io.output("%s was healed at %s cost! %s has %s %s remaining."
+                          % (player.getName(), cost, player.getName(), player.getMoney(), constants.CURRENCY))
                     break
                 else:
-                    print "%s have enough money." % self._player.getName()
+                    io.output("%s have enough money." % player.getName())
                 
             #Non-use option
             elif choice == LEAVE:
-                print "Thanks for coming to %s." % self._name
+                io.output("Thanks for coming to %s." % self._name)
                 
             #For invalid input
             else:
-                print "What?"
+                io.output("What?")
     
+    def update(self, other):
+        """
+        Copies data, including cost, from other, an updated version of this inn.
+
+        @param other:   Inn.
+        @return:        True if anything changed, False otherwise.
+        """
+        changed = Building.update(self, other)
+        if self._cost != other._cost:
+            changed = True
+        self._cost = other._cost
+
+        return changed
+
     def getCost(self):
         """
         Returns cost for using inn.
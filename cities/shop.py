@@ -1,42 +1,111 @@
 #!/usr/bin/python
 
+import random
+import zlib
+
 from cities.building import Building
 from items.item import Item
 from items.weapon import Weapon
 from items.armor import Armor
 from items.potion import Potion
+from items.item_set import ItemSet
 import factories.shop_factory 
+from util.helpers import splitQuantity, stackLabel, readChoice
+from region_pager import PagedOut
 import constants
 
 class Shop(Building):
     """
     Shops are buildings that allow player to buy and sell items.
     """
-    def __init__(self, name, description, greetings, numItems, quality):
+    def __init__(self, name, description, greetings, numItems, quality, seed = None):
         """
         Initializes shop object.
 
+        The shop's items are generated the first time they are needed.
+
         @param name:           The name of the shop.
         @param description:    A description of the shop.
         @param greetings:      The greetings the user gets as he enters a shop.
         @param numItems:       The number of items that can be bought at the shop.
         @param quality:        The quality of the items that may be bought at shop.
                                Ranges from 1-20.
+        @keyword seed:         (Optional) String that determines the items
+                               generated. By default, the shop's name.
         """
         Building.__init__(self, name, description, greetings)
 
-        #Create items attributes and generate items objects
+        #Create items attributes; items objects are generated on demand
         self._numItems = numItems
         self._quality = quality
-        self._items = factories.shop_factory.getItems(numItems, quality)
+        if seed is None:
+            seed = name
+        self._seed = seed
+        self._items = None
+
+    def getItems(self):
+        """
+        Returns the items for sale, generating them on first use.
+
+        The same seed always generates the same items, no matter
+        when the shop is first visited.
+
+        @return:    ItemSet of items.
+        """
+        if type(self._items) is PagedOut:
+            self._items.load()
+        if self._items is None:
+            rand = random.Random(zlib.crc32(self._seed) & 0xffffffff)
+            self._items = ItemSet(factories.shop_factory.getItems(self._numItems, self._quality, rand))
+        return self._items
     
+    def update(self, other):
+        """
+        Copies data from other, an updated version of this shop.
+        The stock is kept, unless what it is generated from changed.
+
+        @param other:   Shop.
+        @return:        True if anything changed, False otherwise.
+        """
+        changed = Building.update(self, other)
+        if type(self._items) is PagedOut:
+            self._items.load()
+        if (self._numItems, self._quality, self._seed) != (other._numItems, other._quality, other._seed):
+            changed = True
+            self._numItems = other._numItems
+            self._quality = other._quality
+            self._seed = other._seed
+            self._items = None
+
+        return changed
+
+    def pageOut(self, marker):
+        """
+        Hands over the stock, which region_pager keeps on disk, and
+        replaces it by marker.
+
+        @param marker:  region_pager.PagedOut.
+        @return:        The stock.
+        """
+        items = self._items
+        self._items = marker
+        return items
+
+    def pageIn(self, items):
+        """
+        Takes back stock handed over by pageOut().
+        """
+        self._items = items
+
     def enter(self, player):
         """
         Returns the items in the shop.
         """
-        print ""
-        print "- - - %s - - -" %self._name
-        print self._greetings + "."
+        io = player.getIO()
+
+        io.output()
+        io.output("- - - %s - - -" %self._name)
+        io.output(self.greetings() + ".")
 
         #Determines and runs player choice
         CHECK_ITEMS = 1
@@ -47,110 +116,135 @@ class Shop(Building):
         
         choice = None
         while choice != 5:
-            print """
+            io.output("""
             What is your choice?
             1) Check items
             2) Check item stats
             3) Sell item in inventory
             4) Purchase item
             5) Quit
-            """
-            choice = int(raw_input("What do you want to do? "))
+            """)
+            choice = readChoice(io, "What do you want to do? ")
             if choice == CHECK_ITEMS:
-                self.checkItems()
+                self.checkItems(io)
             elif choice == CHECK_ITEM_STATS:
-                self.checkItemsStats()
+                self.checkItemsStats(io)
             elif choice == SELL_ITEM:
                 self.sellItems(player)
             elif choice == PURCHASE_ITEM:
                 self.buyItems(player)
             elif choice == QUIT:
-                self.leaveShop()
+                self.leaveShop(io)
                 break
             else:
-                print "Huh?"
+                io.output("Huh?")
 
     #Gives basic descriptions of items
-    def checkItems(self):
-        print "Here are our wares:"
-        for item in self._items:
-            print "\t%s: %s." % (item.getName(), item.getDescription())
+    def checkItems(self, io):
+        io.output("Here are our wares:")
+        items = self.getItems()
+        for item in items:
+            io.output("\t%s: %s." % (stackLabel(item, items.getCount(item)), item.getDescription()))
             if isinstance(item, Weapon):
-                print "\t\tAttack: %s" % item.getAttack()
+                io.output("\t\tAttack: %s" % item.getAttack())
             elif isinstance(item, Armor):
-                print "\t\tDefense: %s" % item.getDefense()
+                io.output("\t\tDefense: %s" % item.getDefense())
             else:
-                print "\t\tHealing: %s" % item.getHealing()
+                io.output("\t\tHealing: %s" % item.getHealing())
                 
     #Gives advanced descriptions of items 
-    def checkItemsStats(self):           
-        print "Item stats:"
-        for item in self._items:
-            print "\t%s: %s." % (item.getName(), item.getDescription())
+    def checkItemsStats(self, io):           
+        io.output("Item stats:")
+        items = self.getItems()
+        for item in items:
+            io.output("\t%s: %s." % (stackLabel(item, items.getCount(item)), item.getDescription()))
             if isinstance(item, Weapon):
-                print "\t\tAttack: %s" % item.getAttack()
-                print "\t\tWeight: %s" % item.getWeight()
-                print "\t\tCost: %s" % item.getCost()
+                io.output("\t\tAttack: %s" % item.getAttack())
+                io.output("\t\tWeight: %s" % item.getWeight())
+                io.output("\t\tCost: %s" % item.getCost())
             elif isinstance(item, Armor):
-                print "\t\tDefense: %s" % item.getDefense()
-                print "\t\tWeight: %s" % item.getWeight()
-                print "\t\tCost: %s" % item.getCost()
+                io.output("\t\tDefense: %s" % item.getDefense())
+                io.output("\t\tWeight: %s" % item.getWeight())
+                io.output("\t\tCost: %s" % item.getCost())
             else:
-                print "\t\tHealing: %s" % item.getHealing()
-                print "\t\tWeight: %s" % item.getWeight()
-                print "\t\tCost: %s" % item.getCost()
+                io.output("\t\tHealing: %s" % item.getHealing())
+                io.output("\t\tWeight: %s" % item.getWeight())
+                io.output("\t\tCost: %s" % item.getCost())
 
     #For selling items in inventory to shop
     def sellItems(self, player):
+        io = player.getIO()
+
         #User prompt
         inventory = player.getInventory()
-        print "Current inventory:"
-        for item in player.getInventory():
+        io.output("Current inventory:")
+        for item in inventory:
             sellValue = constants.SELL_LOSS_PERCENTAGE * item.getCost()
-            print "\t%s... with sell value: %s %s." % (item.getName(), sellValue, constants.CURRENCY)
-        print ""
+            io.output("\t%s... with sell value: %s %s." % (stackLabel(item, inventory.getCount(item)), sellValue, constants.CURRENCY))
+        io.output()
 
-        itemToSell = raw_input("Which item would you like to sell? ")
+        itemToSell = io.readLine("Which item would you like to sell? ")
+        quantity, itemToSell = splitQuantity(itemToSell)
         #Finds if item exists in inventory
-        for item in inventory:
+        for item in inventory.getItemsByName(itemToSell):
             if item.getName() == itemToSell:
+                if quantity < 1 or quantity > inventory.getCount(item):
+                    io.output("You do not have %s %s." % (quantity, itemToSell))
+                    return
+                sellValue = constants.SELL_LOSS_PERCENTAGE * item.getCost() * quantity
+
                 #Actual sale execution
-                choice = raw_input("Would you like to sell %s for %s rubles? Response: yes/no. " % (item.getName(), sellValue))
+                choice = io.readLine("Would you like to sell %s for %s rubles? Response: yes/no. " % (stackLabel(item, quantity), sellValue))
                 if choice.lower() == "yes":
-                    player.removeFromInventory(item)
+                    player.removeFromInventory(item, quantity)
                     player.increaseMoney(sellValue)
-                    self._items.append(item)
-                    print "Sold %s for %s." % (item.getName(), sellValue)
+                    self.getItems().addItem(item, quantity)
+                    io.output("Sold %s for %s." % (stackLabel(item, quantity), sellValue))
                 elif choice.lower() == "no":
-                    print "Didn't sell item." 
+                    io.output("Didn't sell item.")
                 else:
-                    print "Invalid choice."
+                    io.output("Invalid choice.")
+                return
                     
     #For buying items from shop
     def buyItems(self, player):
+        io = player.getIO()
+
         #User prompt
-        print "Items available for purchase:"
-        for item in self._items:
-            print "\t%s... with cost of %s." % (item.getName(), item.getCost())
-        print ""
-        print "%s has %s rubles with which to spend." % (player.getName(), player.getMoney())
-        itemToPurchase = raw_input("Which item would you like to purchase? ")
-        #Check to find object associated with user-given string
-        for item in self._items:
-            if itemToPurchase == item.getName():
-                #Check to see if player has enough money to purchase item
-                if player.getMoney() <= item.getCost():
-                    print "Not enough money to purchase item."
-                    return
-                #Actual purchase execution
-                player.addToInventory(item)
-                self._items.remove(item)
-                player.decreaseMoney(item.getCost())
-                print "%s puchased %s!" % (player.getName(), item.getName())
-                break
-        else:
-            print "Can't purchase this item."
+        io.output("Items available for purchase:")
+        items = self.getItems()
+        for item in items:
+            io.output("\t%s... with cost of %s." % (stackLabel(item, items.getCount(item)), item.getCost()))
+        io.output()
+        io.output("%s has %s rubles with which to spend." % (player.getName(), player.getMoney()))
+        itemToPurchase = io.readLine("Which item would you like to purchase? ")
+        quantity, itemToPurchase = splitQuantity(itemToPurchase)
+        #Check to find objects associated with user-given string;
+        #identical items are taken from their stack
+        stacks = []
+        remaining = quantity
+        for item in items.getItemsByName(itemToPurchase):
+            if remaining > 0 and item.getName() == itemToPurchase:
+                count = min(remaining, items.getCount(item))
+                stacks.append((item, count))
+                remaining -= count
+        if quantity < 1 or not stacks or remaining:
+            io.output("Can't purchase this item.")
+            return
+
+        #Check to see if player has enough money to purchase items
+        cost = sum(item.getCost() * count for item, count in stacks)
+        if player.getMoney() <= cost:
+            io.output("Not enough money to purchase item.")
+            return
+
+        #Actual purchase execution
+        for item, count in stacks:
+            items.removeItem(item, count)
+            player.addToInventory(item, count)
+        player.decreaseMoney(cost)
+        io.output("%s puchased %s!" % (player.getName(), stackLabel(item, quantity)))
 
     #To leave shop
-    def leaveShop(self):
-        print "Leaving %s." % self._name
+    def leaveShop(self, io):
+        io.output("Leaving %s." % self._name)
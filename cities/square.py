@@ -1,6 +1,10 @@
 #!/usr/bin/python
 
+import marshal
+
 from cities.building import Building
+from util.helpers import readChoice
+from shared_world import resolveText
 
 class Square(Building):
     """
@@ -19,16 +23,53 @@ class Square(Building):
 
         self._talk = talk
         
+    def update(self, other):
+        """
+        Copies data, including talk, from other, an updated version of this square.
+
+        @param other:   Square.
+        @return:        True if anything changed, False otherwise.
+        """
+        changed = Building.update(self, other)
+        if self.getTalk() != other.getTalk():
+            changed = True
+        self._talk = other._talk
+
+        return changed
+
+    def getTalk(self):
+        """
+        Returns dictionary of people names and what they say.
+        """
+        talk = self._talk
+        if talk is None or isinstance(talk, dict):
+            return talk
+        #Shared talk is stored marshalled
+        return marshal.loads(resolveText(talk))
+
+    def shareText(self, share):
+        """
+        Hands description, greetings and talk to shared_world.shareWorld()'s
+        share function, and keeps what it returns.
+        """
+        Building.shareText(self, share)
+        if isinstance(self._talk, dict):
+            self._talk = share(marshal.dumps(self._talk))
+        elif self._talk is not None:
+            self._talk = share(resolveText(self._talk))
+
     def enter(self, player):
         """
         The events sequence upon player entering square.
         """
-        numPeople = len(self._talk)
+        io = player.getIO()
+        talk = self.getTalk()
+        numPeople = len(talk)
 
-        print ""
-        print "- - - %s - - -" % self._name
-        print self._greetings
-        print ""
+        io.output()
+        io.output("- - - %s - - -" % self._name)
+        io.output(self.greetings())
+        io.output()
 
         #User prompt
         TALK = 1
@@ -36,37 +77,37 @@ class Square(Building):
         
         choice = None
         while choice != LEAVE:
-            print "There are %s people to talk to in %s:" % (numPeople, self._name)
-            for person in self._talk:
-                print "\t %s" % person
-            print """
+            io.output("There are %s people to talk to in %s:" % (numPeople, self._name))
+            for person in talk:
+                io.output("\t %s" % person)
+            io.output("""
             What would you like to do:
             1) Talk to someone
             2) Leave
-            """
+            """)
 
             #Determine person player wants to talk to
-            choice = int(raw_input("What is your choice? "))
+            choice = readChoice(io, "What is your choice? ")
             if choice == TALK:
-                targetTalk = raw_input("Whom would you like to talk to? ")
+                targetTalk = io.readLine("Whom would you like to talk to? ")
                 
                 #Prints the string associated with that person
-                if targetTalk in self._talk:
-                    print ""
-                    print self._talk[targetTalk] + "."
-                    print ""
+                if targetTalk in talk:
+                    io.output()
+                    io.output(talk[targetTalk] + ".")
+                    io.output()
                     
                 #If that person doesn't exist
                 else:
-                    print ""
-                    print "Alas, %s could not be found in %s." % (targetTalk, self._name)
-                    print ""
+                    io.output()
+                    io.output("Alas, %s could not be found in %s." % (targetTalk, self._name))
+                    io.output()
                     
             #The option to leave
             elif choice == LEAVE:
-                print "Leaving %s." % self._name
+                io.output("Leaving %s." % self._name)
                 
             #For invalid choices
             else:
-                print "Invalid choice."
-                print ""
+                io.output("Invalid choice.")
+                io.output()
@@ -21,10 +21,11 @@ class CheckEquipmentCommand(Command):
         
         self._player = player
 
-    def execute(self):
+    def execute(self, arguments = None):
         """
         Equips player with item in inventory.
         """
+        io = self._player.getIO()
         playerName = self._player.getName()
         equipment = self._player.getEquipped()
 
@@ -39,16 +40,16 @@ class CheckEquipmentCommand(Command):
         equipment = sortedEquipment
 
         #Prints currently equipped items
-        print "%s's currently equipped items:\n" % playerName
+        io.output("%s's currently equipped items:\n" % playerName)
         
         for item in equipment:
             itemName = item.getName()
             if isinstance(item, Weapon):
                 attack = item.getAttack()
-                print "\tWeapon: %s." % itemName
-                print "\t%s yields a %s attack bonus." % (nameItem, attack)
+                io.output("\tWeapon: %s." % itemName)
+                io.output("\t%s yields a %s attack bonus." % (nameItem, attack))
             elif isinstance(item, Armor):
                 defense = item.getDefense()
-                print "\tArmor: %s." % itemName
-                print "\t%s yields a %s defense bonus." % (nameItem, defense)
-            print ""
+                io.output("\tArmor: %s." % itemName)
+                io.output("\t%s yields a %s defense bonus." % (nameItem, defense))
+            io.output()
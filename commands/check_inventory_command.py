@@ -5,6 +5,11 @@ from items.item import Item
 from items.weapon import Weapon
 from items.armor import Armor
 from items.potion import Potion
+from constants import ItemType
+from util.helpers import stackLabel
+
+#Item types listed first, in this order; other types follow
+_TYPE_ORDER = [ItemType.WEAPON, ItemType.ARMOR, ItemType.POTION]
 
 class CheckInventoryCommand(Command):
     """
@@ -23,36 +28,24 @@ class CheckInventoryCommand(Command):
 
         self._player = player
 
-    def execute(self):
+    def execute(self, arguments = None):
         """
         Displays character inventory.
         """
+        io = self._player.getIO()
+
         #Get basic player information
         playerName = self._player.getName()
         inventory = self._player.getInventory()
-        inventoryList = inventory.getItems()
 
-        totalWeight = 0
-
-        #Sort inventory
-        sortedInventory = []
-        for item in inventoryList:
-            if isinstance(item, Weapon):
-                sortedInventory.append(item)
-        for item in inventoryList:
-            if isinstance(item, Armor):
-                sortedInventory.append(item)
-        for item in inventoryList:
-            if isinstance(item, Potion):
-                sortedInventory.append(item)
-        for item in inventoryList:
-            if item not in sortedInventory:
-                sortedInventory.append(item)
-            
-        inventoryList = sortedInventory
+        #Sort inventory by type
+        itemTypes = [itemType for itemType in inventory.getItemTypes() if itemType not in _TYPE_ORDER]
+        inventoryList = []
+        for itemType in _TYPE_ORDER + itemTypes:
+            inventoryList.extend(inventory.getItemsByType(itemType))
 
         #Cycle through player's inventory, obtaining item stats
-        print "%s's inventory:\n" %playerName
+        io.output("%s's inventory:\n" %playerName)
         for item in inventoryList:
             itemName = item.getName()
             itemDescription = item.getDescription()
@@ -66,17 +59,15 @@ class CheckInventoryCommand(Command):
                 itemHeal = str(item.getHealing())
 
             #Print item stats of given item in inventory
-            print "\t%s: %s." %(itemName, itemDescription)
+            io.output("\t%s: %s." %(stackLabel(item, inventory.getCount(item)), itemDescription))
 
             if isinstance(item, Armor):
-                print "\t%s has a defense of %s." %(itemName, itemDefense)
+                io.output("\t%s has a defense of %s." %(itemName, itemDefense))
             elif isinstance(item, Weapon):
-                print "\t%s has an attack value of %s." %(itemName, itemAttack)
+                io.output("\t%s has an attack value of %s." %(itemName, itemAttack))
             elif isinstance(item, Potion):
-                print "\t%s has a healing value of %s." %(itemName, itemHeal)
-            print "\t%s weights %s." %(itemName, itemWeight)
-            print ""
-
-            totalWeight += int(itemWeight)
+                io.output("\t%s has a healing value of %s." %(itemName, itemHeal))
+            io.output("\t%s weights %s." %(itemName, itemWeight))
+            io.output()
 
-        print "\tTotal weight of inventory: %s." %totalWeight
+        io.output("\tTotal weight of inventory: %s." %inventory.weight())
@@ -19,11 +19,12 @@ class CheckMoneyCommand(Command):
 
         self._player = player
 
-    def execute(self):
+    def execute(self, arguments = None):
         """
         Prints player money.
         """
+        io = self._player.getIO()
         money = self._player.getMoney()
         name = self._player.getName()
 
-        print "%s currently has %s rubbles!" % (name, money)
+        io.output("%s currently has %s rubbles!" % (name, money))
@@ -1,8 +1,7 @@
 #!/usr/bin/python
 
 from command import Command
-from items.weapon import Weapon
-from items.armor import Armor
+from constants import ItemType
 
 class CheckStatsCommand(Command):
     """
@@ -21,10 +20,12 @@ class CheckStatsCommand(Command):
 
         self._player = player
 
-    def execute(self):
+    def execute(self, arguments = None):
         """
         Displays player stats.
         """
+        io = self._player.getIO()
+
         #Get player stats
         name = self._player.getName()
         experience = self._player.getExperience()
@@ -37,21 +38,21 @@ class CheckStatsCommand(Command):
 
         #Get equipment bonuses
         equipment = self._player.getEquipped()
-        equipmentList = equipment.getItems()
-        for item in equipmentList:
-            if isinstance(item, Weapon):
-                weaponsAttack = item.getAttack()
-            elif isinstance(item, Armor):
-                defense = item.getDefense()
+        weapon = equipment.getFirstItemOfType(ItemType.WEAPON)
+        if weapon is not None:
+            weaponsAttack = weapon.getAttack()
+        armor = equipment.getFirstItemOfType(ItemType.ARMOR)
+        if armor is not None:
+            defense = armor.getDefense()
                 
         totalAttack = attack + weaponsAttack
 
         #Print player stats
-        print "%s's stats: \n" % name
-        print "\t%s is level %s and has %s experience." % (name, level, experience)
-        print "\t%s's Hp: %s." % (name, hp)
-        print ""
-        print "\tCharacter-based attack is %s; weapons bonus is %s." % (attack, weaponsAttack)
-        print "\tTotal attack is %s." % totalAttack
-        print "\tArmor-based defense is %s." % defense
+        io.output("%s's stats: \n" % name)
+        io.output("\t%s is level %s and has %s experience." % (name, level, experience))
+        io.output("\t%s's Hp: %s." % (name, hp))
+        io.output()
+        io.output("\tCharacter-based attack is %s; weapons bonus is %s." % (attack, weaponsAttack))
+        io.output("\tTotal attack is %s." % totalAttack)
+        io.output("\tArmor-based defense is %s." % defense)
                 
@@ -26,11 +26,17 @@ class Command(object):
         """
         return self._explanation
 
-    def execute(self):
+    def execute(self, arguments = None):
         """
         Default execute method. By default,
         does nothing.
 
         This method should be overridden by child classes.
+
+        @keyword arguments: (Optional) Rest of the command line after the
+                            command's name (e.g. the item name in
+                            'equip Sting'). None if nothing was typed, in
+                            which case commands that need an argument
+                            prompt for it.
         """
         pass
@@ -1,14 +1,31 @@
 #!/usr/bin/python
 
+import constants
+from util.trie import Trie
+from util.bk_tree import BKTree
+
 class CommandWords(object):
     """
     Dictionary of all Command objects used in the game.
+
+    Command names and aliases are also kept in a trie so that
+    abbreviated input can be resolved in time proportional to its
+    length, regardless of how many commands are registered.
+    A BK-tree over names and aliases provides suggestions for typos.
     """
     def __init__(self):
         """
         Initializes new dictionary of commands.
         """
         self._commandWords = {}
+        self._aliases = {}
+        self._trie = Trie()
+
+        #Rebuilt on first use after commands or aliases change
+        self._suggestionIndex = None
+
+        #Incremented whenever commands or aliases change
+        self._version = 0
 
     def addCommand(self, name, command):
         """
@@ -20,13 +37,84 @@ class CommandWords(object):
         @param command:     Command object.
         """
         #Does command already exist?
-        if self.isCommand(name):
+        if self.isCommand(name) or name in self._aliases:
             errorMsg = "Cannot add '%s' to CommandWords; command name already in use." % \
                     name
             raise AssertionError(errorMsg)
 
         #Add command
         self._commandWords[name] = command
+        self._trie.add(name, name)
+        self._suggestionIndex = None
+        self._version += 1
+
+    def addAlias(self, alias, name):
+        """
+        Adds an alternative name for a command (e.g. 'n' for 'north').
+
+        @precondition:      isCommand(name)
+        @precondition:      alias not already in use.
+
+        @param alias:       Alternative name.
+        @param name:        Name of command.
+        """
+        if not self.isCommand(name):
+            errorMsg = "Cannot add alias '%s' to CommandWords; command '%s' not recognized." % \
+                    (alias, name)
+            raise AssertionError(errorMsg)
+        if self.isCommand(alias) or alias in self._aliases:
+            errorMsg = "Cannot add alias '%s' to CommandWords; name already in use." % alias
+            raise AssertionError(errorMsg)
+
+        self._aliases[alias] = name
+        self._trie.add(alias, name)
+        self._suggestionIndex = None
+        self._version += 1
+
+    def resolve(self, text):
+        """
+        Resolves user input to a command name.
+
+        Accepts exact command names, aliases and unambiguous prefixes
+        of either (e.g. 'inv' for 'inventory').
+
+        @param text:        Command name, alias or prefix.
+        @return:            Name of command.
+                            Returns None if not recognized or ambiguous.
+        """
+        return self._trie.resolve(text)
+
+    def getSuggestions(self, text, maxDistance = constants.SUGGESTION_MAX_DISTANCE,
+            limit = constants.SUGGESTION_LIMIT):
+        """
+        Suggests commands for unrecognized input.
+
+        @param text:         Unrecognized command name.
+        @keyword maxDistance: (Optional) Largest edit distance to accept.
+        @keyword limit:      (Optional) Maximum number of suggestions.
+        @return:             List of command names, closest first.
+        """
+        if self._suggestionIndex is None:
+            words = self._commandWords.keys() + self._aliases.keys()
+            self._suggestionIndex = BKTree(words)
+
+        suggestions = []
+        for distance, word in self._suggestionIndex.search(text, maxDistance):
+            #Suggest the command an alias stands for
+            name = self._aliases.get(word, word)
+            if name not in suggestions:
+                suggestions.append(name)
+            if len(suggestions) == limit:
+                break
+
+        return suggestions
+
+    def getVersion(self):
+        """
+        Returns version number, which changes whenever commands
+        or aliases are added or removed.
+        """
+        return self._version
 
     def getCommand(self, name):
         """
@@ -66,6 +154,15 @@ class CommandWords(object):
             errorMsg = "Cannot remove '%s' from CommandWords; command not recognized." % name
             raise AssertionError(errorMsg)
         del self._commandWords[name]
+        self._trie.remove(name)
+        self._suggestionIndex = None
+        self._version += 1
+
+        #Remove command's aliases
+        for alias, aliasName in self._aliases.items():
+            if aliasName == name:
+                del self._aliases[alias]
+                self._trie.remove(alias)
 
     def isCommand(self, name):
         """
@@ -76,5 +173,5 @@ class CommandWords(object):
         @return:        True if command has been defined,
                         False otherwise.
         """
-        exists = name in self._commandWords.keys()
+        exists = name in self._commandWords
         return exists
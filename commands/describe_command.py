@@ -5,7 +5,11 @@ from space import Space
 from player import Player
 from cities.city import City
 from unique_place import UniquePlace
+from util.render_cache import RenderCache
+import constants
 
+#Space descriptions, shared by all players; the most recently described
+_renderCache = RenderCache(constants.RENDER_CACHE_SIZE)
 
 class DescribeCommand(Command):
     """
@@ -24,11 +28,28 @@ class DescribeCommand(Command):
         
         self._player = player
 
-    def execute(self):
+    def execute(self, arguments = None):
         """
         Runs Describe command.
+
+        The description is shared by all players and only rebuilt when
+        the space's contents change.
         """
+        io = self._player.getIO()
         location = self._player.getLocation()
+
+        text = _renderCache.render(location, location.getVersion(),
+                lambda: self._render(location))
+        io.output(text)
+
+    def _render(self, location):
+        """
+        Builds description of a space.
+
+        @param location:    Space to describe.
+        @return:            List of lines.
+        """
+        lines = []
         locationName = location.getName()
         description = location.getDescription()
         items = location.getItems()
@@ -37,40 +58,42 @@ class DescribeCommand(Command):
         uniquePlace = location.getUniquePlace()
         
         #Give space name and description
-        print "%s: %s" % (locationName, description)
+        lines.append("%s: %s" % (locationName, description))
 
         #If there are no cities or uniquePlaces in this space
         if not city and not uniquePlace:
-            print "%s has no places for you to enter!" % locationName
+            lines.append("%s has no places for you to enter!" % locationName)
 
         #If there is at least 1 city or uniquePlace
         else:
-            print "The following are contained in %s: \n" % locationName
+            lines.append("The following are contained in %s: \n" % locationName)
 
             #If space has one city:
             if isinstance(city, City):
                 cityName = city.getName()
-                print "%s" % cityName
+                lines.append("%s" % cityName)
             
             #If space has multiple cities (and the variable city is actually a list of cities):
             elif isinstance(city, list):
                 for eachCity in city:
                     eachCityName = eachCity.getName()
-                    print "%s" % eachCityName
+                    lines.append("%s" % eachCityName)
 
             #If space has one uniquePlace object
             if isinstance(uniquePlace, UniquePlace):
                 uniquePlaceName = uniquePlace.getName() 
-                print "%s" % uniquePlaceName           
+                lines.append("%s" % uniquePlaceName)
             
             #If space has multiple uniquePlaces (the the variable uniquePlace is actually a list of uniquePlaces)
             if isinstance(uniquePlace, list):
                 for eachUniquePlace in uniquePlace:
                     eachUniquePlaceName = eachUniquePlace.getName()
-                    print "%s" % eachUniquePlaceName
+                    lines.append("%s" % eachUniquePlaceName)
         
         #If space has items
         if len(itemsList) > 0:
-            print "\nItems contained in %s:" % locationName
+            lines.append("\nItems contained in %s:" % locationName)
             for item in itemsList:
-                print "\t%s" % item.getName()
+                lines.append("\t%s" % item.getName())
+
+        return lines
@@ -1,6 +1,7 @@
 #!/usr/bin/python
 
 from command import Command
+from util.helpers import splitQuantity, stackLabel
 
 class DropCommand(Command):
     """
@@ -19,40 +20,54 @@ class DropCommand(Command):
 
         self._player = player
 
-    def execute(self):
+    def execute(self, arguments = None):
         """
         Drops an item from inventory into room.
+
+        @keyword arguments: (Optional) Name of item to drop, optionally
+                            preceded by a quantity (e.g. "3 potion").
         """
+        io = self._player.getIO()
         name = self._player.getName()
         inventory = self._player.getInventory()
         
-        #Print inventory contents
-        print "The following may be dropped by %s:" % name
-        for item in inventory:
-            print "\t%s" % item.getName()
-        print ""
-        
-        itemToRemove = raw_input("Which item do you want to drop? \n")
-        print ""
+        itemToRemove = arguments
+        if itemToRemove is None:
+            #Print inventory contents
+            io.output("The following may be dropped by %s:" % name)
+            for item in inventory:
+                io.output("\t%s" % stackLabel(item, inventory.getCount(item)))
+            io.output()
+            
+            itemToRemove = io.readLine("Which item do you want to drop? \n")
+        io.output()
+        quantity, itemToRemove = splitQuantity(itemToRemove)
         
         #Create references
-        equipped = self._player.getEquipped()
         item = inventory.getItemByName(itemToRemove)
 
         #Checks if item is in inventory
         if not item:
-            print "%s is not in your inventory!" % itemToRemove
+            io.output("%s is not in your inventory!" % itemToRemove)
             return
 
-        print "Dropping %s" % itemToRemove
-        print "Unequipping %s" % itemToRemove
-        
-        inventory.removeItem(item)
+        count = inventory.getCount(item)
+        if quantity < 1 or quantity > count:
+            io.output("You do not have %s %s!" % (quantity, itemToRemove))
+            return
+
+        if quantity == 1:
+            io.output("Dropping %s" % itemToRemove)
+        else:
+            io.output("Dropping %s %s" % (quantity, itemToRemove))
+
+        #Unequips item if none are left
+        if quantity == count and self._player.getEquipped().containsItem(item):
+            io.output("Unequipping %s" % itemToRemove)
+            self._player.unequip(item)
         
-        #If item is currently equipped
-        if equipped.containsItem(item):
-            equipped.removeItem(item)
+        inventory.removeItem(item, quantity)
         
         #Adds item to space
         location = self._player.getLocation()
-        location.addItem(item)
+        location.addItem(item, quantity)
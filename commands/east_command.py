@@ -2,6 +2,15 @@
 
 from command import Command
 
+#Printed before moving East, as a single block
+ARROW = "\n".join([
+    "--------------------------------",
+    "         Moving East",
+    "      ----------------->        ",
+    "",
+    "--------------------------------",
+    ])
+
 class EastCommand(Command):
     """
     East command.
@@ -19,21 +28,19 @@ class EastCommand(Command):
 
         self._player = player
 
-    def execute(self):
+    def execute(self, arguments = None):
         """
         Run east command.
         """
+        io = self._player.getIO()
+
         #Make sure there is an east exit
         if not self._player.canMoveEast():
-            print "Cannot move East."
+            io.output("Cannot move East.")
             return
 
         #Move East
-        print "--------------------------------"
-        print "         Moving East"
-        print "      ----------------->        "
-        print ""
-        print "--------------------------------"
+        io.output(ARROW)
 
         self._player.moveEast()
 
@@ -41,5 +48,5 @@ class EastCommand(Command):
         name = space.getName()
         description = space.getDescription()
         
-        print "Welcome to %s." % name 
-        print description 
+        io.output("Welcome to %s." % name)
+        io.output(description)
@@ -25,6 +25,7 @@ class EnterCommand(Command):
         """
         Displays the possible places (Cities or UniquePlaces) that player may enter
         """
+        io = self._player.getIO()
         playerName = self._player.getName()
         space = self._player.getLocation()
         city = space.getCity()
@@ -32,27 +33,27 @@ class EnterCommand(Command):
         
         #If there are no cities or uniquePlaces
         if not (city or uniquePlace):
-            print "No places to enter."
+            io.output("No places to enter.")
         #Otherwise print the possible places to enter
         else:
             if isinstance(city, City):
-                print "%s may enter the following city:" % playerName
-                print "\t%s" % city.getName()
+                io.output("%s may enter the following city:" % playerName)
+                io.output("\t%s" % city.getName())
             elif isinstance(city, list):
-                print "%s may enter the following cities:" % playerName
+                io.output("%s may enter the following cities:" % playerName)
                 for eachCity in city:
-                    print "\t%s" % eachCity.getName()
-                print ""
+                    io.output("\t%s" % eachCity.getName())
+                io.output()
 
         #Display uniquePlaces that player may enter
             if isinstance(uniquePlace, UniquePlace):
-                print "%s may also enter the following:" % playerName
-                print "\t%s" % uniquePlace.getName()
+                io.output("%s may also enter the following:" % playerName)
+                io.output("\t%s" % uniquePlace.getName())
             elif isinstance(uniquePlace, list):
-                print "%s may also enter the following:" % playerName
+                io.output("%s may also enter the following:" % playerName)
                 for eachUniquePlace in uniquePlace:
-                    print "\t%s" % eachUniquePlace.getName()
-                print ""
+                    io.output("\t%s" % eachUniquePlace.getName())
+                io.output()
     
     def _createDictionaryOfPlaces(self):
         """
@@ -80,15 +81,27 @@ class EnterCommand(Command):
         
         return dictionary
     
-    def execute(self):
+    def execute(self, arguments = None):
         """
         Allows player to enter a city or uniquePlace.
+
+        @keyword arguments: (Optional) Name of place to enter.
         """
-        #Show the places that player may enter
-        self._displayPlacesToEnter()
-        
+        io = self._player.getIO()
+
         #Create a dictionary of places within space. Keys are the names of places that reference the actual places
         dictionary = self._createDictionaryOfPlaces()
+
+        #If player named the place, enter it without prompting
+        if arguments is not None:
+            if arguments in dictionary:
+                dictionary[arguments].enter(self._player)
+            else:
+                io.output("There is no %s here." % arguments)
+            return
+
+        #Show the places that player may enter
+        self._displayPlacesToEnter()
         
         space = self._player.getLocation()
         city = space.getCity()
@@ -98,13 +111,13 @@ class EnterCommand(Command):
         if not (city or uniquePlace):
             return
         #Entering the place that the player chooses to enter
-        placeToEnter = raw_input("Which of these would you like to enter?\n")
+        placeToEnter = io.readLine("Which of these would you like to enter?\n")
         while (placeToEnter not in dictionary.keys()) or placeToEnter == 'stop':
             if placeToEnter == 'stop':
                 break 
-            print "\nThat name does not match the names of any of the places here."
-            print "Try again, or type 'stop' to stop entering a place.\n"
-            placeToEnter = raw_input("Which of these would you like to enter?\n")
+            io.output("\nThat name does not match the names of any of the places here.")
+            io.output("Try again, or type 'stop' to stop entering a place.\n")
+            placeToEnter = io.readLine("Which of these would you like to enter?\n")
         else:
-            print "\n"
+            io.output("\n")
             dictionary[placeToEnter].enter(self._player)
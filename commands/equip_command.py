@@ -19,11 +19,16 @@ class EquipCommand(Command):
 
         self._player = player
 
-    def execute(self):
+    def execute(self, arguments = None):
         """
         Equips player with item in inventory.
+
+        @keyword arguments: (Optional) Name of item to equip.
         """
-        itemToEquip = raw_input("Which item do you want to equip? \n")
+        io = self._player.getIO()
+        itemToEquip = arguments
+        if itemToEquip is None:
+            itemToEquip = io.readLine("Which item do you want to equip? \n")
         
         inventory = self._player.getInventory()
         equipped = self._player.getEquipped()
@@ -32,13 +37,13 @@ class EquipCommand(Command):
         itemEquipment = equipped.getItemByName(itemToEquip)
         
         #Checks if item is in inventory and is not already equipped
-        print ""
+        io.output()
         if not itemInventory:
-            print "%s is not in your inventory!" % itemToEquip
+            io.output("%s is not in your inventory!" % itemToEquip)
             return
         
         if itemEquipment:
-            print "%s is already equipped!" % itemToEquip
+            io.output("%s is already equipped!" % itemToEquip)
             return
 
         #Equips player with item
@@ -1,38 +1,62 @@
 #!/usr/bin/python
 
 from command import Command
+from game_io import ConsoleIO
+from util.render_cache import RenderCache
+
+#Help text, per CommandWords object
+_renderCache = RenderCache()
 
 class HelpCommand(Command):
     """
     Help command.
     """
-    def __init__(self, name, explanation, commandWords):
+    def __init__(self, name, explanation, commandWords, io = None):
         """
         Initializes new help command.
         
         @param commandWords:        CommandWords used in game.
+        @keyword io:                (Optional) The player's input/output channel.
         """
         #Call parent's init method
         Command.__init__(self, name, explanation)
 
         self._commandWords = commandWords
 
-    def execute(self):
+        if io is None:
+            io = ConsoleIO()
+        self._io = io
+
+    def execute(self, arguments = None):
         """
         Run Help command.
+
+        The text is only rebuilt when commands are added or removed.
+        """
+        words = self._commandWords
+        text = _renderCache.render(words, words.getVersion(), self._render)
+        self._io.output(text)
+
+    def _render(self):
+        """
+        Builds help text.
+
+        @return:    List of lines.
         """
-        #Print header
-        print "--------------------------------"
-        print "Lord of the Rings Adventure Game"
-        print "--------------------------------"
-        print "The following commands may be used during the game:"
-        print ""
-
-        #Print help for each defined command
+        #Header
+        lines = ["--------------------------------",
+                 "Lord of the Rings Adventure Game",
+                 "--------------------------------",
+                 "The following commands may be used during the game:",
+                 ""]
+
+        #Help for each defined command
         words = self._commandWords
 
         names = words.getCommandNames() 
         for name in names:
             command = words.getCommand(name)
             explanation = command.getExplanation()
-            print "%s\t\t\t%s" % (name, explanation)
+            lines.append("%s\t\t\t%s" % (name, explanation))
+
+        return lines
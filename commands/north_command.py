@@ -2,6 +2,16 @@
 
 from command import Command
 
+#Printed before moving North, as a single block
+ARROW = "\n".join([
+    "--------------------------------",
+    "         Moving North",
+    "              /\                ",
+    "              ||                ",
+    "              ||                ",
+    "",
+    ])
+
 class NorthCommand(Command):
     """
     North command.
@@ -19,22 +29,19 @@ class NorthCommand(Command):
 
         self._player = player
 
-    def execute(self):
+    def execute(self, arguments = None):
         """
         Run North command.
         """
+        io = self._player.getIO()
+
         #Make sure there is a north exit
         if not self._player.canMoveNorth():
-            print "Cannot move North."
+            io.output("Cannot move North.")
             return
 
         #Move North
-        print "--------------------------------"
-        print "         Moving North"
-        print "              /\                "
-        print "              ||                "
-        print "              ||                "
-        print ""
+        io.output(ARROW)
 
         self._player.moveNorth()
 
@@ -42,5 +49,5 @@ class NorthCommand(Command):
         name = space.getName()
         description = space.getDescription()
         
-        print "Welcome to %s." % name 
-        print description 
+        io.output("Welcome to %s." % name)
+        io.output(description)
@@ -0,0 +1,44 @@
+#!/usr/bin/python
+
+from command import Command
+
+class PerfCommand(Command):
+    """
+    Admin command showing command latencies.
+    """
+    def __init__(self, name, explanation, player, latencyStats):
+        """
+        Initializes new perf command.
+
+        @param name:         Command name.
+        @param explanation:  Explanation of command.
+        @param player:       The player object.
+        @param latencyStats: LatencyStats to display.
+        """
+        #Call parent's init method
+        Command.__init__(self, name, explanation)
+
+        self._player = player
+        self._latencyStats = latencyStats
+
+    def execute(self, arguments = None):
+        """
+        Displays count and p50/p95/p99/max latency (in ms) for each command.
+
+        @keyword arguments: (Optional) 'reset' to discard recorded latencies.
+        """
+        io = self._player.getIO()
+
+        if arguments == "reset":
+            self._latencyStats.reset()
+            io.output("Latencies reset.")
+            return
+
+        lines = self._latencyStats.getReport()
+        if len(lines) == 1:
+            io.output("No commands recorded yet.")
+            return
+
+        io.output("Command latencies (ms):")
+        for line in lines:
+            io.output(line)
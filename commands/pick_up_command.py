@@ -1,6 +1,7 @@
 #!/usr/bin/python
 
 from command import Command
+from util.helpers import splitQuantity, stackLabel
 
 class PickUpCommand(Command):
     """
@@ -19,32 +20,45 @@ class PickUpCommand(Command):
 
         self._player = player
 
-    def execute(self):
+    def execute(self, arguments = None):
         """
         Picks up an item from a room and adds it to inventory.
+
+        @keyword arguments: (Optional) Name of item to pick up, optionally
+                            preceded by a quantity (e.g. "3 potion").
         """
+        io = self._player.getIO()
         name = self._player.getName()
         location = self._player.getLocation()
         locationItems = location.getItems()
 
-        #Prompt player for item selection
-        print "The following may be picked up by %s:" % name
-        for item in locationItems:
-            print "\t%s" % item.getName()
-        print ""
-        
-        itemToAdd = raw_input("Which item do you want to pick up? ")
+        itemToAdd = arguments
+        if itemToAdd is None:
+            #Prompt player for item selection
+            io.output("The following may be picked up by %s:" % name)
+            for item in locationItems:
+                io.output("\t%s" % stackLabel(item, locationItems.getCount(item)))
+            io.output()
+            
+            itemToAdd = io.readLine("Which item do you want to pick up? ")
+        quantity, itemToAdd = splitQuantity(itemToAdd)
         item = locationItems.getItemByName(itemToAdd)
         
         if not item:
-            print "%s does not contain item." % space.getName()
+            io.output("%s does not contain item." % location.getName())
+            return
+        if quantity < 1 or quantity > locationItems.getCount(item):
+            io.output("%s does not contain %s %s." % (location.getName(), quantity, itemToAdd))
             return
 
         #Adds item to inventory
         inventory = self._player.getInventory()
-        inventory.addItem(item)
-        print ""
-        print "Added %s to inventory." % item.getName()
+        inventory.addItem(item, quantity)
+        io.output()
+        if quantity == 1:
+            io.output("Added %s to inventory." % item.getName())
+        else:
+            io.output("Added %s %s to inventory." % (quantity, item.getName()))
 
         #Removes item from space
-        location.removeItem(item)
+        location.removeItem(item, quantity)
@@ -1,27 +1,43 @@
 #!/usr/bin/python
 
 from command import Command
+from game_io import ConsoleIO
 import constants
+import sys
 
 class QuitCommand(Command):
     """
     Quit command.
     """
-    def __init__(self, name, explanation):
+    def __init__(self, name, explanation, io = None, latencyStats = None):
         """
         Initializes new quit command.
+
+        @keyword io:            (Optional) The player's input/output channel.
+        @keyword latencyStats:  (Optional) LatencyStats to write to
+                                PERF_REPORT_FILE when quitting.
         """
         #Call parent's init method
         Command.__init__(self, name, explanation)
 
-    def execute(self):
+        if io is None:
+            io = ConsoleIO()
+        self._io = io
+        self._latencyStats = latencyStats
+
+    def execute(self, arguments = None):
         """
         Run Help command.
         """
+        io = self._io
+
         #Confirm quit
-        response = raw_input( "Are you sure you want to quit? (yes/no): ")
+        response = io.readLine("Are you sure you want to quit? (yes/no): ")
         response = response.strip().lower()
 
         if 'yes' in response:
-            print "Exiting...."
-            exit(0)
+            if self._latencyStats:
+                self._latencyStats.writeReport(constants.PERF_REPORT_FILE)
+            io.output("Exiting....")
+            io.flush()
+            sys.exit(0)
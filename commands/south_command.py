@@ -2,6 +2,16 @@
 
 from command import Command
 
+#Printed before moving South, as a single block
+ARROW = "\n".join([
+    "--------------------------------",
+    "         Moving South",
+    "              ||                ",
+    "              ||                ",
+    "              \/                ",
+    "",
+    ])
+
 class SouthCommand(Command):
     """
     South command.
@@ -19,22 +29,19 @@ class SouthCommand(Command):
 
         self._player = player
 
-    def execute(self):
+    def execute(self, arguments = None):
         """
         Run South command.
         """
+        io = self._player.getIO()
+
         #Make sure there is a south exit
         if not self._player.canMoveSouth():
-            print "Cannot move South."
+            io.output("Cannot move South.")
             return
 
         #Move South
-        print "--------------------------------"
-        print "         Moving South"
-        print "              ||                "
-        print "              ||                "
-        print "              \/                "
-        print ""
+        io.output(ARROW)
 
         self._player.moveSouth()
 
@@ -42,5 +49,5 @@ class SouthCommand(Command):
         name = space.getName()
         description = space.getDescription()
         
-        print "Welcome to %s." % name 
-        print description 
+        io.output("Welcome to %s." % name)
+        io.output(description)
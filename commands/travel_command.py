@@ -0,0 +1,68 @@
+#!/usr/bin/python
+
+from command import Command
+from constants import Direction
+
+class TravelCommand(Command):
+    """
+    Travel command. Moves the player to a named space by the
+    shortest route, in a single turn.
+    """
+    def __init__(self, name, explanation, player, world):
+        """
+        Initializes new travel command.
+
+        @param name:            Command's name.
+        @param explanation:     Description of what command does.
+        @param player:          The player object.
+        @param world:           The World, to find spaces and routes in.
+        """
+        #Call parent's init method
+        Command.__init__(self, name, explanation)
+
+        self._player = player
+        self._world = world
+
+    def execute(self, arguments = None):
+        """
+        Runs travel command.
+
+        @keyword arguments: (Optional) Name of space to travel to,
+                            optionally preceded by 'to'.
+        """
+        io = self._player.getIO()
+        destination = arguments
+        if destination is None:
+            destination = io.readLine("Where would you like to travel to? \n")
+        if destination.lower().startswith("to "):
+            destination = destination[3:]
+
+        spaces = self._world.findSpaces(destination)
+        if not spaces:
+            io.output("There is no place called %s." % destination)
+            return
+
+        #Of several spaces with that name, travel to the closest
+        location = self._player.getLocation()
+        pathfinder = self._world.getPathfinder()
+        path = None
+        for space in spaces:
+            route = pathfinder.findPath(location, space)
+            if route is not None and (path is None or len(route) < len(path)):
+                path = route
+        if path is None:
+            io.output("Cannot find a way to %s." % spaces[0].getName())
+            return
+        if not path:
+            io.output("You are already in %s." % location.getName())
+            return
+
+        moves = {Direction.NORTH : self._player.moveNorth, Direction.SOUTH : self._player.moveSouth,
+                 Direction.EAST : self._player.moveEast, Direction.WEST : self._player.moveWest}
+        io.output("Traveling %s." % ", ".join(path))
+        for direction in path:
+            moves[direction]()
+
+        space = self._player.getLocation()
+        io.output("Welcome to %s." % space.getName())
+        io.output(space.getDescription())
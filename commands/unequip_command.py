@@ -19,11 +19,16 @@ class UnequipCommand(Command):
 
         self._player = player
 
-    def execute(self):
+    def execute(self, arguments = None):
         """
         Unequips player with item in inventory.
+
+        @keyword arguments: (Optional) Name of item to unequip.
         """
-        itemToUnequip = raw_input("Which item do you want to unequip? \n")
+        io = self._player.getIO()
+        itemToUnequip = arguments
+        if itemToUnequip is None:
+            itemToUnequip = io.readLine("Which item do you want to unequip? \n")
         inventory = self._player.getInventory()
         equipped = self._player.getEquipped()
         
@@ -32,11 +37,11 @@ class UnequipCommand(Command):
         
         #Checks if item is in inventory and is currently equipped
         if not itemInventory:
-            print "%s is not in your inventory!" % itemToUnequip
+            io.output("%s is not in your inventory!" % itemToUnequip)
             return
         
         if not itemEquipment:
-            print "%s is not currently equipped!" % itemToUnequip
+            io.output("%s is not currently equipped!" % itemToUnequip)
             return
 
         #Equips player with item
@@ -2,6 +2,15 @@
 
 from command import Command
 
+#Printed before moving West, as a single block
+ARROW = "\n".join([
+    "--------------------------------",
+    "         Moving West",
+    "      <-----------------        ",
+    "",
+    "--------------------------------",
+    ])
+
 class WestCommand(Command):
     """
     West command.
@@ -19,21 +28,19 @@ class WestCommand(Command):
 
         self._player = player
 
-    def execute(self):
+    def execute(self, arguments = None):
         """
         Run west command.
         """
+        io = self._player.getIO()
+
         #Make sure there is a west exit
         if not self._player.canMoveWest():
-            print "Cannot move west."
+            io.output("Cannot move west.")
             return
 
         #Move West
-        print "--------------------------------"
-        print "         Moving West"
-        print "      <-----------------        "
-        print ""
-        print "--------------------------------"
+        io.output(ARROW)
 
         self._player.moveWest()
 
@@ -41,5 +48,5 @@ class WestCommand(Command):
         name = space.getName()
         description = space.getDescription()
         
-        print "Welcome to %s." % name 
-        print description 
+        io.output("Welcome to %s." % name)
+        io.output(description)
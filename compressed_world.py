@@ -0,0 +1,90 @@
+#!/usr/bin/python
+
+"""
+Keeps a world's long descriptions compressed in memory.
+
+Most space and city descriptions are read only when a player arrives
+or looks around. compressWorld() replaces them by zlib-compressed
+copies; getDescription() decompresses them again (see
+shared_world.resolveText()), keeping the most recently used texts in a
+bounded cache so players moving back and forth do not pay twice.
+"""
+
+import zlib
+from collections import OrderedDict
+
+import constants
+
+class CompressedText(str):
+    """
+    A zlib-compressed text. Kept apart from ordinary strings by its type.
+    """
+    __slots__ = ()
+
+#Decompressed texts, least recently used first
+_cache = OrderedDict()
+_cacheSize = constants.DESCRIPTION_CACHE_SIZE
+
+def compressText(text):
+    """
+    Compresses a text, unless that would not make it smaller.
+
+    @param text:    String.
+    @return:        CompressedText, or text as it was.
+    """
+    compressed = zlib.compress(text, 9)
+    if len(compressed) >= len(text):
+        return text
+    return CompressedText(compressed)
+
+def decompressText(text):
+    """
+    Returns the original of a compressed text.
+
+    @param text:    CompressedText.
+    @return:        String.
+    """
+    original = _cache.pop(text, None)
+    if original is None:
+        original = zlib.decompress(text)
+        if len(_cache) >= _cacheSize:
+            _cache.popitem(last=False)
+    _cache[text] = original
+    return original
+
+def compressWorld(world, cacheSize = None):
+    """
+    Compresses the descriptions of a world's spaces and cities (and city
+    greetings, if long enough to shrink); equal texts share one copy.
+
+    shared_world.shareWorld() keeps texts in memory shared between
+    processes instead, and stores them uncompressed; sharing a
+    compressed world undoes the compression.
+
+    @param world:       The World.
+    @keyword cacheSize: (Optional) Number of decompressed texts to keep.
+                        By default, constants.DESCRIPTION_CACHE_SIZE.
+    @return:            Memory saved (in bytes, not counting the cache).
+    """
+    global _cacheSize
+    if cacheSize is not None:
+        if cacheSize < 1:
+            errorMsg = "Cache size must be at least 1; got %s." % cacheSize
+            raise AssertionError(errorMsg)
+        _cacheSize = cacheSize
+        _cache.clear()
+
+    compressed = {}
+    saved = [0]
+    def compress(text):
+        if text not in compressed:
+            compressed[text] = compressText(text)
+            saved[0] += len(text) - len(compressed[text])
+        return compressed[text]
+
+    places = world.getSpaces()
+    places.extend(world.getCity(cityId) for cityId in world.getCityIds())
+    for place in places:
+        place.shareText(compress)
+
+    return saved[0]
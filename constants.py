@@ -10,6 +10,48 @@ CURRENCY = "rubles"
 
 #TODO: Define currency here. Have other classes reference the currency string given here.
 
+#World data file (relative to the game's directory)
+WORLD_FILE = "data/world.json"
+#Snapshots are rebuilt by themselves when the source of a module whose
+#classes they hold changes (see game_loader.getWorld()). Increment when
+#the world is built differently without such a change (e.g. changes to
+#game_loader.buildWorld() or to the factories), or when the snapshot
+#file format changes
+WORLD_SNAPSHOT_VERSION = 11
+
+#Worlds with at most this many spaces get a precomputed next-hop table
+#for pathfinding (it takes one byte per pair of spaces)
+NEXT_HOP_MAX_SPACES = 500
+#Number of decompressed descriptions kept when descriptions are
+#compressed (see compressed_world.py)
+DESCRIPTION_CACHE_SIZE = 256
+#Number of rendered space descriptions kept by the describe command;
+#bounded, so that compressed descriptions do not stay resident
+#uncompressed once described
+RENDER_CACHE_SIZE = 256
+#Maximum number of spaces in a region paged out of memory as a whole,
+#and memory budget (in bytes) for loaded regions (see region_pager.py)
+REGION_SIZE = 64
+REGION_MEMORY_BUDGET = 64 * 1024 * 1024
+
+#Parser constants
+SUGGESTION_MAX_DISTANCE = 2
+SUGGESTION_LIMIT = 3
+
+#File that command latencies are written to when quitting
+PERF_REPORT_FILE = "perf_report.txt"
+
+#Server constants
+SERVER_HOST = "localhost"
+SERVER_PORT = 4000
+SERVER_BACKLOG = 1024
+SERVER_POLL_TIMEOUT = 30.0
+SESSION_STACK_SIZE = 256 * 1024
+#Forked workers run a full garbage collection only after this many
+#collections of the younger generations (Python's default is 10); a full
+#collection writes to every object, copying the world into the worker
+WORKER_GC_FULL_THRESHOLD = 1000
+
 #Character initialization
 STARTING_EXPERIENCE = 0
 STARTING_EQUIPMENT = []
@@ -4,22 +4,47 @@ import random
 from items.weapon import Weapon
 from items.armor import Armor
 from items.potion import Potion
+from util.string_table import StringTable
 import constants
 
-def getItems(numItems, quality):
+#Item names are built by concatenation and repeat across thousands
+#of items; each distinct name is kept once
+itemText = StringTable()
+
+#Generated items are often identical (e.g. dozens of "Light Potion of
+#Healing"); identical items share one object, so that they stack
+#(see ItemSet) without holding a copy per unit
+itemTemplates = {}
+
+def _getTemplate(item):
+    """
+    Returns the item generated earlier that is identical to item,
+    or item itself if there is none.
+
+    @param item:    A newly generated item.
+    @return:        An identical item.
+    """
+    return itemTemplates.setdefault(item.getStackKey(), item)
+
+def getItems(numItems, quality, rand = None):
     """
     Generates random items for shop.
 
     @param numItems:     The number of items to generate
     @param quality:      Integer from 1-20 that determines quality of items generated.
+    @keyword rand:       (Optional) random.Random instance to draw from, for
+                         repeatable stock. By default, uses the random module.
     @return:             A list of randomly generated item objects.
     """
+    if rand is None:
+        rand = random
+
     items = []
     for item in range(numItems):
         #Generate random numbers for item generation
-        randType = random.random()
-        randWeaponType = random.random()
-        randDesc = random.random()
+        randType = rand.random()
+        randWeaponType = rand.random()
+        randDesc = rand.random()
 
         #Generate items and append to items list
         if randType < .3:
@@ -81,7 +106,7 @@ def genWeapon(quality, randWeaponType, randDesc):
         damage = 4
 
     #Concatenate name
-    totalName = prefix + " " + type + " " + suffix
+    totalName = itemText.intern(prefix + " " + type + " " + suffix)
 
     #Generate weapon description
     description = genWeaponDescription(randDesc)
@@ -90,7 +115,7 @@ def genWeapon(quality, randWeaponType, randDesc):
     cost = quality * constants.WEAPON_COST
             
     #Generate weapon
-    weapon = Weapon(totalName, description, weight, damage, cost)
+    weapon = _getTemplate(Weapon(totalName, description, weight, damage, cost))
     return weapon
 
 #Generate weapon description
@@ -170,7 +195,7 @@ def genArmor(quality, randDesc):
         defense = 5
                 
     #Concatentate name
-    name = prefix + " " + type + " " + suffix
+    name = itemText.intern(prefix + " " + type + " " + suffix)
 
     #Generate description
     description = genArmorDescription(randDesc)
@@ -179,7 +204,7 @@ def genArmor(quality, randDesc):
     cost = quality * constants.ARMOR_COST
             
     #Generate armor
-    armor = Armor(name, description, weight, defense, cost)
+    armor = _getTemplate(Armor(name, description, weight, defense, cost))
 
     return armor
 
@@ -242,7 +267,7 @@ def genPotion(quality, randDesc):
         cost = 8
 
     #Concatenate name
-    name = prefix + " Potion of Healing"
+    name = itemText.intern(prefix + " Potion of Healing")
 
     #Generate description
     description = genPotionDescription(randDesc)
@@ -251,7 +276,7 @@ def genPotion(quality, randDesc):
     weight = 1
             
     #Generate potion
-    potion = Potion(name, description, weight, healing, cost)
+    potion = _getTemplate(Potion(name, description, weight, healing, cost))
     
     return potion
 
@@ -0,0 +1,157 @@
+#!/usr/bin/python
+
+import random
+from space import Space
+from world import World
+from cities.city import City
+from cities.inn import Inn
+from cities.shop import Shop
+import factories.shop_factory
+from constants import Direction
+
+#Shared by all generated spaces and places, so that large worlds
+#do not store a copy per object
+SPACE_DESCRIPTION = "Rolling hills and scattered woods, much like the last."
+CITY_DESCRIPTION = "A small town on the road."
+CITY_GREETING = "Welcome, traveler."
+INN_DESCRIPTION = "A modest inn."
+INN_GREETING = "Rooms for the night"
+SHOP_DESCRIPTION = "A general store."
+SHOP_GREETING = "Take a look around"
+
+#Highest quality generated; shop_factory gives quality 15+ armor zero
+#weight, which Item does not accept
+MAX_QUALITY = 14
+
+DIRECTIONS = [Direction.NORTH, Direction.SOUTH, Direction.EAST, Direction.WEST]
+OPPOSITES = {Direction.NORTH : Direction.SOUTH, Direction.SOUTH : Direction.NORTH,
+             Direction.EAST : Direction.WEST, Direction.WEST : Direction.EAST}
+
+def getGridWorld(width, height, cityDensity = 0.0, shopDensity = 0.0, itemDensity = 0.0, seed = 0):
+    """
+    Generates a rectangular world in which every space connects to its
+    neighbors to the north, south, east and west.
+
+    @param width:           Number of spaces from west to east.
+    @param height:          Number of spaces from north to south.
+    @keyword cityDensity:   (Optional) Fraction of spaces with a city.
+    @keyword shopDensity:   (Optional) Fraction of cities with a shop.
+    @keyword itemDensity:   (Optional) Fraction of spaces with an item.
+    @keyword seed:          (Optional) Seed; the same seed generates the same world.
+    @return:                World starting in the north-western space. Everything
+                            is registered under its name.
+    """
+    if width < 1 or height < 1:
+        errorMsg = "Grid world must have at least one space."
+        raise AssertionError(errorMsg)
+
+    rand = random.Random(seed)
+    world = World()
+    previousRow = None
+    for y in range(height):
+        row = []
+        west = None
+        for x in range(width):
+            name = "Space %s,%s" % (x, y)
+            space = _createSpace(world, name, rand, cityDensity, shopDensity, itemDensity)
+            if west is not None:
+                west.createExit(Direction.EAST, space)
+            if previousRow is not None:
+                previousRow[x].createExit(Direction.SOUTH, space)
+            row.append(space)
+            west = space
+        previousRow = row
+
+    world.setStart("Space 0,0")
+    return world
+
+def getRandomWorld(numSpaces, extraExits = 0.5, cityDensity = 0.0, shopDensity = 0.0,
+        itemDensity = 0.0, seed = 0):
+    """
+    Generates a connected world with randomly placed exits.
+
+    Spaces are first joined into a random tree, so every space can be
+    reached from every other. Then about extraExits * numSpaces more
+    exits are added between random pairs of spaces, forming loops.
+    Exits always work in both directions.
+
+    @param numSpaces:       Number of spaces.
+    @keyword extraExits:    (Optional) Exits to add per space beyond the tree.
+    @keyword cityDensity:   (Optional) Fraction of spaces with a city.
+    @keyword shopDensity:   (Optional) Fraction of cities with a shop.
+    @keyword itemDensity:   (Optional) Fraction of spaces with an item.
+    @keyword seed:          (Optional) Seed; the same seed generates the same world.
+    @return:                World starting in the first space generated. Everything
+                            is registered under its name.
+    """
+    if numSpaces < 1:
+        errorMsg = "Random world must have at least one space."
+        raise AssertionError(errorMsg)
+
+    rand = random.Random(seed)
+    world = World()
+    spaces = [_createSpace(world, "Space %s" % 0, rand, cityDensity, shopDensity, itemDensity)]
+
+    #Spaces that still have a free exit
+    openSpaces = [spaces[0]]
+
+    #Random spanning tree: attach each new space to an open space
+    for i in range(1, numSpaces):
+        space = _createSpace(world, "Space %s" % i, rand, cityDensity, shopDensity, itemDensity)
+        index = rand.randrange(len(openSpaces))
+        other = openSpaces[index]
+        direction = rand.choice(_getFreeDirections(other))
+        other.createExit(direction, space)
+
+        #Remove full spaces by swapping with last
+        if not _getFreeDirections(other):
+            openSpaces[index] = openSpaces[-1]
+            openSpaces.pop()
+        spaces.append(space)
+        openSpaces.append(space)
+
+    #Extra exits; pairs without matching free exits are skipped
+    for i in range(int(extraExits * numSpaces)):
+        space = rand.choice(spaces)
+        other = rand.choice(spaces)
+        if space is other:
+            continue
+        free = [direction for direction in _getFreeDirections(space)
+                if other.getExit(OPPOSITES[direction]) is None]
+        if free:
+            space.createExit(rand.choice(free), other)
+
+    world.setStart("Space 0")
+    return world
+
+def _getFreeDirections(space):
+    """
+    Returns directions in which space has no exit.
+    """
+    return [direction for direction in DIRECTIONS if space.getExit(direction) is None]
+
+def _createSpace(world, name, rand, cityDensity, shopDensity, itemDensity):
+    """
+    Creates a space, with a city and an item depending on densities,
+    and registers them in world.
+    """
+    city = None
+    if cityDensity and rand.random() < cityDensity:
+        cityName = "%s Town" % name
+        buildings = [Inn("%s Inn" % cityName, INN_DESCRIPTION, INN_GREETING, rand.randint(1, 5))]
+        if shopDensity and rand.random() < shopDensity:
+            buildings.append(Shop("%s Shop" % cityName, SHOP_DESCRIPTION, SHOP_GREETING,
+                                  rand.randint(3, 8), rand.randint(1, MAX_QUALITY)))
+        city = City(cityName, CITY_DESCRIPTION, CITY_GREETING, buildings)
+        world.addCity(cityName, city)
+        for building in buildings:
+            world.addBuilding(building.getName(), building)
+
+    space = Space(name, SPACE_DESCRIPTION, city = city, graph = world.getGraph())
+    world.addSpace(name, space)
+
+    if itemDensity and rand.random() < itemDensity:
+        item = factories.shop_factory.getItems(1, rand.randint(1, MAX_QUALITY), rand)[0]
+        space.addItem(item)
+
+    return space
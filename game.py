@@ -1,32 +1,73 @@
 #!/usr/bin/python
 
 from parser import Parser
+from game_io import ConsoleIO
+from turn_pipeline import TurnPipeline
+from timeit import default_timer
+import traceback
+from util.latency import commandLatency
 import game_loader
 
 class Game(object):
     """
     Prepares and executes turn-based game.
     """
-    def __init__(self):
+    def __init__(self, world = None, io = None, admin = True):
         """
         Initializes new game.
+
+        @keyword world:     (Optional) World to play in. Sessions on a
+                            server share a single world; by default,
+                            a new world is loaded.
+        @keyword io:        (Optional) The player's input/output channel.
+                            By default, the game is played at the terminal.
+        @keyword admin:     (Optional) Whether the player may use admin
+                            commands (see game_loader.getCommandList()).
         """
+        if io is None:
+            io = ConsoleIO()
+        self._io = io
+
         #Initializes game objects
-        self._world = game_loader.getWorld()
+        if world is None:
+            world = game_loader.getWorld()
+        self._world = world
         startingInventory = game_loader.getStartingInventory()
-        self._player = game_loader.getPlayer(self._world, startingInventory)
-        self._commandList = game_loader.getCommandList(self._player)
+        self._player = game_loader.getPlayer(self._world, startingInventory, self._io)
+        self._commandList = game_loader.getCommandList(self._player, self._world, admin)
 
         #Creates parser
-        self._parser = Parser(self._commandList)
+        self._parser = Parser(self._commandList, self._io)
+
+        #Stages run around each command
+        self._pipeline = TurnPipeline()
+
+    def getPlayer(self):
+        """
+        Returns the player.
+        """
+        return self._player
+
+    def getWorld(self):
+        """
+        Returns the World being played in.
+        """
+        return self._world
+
+    def getPipeline(self):
+        """
+        Returns the turn pipeline, for registering stages
+        and reading turn timings.
+        """
+        return self._pipeline
 
     def play(self):
         """
         Executes main game loop.
         """
-        print "Welcome to Lord of the Rings Adventure Game!"
-        print "(Type 'help' for a list of available commands)"
-        print ""
+        self._io.output("Welcome to Lord of the Rings Adventure Game!")
+        self._io.output("(Type 'help' for a list of available commands)")
+        self._io.output()
 
         while(True):
             self._nextTurn()
@@ -34,12 +75,34 @@ class Game(object):
     def _nextTurn(self):
         """
         Executes next turn.
+
+        The turn's output stays buffered; it is sent together with
+        the next prompt. If the command fails, the player is told and
+        the game goes on. The command's latency, not counting time spent
+        waiting for follow-up input, is recorded in commandLatency.
+
+        @return:        The command that was executed.
         """
-        nextCommand = self._parser.getNextCommand()
+        nextCommand, arguments = self._parser.getNextCommand()
         
         if nextCommand is not None:
-            nextCommand.execute()
-            print ""
+            inputTime = self._io.getInputTime()
+            start = default_timer()
+            try:
+                self._pipeline.run(nextCommand, arguments)
+            except EOFError:
+                #Player disconnected
+                raise
+            except Exception:
+                #A failing command must not end the game, nor disconnect
+                #the player from a server; the error is logged
+                traceback.print_exc()
+                self._io.output("Something went wrong; '%s' was not completed." % nextCommand.getName())
+            finally:
+                elapsed = default_timer() - start - (self._io.getInputTime() - inputTime)
+                commandLatency.record(nextCommand.getName(), elapsed)
+            self._io.output()
+            return nextCommand
         else:
             errorMsg = "Failed to receive command from parser."
             raise AssertionError(errorMsg)
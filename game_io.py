@@ -0,0 +1,142 @@
+#!/usr/bin/python
+
+import sys
+from timeit import default_timer
+
+class GameIO(object):
+    """
+    Parent class for a player's input/output channel.
+
+    Output is buffered and sent in a single write when the channel
+    is flushed or when input is requested.
+    """
+    def __init__(self):
+        """
+        Initializes new channel.
+        """
+        self._buffer = []
+
+        #Seconds spent waiting for input
+        self._inputTime = 0.0
+
+    def output(self, text = ""):
+        """
+        Buffers a line of output.
+
+        @keyword text:      (Optional) Text to output. By default,
+                            outputs an empty line.
+        """
+        self._buffer.append(text)
+        self._buffer.append("\n")
+
+    def readLine(self, prompt = ""):
+        """
+        Flushes pending output and reads a line of input.
+
+        @keyword prompt:    (Optional) Prompt to display.
+
+        @return:            Line of input (without line terminator).
+                            Raises EOFError if no more input is available.
+        """
+        if prompt:
+            self._buffer.append(prompt)
+        self.flush()
+
+        start = default_timer()
+        try:
+            return self._readLine()
+        finally:
+            self._inputTime += default_timer() - start
+
+    def getInputTime(self):
+        """
+        Returns total time spent waiting for input, in seconds.
+        """
+        return self._inputTime
+
+    def flush(self):
+        """
+        Sends all pending output as a single write.
+        """
+        if not self._buffer:
+            return
+
+        data = "".join(self._buffer)
+        self._buffer = []
+        self._write(data)
+
+    def _write(self, data):
+        """
+        Sends output. Should be overridden by child classes.
+
+        @param data:        String to send.
+        """
+        pass
+
+    def _readLine(self):
+        """
+        Reads a line of input. Should be overridden by child classes.
+
+        @return:            Line of input (without line terminator).
+                            Raises EOFError if no more input is available.
+        """
+        raise EOFError()
+
+class ConsoleIO(GameIO):
+    """
+    Channel for a player at the terminal.
+    """
+    def _write(self, data):
+        sys.stdout.write(data)
+        sys.stdout.flush()
+
+    def _readLine(self):
+        return raw_input()
+
+class ScriptIO(GameIO):
+    """
+    Channel that reads input from a list of lines and keeps all output.
+    Used to run the game without a terminal.
+    """
+    def __init__(self, lines = None, keepOutput = True):
+        """
+        Initializes new scripted channel.
+
+        @keyword lines:      (Optional) Lines of input, in order.
+        @keyword keepOutput: (Optional) Set to False to discard output.
+        """
+        GameIO.__init__(self)
+
+        self._lines = list(lines or [])
+        self._position = 0
+        self._output = []
+        self._keepOutput = keepOutput
+
+    def addLine(self, line):
+        """
+        Appends a line of input to the script.
+
+        @param line:        Line of input.
+        """
+        self._lines.append(line)
+
+    def getOutput(self):
+        """
+        Returns all output sent so far.
+
+        @return:            Output, as a single string.
+        """
+        self.flush()
+        return "".join(self._output)
+
+    def _write(self, data):
+        if self._keepOutput:
+            self._output.append(data)
+
+    def _readLine(self):
+        if self._position >= len(self._lines):
+            raise EOFError()
+
+        line = self._lines[self._position]
+        self._position += 1
+        return line
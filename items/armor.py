@@ -37,6 +37,12 @@ class Armor(Item):
         """
         return self._cost
 
+    def getStackKey(self):
+        """
+        Returns a key that is equal for identical items (see Item).
+        """
+        return Item.getStackKey(self) + (self._defense, self._cost)
+
     def getType(self):
         """
         Returns the item's type.
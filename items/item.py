@@ -51,6 +51,16 @@ class Item(object):
         """
         return self._weight
 
+    def getStackKey(self):
+        """
+        Returns a key that is equal for identical items, which an
+        ItemSet keeps as one stack. Subclasses with more attributes
+        must add them.
+
+        @return:    Hashable key.
+        """
+        return (self.__class__, self._name, self._description, self._weight)
+
     def getType(self):
         """
         Returns the item's type.
@@ -2,9 +2,27 @@
 
 from items.item import Item
 
+def normalizeItemName(name):
+    """
+    Normalizes an item name for lookup: lowercase, with whitespace
+    collapsed. (e.g. "Light  Sword" becomes "light sword")
+
+    @param name:    Name to normalize.
+    @return:        Normalized name.
+    """
+    return " ".join(name.lower().split())
+
 class ItemSet(object):
     """
     A simple collection of items.
+
+    Identical items (see Item.getStackKey()) are kept as a stack: the
+    first one added, with a count. Iterating visits each stack once.
+
+    Items are indexed by normalized name (see normalizeItemName()), so
+    lookups by name take constant time. Several items may share a name.
+    Items are also kept grouped by ItemType. Items are kept in the order
+    added, and removed in constant time.
     """
     def __init__(self, itemSet=None):
         """
@@ -13,100 +31,193 @@ class ItemSet(object):
         @keyword itemSet:     (Optional) A single Item object or a
                                list of Item objects.
         """
-        self._items = []
+        self._items = _ItemList()
         self._weight = 0
 
+        #Maps stack key to number of items in stack
+        self._counts = {}
+        self._count = 0
+
+        #Maps normalized name to _ItemList of items with that name
+        self._byName = {}
+
+        #Maps ItemType to _ItemList of items of that type
+        self._byType = {}
+
+        #Incremented whenever items are added or removed
+        self._version = 0
+
         #Received single item
         if isinstance(itemSet, Item):
-            self._items.append(itemSet)
-            self._weight += itemSet.getWeight()
-            
+            self._add(itemSet, 1)
+
         #Received set of items
         elif isinstance(itemSet, list):
             for item in itemSet:
                 if not isinstance(item, Item):
                     errorMsg = "ItemSet initialized with list containing non-Item object(s)."
                     raise AssertionError(errorMsg)
-                self._items.append(item)
-                self._weight += int(item.getWeight())
+                self._add(item, 1)
 
-    def addItem(self, item):
+    def addItem(self, item, quantity = 1):
         """
-        Adds an item.
-
-        @precondition: Item's name must not be used
-        by any items already contained in ItemSet.
+        Adds an item. Other items may have the same name; identical
+        items are added to its stack.
 
-        @param item:    An item.
+        @param item:        An item.
+        @keyword quantity:  (Optional) Number of items to add.
         """
         #Check preconditions
         if not isinstance(item, Item):
             errorMsg = "ItemSet.addItem() passed non-Item object."
             raise AssertionError(errorMsg)
+        if quantity < 1:
+            errorMsg = "ItemSet.addItem() passed invalid quantity (%s)." % quantity
+            raise AssertionError(errorMsg)
 
-        self._items.append(item)
-        self._weight += int(item.getWeight())
+        self._add(item, quantity)
+        self._version += 1
+
+    def getVersion(self):
+        """
+        Returns version number, which changes whenever
+        items are added or removed.
+        """
+        return self._version
 
     def getItems(self):
         """
         Returns list of items contained by ItemSet.
 
-        @return:     List of items contained by ItemSet.
+        @return:     List of items contained by ItemSet,
+                     one per stack.
         """
-        return self._items
+        return self._items.getItems()
 
     def getItemByName(self, name):
         """
-        Gets an item with a given name.
+        Gets an item with a given name, ignoring case. If several
+        items have that name, returns the one added first.
 
         @param name:    Name of object.
         @return:        Item with given name.
                         Returns None if the item
                         cannot be found.
         """
-        for item in self._items:
-            if item.getName() == name:
-                return item
-        return None
-    
-    def removeItem(self, item):
+        items = self._byName.get(normalizeItemName(name))
+        if items is None:
+            return None
+        return items.getFirst()
+
+    def getItemsByName(self, name):
+        """
+        Gets all items with a given name, ignoring case.
+
+        @param name:    Name of objects.
+        @return:        List of items with given name, in the order
+                        added, one per stack (empty if there are none).
+        """
+        items = self._byName.get(normalizeItemName(name))
+        if items is None:
+            return []
+        return items.getItems()
+
+    def getItemsByType(self, itemType):
+        """
+        Gets all items of a given type.
+
+        @param itemType:    An ItemType (from constants).
+        @return:            List of items of that type, in the order
+                            added, one per stack (empty if there are none).
+        """
+        items = self._byType.get(itemType)
+        if items is None:
+            return []
+        return items.getItems()
+
+    def getFirstItemOfType(self, itemType):
+        """
+        Gets the item of a given type that was added first.
+
+        @param itemType:    An ItemType (from constants).
+        @return:            Item of that type, or None if there is none.
+        """
+        items = self._byType.get(itemType)
+        if items is None:
+            return None
+        return items.getFirst()
+
+    def getItemTypes(self):
+        """
+        Returns the ItemTypes of the items in this collection, sorted.
+        """
+        return sorted(self._byType)
+
+    def getCount(self, item):
+        """
+        Returns number of items identical to item (its stack's size).
+
+        @param item:    An item.
+        @return:        Number of identical items; 0 if there are none.
         """
-        Removes an item.
+        return self._counts.get(item.getStackKey(), 0)
 
-        @param item:    An item in this collection.
+    def removeItem(self, item, quantity = 1):
         """
-        self._items.remove(item)
-        self._weight -= int(item.getWeight())
-   
+        Removes an item, or several identical items.
+
+        @param item:        An item in this collection (or one identical to it).
+        @keyword quantity:  (Optional) Number of items to remove.
+        """
+        key = item.getStackKey()
+        count = self._counts.get(key, 0)
+        if quantity < 1 or quantity > count:
+            raise ValueError("Cannot remove %s of %s from ItemSet; it holds %s." % \
+                    (quantity, item.getName(), count))
+
+        self._weight -= int(item.getWeight()) * quantity
+        self._count -= quantity
+        self._version += 1
+        if quantity < count:
+            self._counts[key] = count - quantity
+            return
+
+        #Last of the stack
+        del self._counts[key]
+        self._items.remove(key)
+        for index, indexKey in ((self._byName, normalizeItemName(item.getName())), (self._byType, item.getType())):
+            items = index[indexKey]
+            items.remove(key)
+            if not items:
+                del index[indexKey]
+
     def containsItem(self, item):
         """
         Determines if item is contained in this collection.
 
         @param item:    An item.
-        @return:        True if item is in this collection, False otherwise.
+        @return:        True if item (or one identical to it) is in
+                        this collection, False otherwise.
         """
-        return (item in self._items)
+        return item.getStackKey() in self._counts
 
     def containsItemWithName(self, itemName):
         """
         Determines if item is contained in this collection.
-        
+
         @param itemName: Items's name
-        
+
         @return: True if item with givne name is present, False otherwise
         """
-        for item in self._items:
-            if item._name == itemName:
-                return True
-        return False
+        return normalizeItemName(itemName) in self._byName
 
     def count(self):
         """
         Returns the number of items.
 
-        @return:    Number of items.
+        @return:    Number of items, counting every item of a stack.
         """
-        return len(self._items)
+        return self._count
 
     def weight(self):
         """
@@ -114,10 +225,104 @@ class ItemSet(object):
 
         @return: Total weight of items.
         """
-        return self._weight 
- 
+        return self._weight
+
     def __iter__(self):
         """
-        Provides an iterator for this set of items.
+        Provides an iterator for this set of items, one per stack.
         """
         return iter(self._items)
+
+    def __contains__(self, item):
+        """
+        Supports the in operator; see containsItem().
+        """
+        return self.containsItem(item)
+
+    def _add(self, item, quantity):
+        """
+        Adds items to their stack, or starts a stack, updating weight,
+        count and the name and type indexes.
+        """
+        key = item.getStackKey()
+        self._weight += int(item.getWeight()) * quantity
+        self._count += quantity
+        count = self._counts.get(key)
+        if count is not None:
+            self._counts[key] = count + quantity
+            return
+
+        self._counts[key] = quantity
+        self._items.append(key, item)
+        for index, indexKey in ((self._byName, normalizeItemName(item.getName())), (self._byType, item.getType())):
+            items = index.get(indexKey)
+            if items is None:
+                items = index[indexKey] = _ItemList()
+            items.append(key, item)
+
+class _ItemList(object):
+    """
+    Items in the order added, removable by stack key in constant time.
+
+    A removed item leaves a hole (None) in the list, so other items keep
+    their positions; the list is compacted once half of it is holes.
+    """
+    __slots__ = ("_items", "_positions", "_first")
+
+    def __init__(self, items = ()):
+        #Items and holes
+        self._items = []
+
+        #Maps stack key of item to its position in _items
+        self._positions = {}
+
+        #Position before which there are only holes
+        self._first = 0
+
+        for item in items:
+            self.append(item.getStackKey(), item)
+
+    def append(self, key, item):
+        self._positions[key] = len(self._items)
+        self._items.append(item)
+
+    def remove(self, key):
+        position = self._positions.pop(key, None)
+        if position is None:
+            raise ValueError("Item not in ItemSet.")
+        self._items[position] = None
+        if len(self._positions) * 2 < len(self._items):
+            self._compact()
+
+    def getFirst(self):
+        items = self._items
+        while self._first < len(items):
+            if items[self._first] is not None:
+                return items[self._first]
+            self._first += 1
+        return None
+
+    def getItems(self):
+        return [item for item in self._items if item is not None]
+
+    def _compact(self):
+        #A new list, so iterators over the old one are not disturbed
+        self._items = self.getItems()
+        self._first = 0
+        self._positions = dict((item.getStackKey(), position) for position, item in enumerate(self._items))
+
+    def __iter__(self):
+        return (item for item in self._items if item is not None)
+
+    def __contains__(self, item):
+        return item.getStackKey() in self._positions
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __getstate__(self):
+        #Keys hold classes; they are computed again when unpickled
+        return self.getItems()
+
+    def __setstate__(self, items):
+        self.__init__(items)
@@ -37,6 +37,12 @@ class Potion(Item):
         """
         return self._cost
 
+    def getStackKey(self):
+        """
+        Returns a key that is equal for identical items (see Item).
+        """
+        return Item.getStackKey(self) + (self._healing, self._cost)
+
     def getType(self):
         """
         Returns the item's type.
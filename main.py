@@ -1,6 +1,32 @@
 #!/usr/bin/python
 
-from game import Game
+import argparse
 
-game = Game()
-game.play()
+import server
+
+argParser = argparse.ArgumentParser(description="Lord of the Rings Adventure Game.")
+argParser.add_argument("--server", action="store_true",
+                       help="Serve many players over TCP instead of playing in this terminal.")
+argParser.add_argument("--script", metavar="FILE",
+                       help="Play a command script (one line per input) without a terminal and report timings.")
+argParser.add_argument("--transcript", metavar="FILE",
+                       help="With --script, write the game's output to FILE.")
+server.addArguments(argParser, "With --server, ")
+args = argParser.parse_args()
+
+if args.server:
+    server.serve(argParser, args)
+elif args.script:
+    from batch_runner import BatchRunner
+    with open(args.script) as script:
+        lines = script.read().splitlines()
+    runner = BatchRunner(lines, keepOutput = args.transcript is not None)
+    runner.run()
+    if args.transcript:
+        with open(args.transcript, "w") as transcript:
+            transcript.write(runner.getOutput())
+    print runner.getReport()
+else:
+    from game import Game
+    game = Game()
+    game.play()
@@ -2,16 +2,20 @@
 
 import constants
 from commands.command_words import CommandWords
+from game_io import ConsoleIO
 
 class Parser(object):
     """
     Parses user input, searching for registered commands.
     """
-    def __init__(self, commandWords):
+    def __init__(self, commandWords, io = None):
         """
         Initializes new parser.
 
         @param commandWords:     List of commands.
+        @keyword io:             (Optional) Input/output channel to read
+                                 commands from. By default, reads from
+                                 the terminal.
         """
         if not commandWords:
             errorMsg = "Parser must be initialized with CommandWords object."
@@ -19,44 +23,81 @@ class Parser(object):
 
         self._commandWords = commandWords
 
+        if io is None:
+            io = ConsoleIO()
+        self._io = io
+
     def getNextCommand(self):
         """
         Retrieves next command from user.
+
+        The first word(s) of the input name the command; the rest of the
+        line is passed to the command as its arguments, so that
+        'equip Legendary Axe of Domination' needs no follow-up prompt.
+
+        @return:            Tuple of (command, arguments). arguments is
+                            None if the user typed the command alone.
+        """
+        userInput = self._io.readLine(constants.COMMAND_PROMPT)
+        name, arguments = self._splitCommand(userInput)
+
+        while not name:
+            self._io.output("Command '%s' not recognized. Type 'help' for help." % userInput.strip())
+            suggestions = self._getSuggestions(userInput)
+            if suggestions:
+                self._io.output("Did you mean: %s?" % ", ".join(suggestions))
+            self._io.output()
+
+            userInput = self._io.readLine(constants.COMMAND_PROMPT)
+            name, arguments = self._splitCommand(userInput)
+
+        command = self._commandWords.getCommand(name)
+        return (command, arguments)
+
+    def _splitCommand(self, userInput):
         """
-        userInput = raw_input(constants.COMMAND_PROMPT)
-        userInput = userInput.strip().lower()
-        
-        #If userInput is n, s, e, w then do northCommand, southCommand, etc.
-        if userInput == "n":
-            userInput = "north"
-        if userInput == "s":
-            userInput = "south"
-        if userInput == "e":
-            userInput = "east"
-        if userInput == "w":
-            userInput = "west"
+        Splits user input into a command name and its arguments.
+
+        The command name is matched case-insensitively and may span
+        several words (e.g. 'pick up'); the longest match wins. Aliases
+        and unambiguous prefixes are accepted (see CommandWords.resolve()).
+        Arguments keep their case.
 
-        while not self._commandRecognized(userInput):
-            print "Command '%s' not recognized. Type 'help' for help." % userInput
-            print ""
+        @param userInput:   Line of user input.
+        @return:            Tuple of (name, arguments). name is None if no
+                            command was recognized; arguments is None if
+                            nothing follows the command name.
+        """
+        words = userInput.split()
+        lowerWords = [word.lower() for word in words]
 
-            userInput = raw_input(constants.COMMAND_PROMPT)
-            userInput = userInput.strip().lower()
+        for count in range(len(words), 0, -1):
+            name = self._commandWords.resolve(" ".join(lowerWords[:count]))
+            if name:
+                arguments = " ".join(words[count:]) or None
+                return (name, arguments)
 
-        command = self._commandWords.getCommand(userInput)
-        return command
+        return (None, None)
 
-    def _commandRecognized(self, name):
+    def _getSuggestions(self, userInput):
         """
-        Helper method to determine if user
-        specified known command.
+        Suggests commands for unrecognized input.
+
+        Both the first word and the first two words are looked up, so
+        that typos in multi-word commands ('pik up') are also caught.
 
-        @param name:        Command's name 
-        @return:            True if recognized, False otherwise.
+        @param userInput:   Line of user input.
+        @return:            List of command names, closest first.
         """
-        #Make sure name is not None
-        if not name:
-            return False
+        words = userInput.lower().split()
+        if not words:
+            return []
+
+        suggestions = []
+        candidates = [" ".join(words[:2]), words[0]]
+        for candidate in candidates:
+            for name in self._commandWords.getSuggestions(candidate):
+                if name not in suggestions:
+                    suggestions.append(name)
 
-        recognized = self._commandWords.isCommand(name)
-        return recognized
+        return suggestions[:constants.SUGGESTION_LIMIT]
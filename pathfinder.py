@@ -0,0 +1,188 @@
+#!/usr/bin/python
+
+import heapq
+
+from space_graph import DIRECTIONS, NO_EXIT
+import constants
+
+#Marks spaces in a next-hop table that cannot reach the goal
+_NO_HOP = 255
+
+class Pathfinder(object):
+    """
+    Finds shortest routes between spaces of a SpaceGraph.
+
+    Routes are found by breadth-first search over space numbers, or by
+    A* if a heuristic is given. For small graphs, a table of the first
+    move from every space to every other space is computed on first use,
+    so that a route costs one table read per move. The table is rebuilt
+    when the graph's exits change.
+    """
+    def __init__(self, graph, nextHopLimit = constants.NEXT_HOP_MAX_SPACES):
+        """
+        Initializes new pathfinder.
+
+        @param graph:           SpaceGraph to find routes in.
+        @keyword nextHopLimit:  (Optional) Largest number of spaces for which
+                                a next-hop table is kept. Use 0 to always search.
+        """
+        self._graph = graph
+        self._nextHopLimit = nextHopLimit
+
+        #List of bytearrays: _nextHops[goal][space] is the index in
+        #DIRECTIONS of the first move from space towards goal
+        self._nextHops = None
+        self._nextHopsVersion = None
+
+    def findPath(self, start, goal, heuristic = None):
+        """
+        Finds a shortest route between two spaces.
+
+        @param start:       Space to start from.
+        @param goal:        Space to reach.
+        @keyword heuristic: (Optional) Function taking a space number and
+                            returning a lower bound on the number of moves
+                            from there to goal. If given, A* is used.
+
+        @return:            List of directions (from constants.Direction),
+                            empty if start is goal. None if goal cannot
+                            be reached.
+        """
+        if start.getGraph() is not self._graph or goal.getGraph() is not self._graph:
+            errorMsg = "Pathfinder.findPath() passed space from another graph."
+            raise AssertionError(errorMsg)
+
+        startIndex = start.getIndex()
+        goalIndex = goal.getIndex()
+        if heuristic is None and self._graph.getSpaceCount() <= self._nextHopLimit:
+            return self._followNextHops(startIndex, goalIndex)
+        if heuristic is not None:
+            return self._searchAStar(startIndex, goalIndex, heuristic)
+        return self._searchBreadthFirst(startIndex, goalIndex)
+
+    def getDistance(self, start, goal):
+        """
+        Returns number of moves on a shortest route, or None if
+        goal cannot be reached.
+        """
+        path = self.findPath(start, goal)
+        if path is None:
+            return None
+        return len(path)
+
+    def _searchBreadthFirst(self, startIndex, goalIndex):
+        """
+        Breadth-first search, stopping once goal is found.
+        """
+        exits = self._graph.getExitArrays()
+        directionCodes = range(len(exits))
+
+        #Maps space number to (previous space number, direction code)
+        cameFrom = {startIndex : None}
+        frontier = [startIndex]
+        while frontier and goalIndex not in cameFrom:
+            nextFrontier = []
+            for current in frontier:
+                for code in directionCodes:
+                    target = exits[code][current]
+                    if target != NO_EXIT and target not in cameFrom:
+                        cameFrom[target] = (current, code)
+                        nextFrontier.append(target)
+            frontier = nextFrontier
+
+        return self._buildPath(cameFrom, goalIndex)
+
+    def _searchAStar(self, startIndex, goalIndex, heuristic):
+        """
+        A* search; every move costs 1.
+        """
+        exits = self._graph.getExitArrays()
+        directionCodes = range(len(exits))
+
+        cameFrom = {startIndex : None}
+        cost = {startIndex : 0}
+        pending = [(heuristic(startIndex), startIndex)]
+        while pending:
+            estimate, current = heapq.heappop(pending)
+            if current == goalIndex:
+                break
+            nextCost = cost[current] + 1
+            for code in directionCodes:
+                target = exits[code][current]
+                if target != NO_EXIT and nextCost < cost.get(target, nextCost + 1):
+                    cost[target] = nextCost
+                    cameFrom[target] = (current, code)
+                    heapq.heappush(pending, (nextCost + heuristic(target), target))
+
+        return self._buildPath(cameFrom, goalIndex)
+
+    def _buildPath(self, cameFrom, goalIndex):
+        """
+        Returns directions leading to goal, from a map of
+        space numbers to (previous space number, direction code).
+        """
+        if goalIndex not in cameFrom:
+            return None
+
+        path = []
+        step = cameFrom[goalIndex]
+        while step is not None:
+            previous, code = step
+            path.append(DIRECTIONS[code])
+            step = cameFrom[previous]
+        path.reverse()
+
+        return path
+
+    def _followNextHops(self, startIndex, goalIndex):
+        """
+        Returns route read from the next-hop table.
+        """
+        if self._nextHopsVersion != self._graph.getVersion():
+            self._buildNextHops()
+
+        exits = self._graph.getExitArrays()
+        hops = self._nextHops[goalIndex]
+        path = []
+        current = startIndex
+        while current != goalIndex:
+            code = hops[current]
+            if code == _NO_HOP:
+                return None
+            path.append(DIRECTIONS[code])
+            current = exits[code][current]
+
+        return path
+
+    def _buildNextHops(self):
+        """
+        Builds the next-hop table: one breadth-first search per goal,
+        following exits backwards.
+        """
+        exits = self._graph.getExitArrays()
+        numSpaces = self._graph.getSpaceCount()
+
+        #Exits into each space, as (from space number, direction code)
+        entrances = [[] for index in xrange(numSpaces)]
+        for code, targets in enumerate(exits):
+            for index in xrange(numSpaces):
+                target = targets[index]
+                if target != NO_EXIT:
+                    entrances[target].append((index, code))
+
+        nextHops = []
+        for goalIndex in xrange(numSpaces):
+            hops = bytearray([_NO_HOP]) * numSpaces
+            seen = bytearray(numSpaces)
+            seen[goalIndex] = 1
+            found = [goalIndex]
+            for current in found:
+                for previous, code in entrances[current]:
+                    if not seen[previous]:
+                        seen[previous] = 1
+                        hops[previous] = code
+                        found.append(previous)
+            nextHops.append(hops)
+
+        self._nextHops = nextHops
+        self._nextHopsVersion = self._graph.getVersion()
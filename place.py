@@ -1,5 +1,7 @@
 #!/usr/bin/python
 
+from shared_world import resolveText
+
 class Place(object):
     """
     Parent class to both the City object and the UniquePlace object.
@@ -28,7 +30,29 @@ class Place(object):
 
         @return:    The description of the place.
         """
-        return self._description
+        return resolveText(self._description)
+
+    def update(self, other):
+        """
+        Copies data from other, an updated version of this place.
+        Used to patch a live world when its data file changes.
+
+        @param other:   Place of the same class.
+        @return:        True if anything changed, False otherwise.
+        """
+        changed = (self._name, self.getDescription()) != (other._name, other.getDescription())
+        self._name = other._name
+        self._description = other._description
+
+        return changed
+
+    def shareText(self, share):
+        """
+        Hands the description to a share function (of
+        shared_world.shareWorld() or compressed_world.compressWorld()),
+        and keeps what it returns.
+        """
+        self._description = share(self.getDescription())
 
     def enter(self, player):
         """
@@ -36,4 +60,5 @@ class Place(object):
         
         @param player:  The current player.
         """
-        print "This enter method should be overridden by child class"
+        io = player.getIO()
+        io.output("This enter method should be overridden by child class")
@@ -5,6 +5,7 @@ from items.item_set import ItemSet
 from items.weapon import Weapon
 from items.armor import Armor
 from items.potion import Potion
+from game_io import ConsoleIO
 from math import floor
 
 import constants
@@ -13,17 +14,23 @@ class Player(object):
     """
     Represents the (human) player.
     """
-    def __init__(self, name, location):
+    def __init__(self, name, location, io = None):
         """
         Initializes the player.
         
         @param name:             The name of the player (e.g. "Frodo").
         @param location:         The location of player.
+        @keyword io:             (Optional) The player's input/output channel.
+                                 By default, the player is at the terminal.
         """
         self._name      = name
-        self._location  = location
+        self.setLocation(location)
         self._money     = constants.STARTING_MONEY
 
+        if io is None:
+            io = ConsoleIO()
+        self._io = io
+
         #Initialize player inventory and equipment
         self._inventory = ItemSet()
         self._equipped = ItemSet()
@@ -49,6 +56,14 @@ class Player(object):
         """
         return self._name
 
+    def getIO(self):
+        """
+        Returns the player's input/output channel.
+
+        @return:          The player's GameIO object.
+        """
+        return self._io
+
     def attack(self, target):
         """
         Allows player to attack target. 
@@ -109,8 +124,8 @@ class Player(object):
             self._level = floor(self._experience/20) + 1
 
             #Player has leveled up. Updates player level and stats.
-            print "%s leveled up! %s is now level %s" \
-                  % (self._name, self._name, self._level)
+            self._io.output("%s leveled up! %s is now level %s"
+                  % (self._name, self._name, self._level))
             self._maxHp = self._level * constants.HP_STAT
             self._attack = self._level * constants.ATTACK_STAT
             self._totalAttack = self._attack + self._weaponAttack
@@ -146,7 +161,7 @@ class Player(object):
             
         self._hp += amountHealed
 
-        print "%s got healed by %s! %s's health is now at %s" % (self._name, amountHealed, self._name, self._hp)
+        self._io.output("%s got healed by %s! %s's health is now at %s" % (self._name, amountHealed, self._name, self._hp))
 
     def equip(self, item):
         """
@@ -170,8 +185,8 @@ class Player(object):
         if not (item in self._inventory) \
             or not (isinstance(item, Armor) or isinstance(item, Weapon)) \
             or item in self._equipped:
-            print ""
-            print "Cannot equip %s." %item.getName()
+            self._io.output()
+            self._io.output("Cannot equip %s." %item.getName())
             return
 
         #Unequip currently equipped armor/weapon if necessary
@@ -182,11 +197,8 @@ class Player(object):
             self._weapon = item
             self._weaponAttack = self._weapon.getAttack()
 
-        for currentItem in self._equipped:
-            if isinstance(item, Weapon) and isinstance(currentItem, Weapon):  
-                self.unequip(currentItem)
-            elif isinstance(item, Armor) and isinstance(currentItem, Armor):
-                self.unequip(currentItem)
+        for currentItem in self._equipped.getItemsByType(item.getType()):
+            self.unequip(currentItem)
             
         #Update player to reflect equipment
         if isinstance(item, Armor):
@@ -198,7 +210,7 @@ class Player(object):
 
         self._equipped.addItem(item)
         
-        print "%s equipped %s." %(self._name, item.getName())
+        self._io.output("%s equipped %s." %(self._name, item.getName()))
             
     def unequip(self, item):
         """
@@ -206,7 +218,7 @@ class Player(object):
 
         @param item:    The item to be unequipped.
         """
-        print ""
+        self._io.output()
         if item in self._equipped:
             self._equipped.removeItem(item)
             
@@ -218,10 +230,10 @@ class Player(object):
                 self._armor = None
                 self._armorDefense = 0
                 
-            print "%s unequipped %s." % (self._name, item.getName())
+            self._io.output("%s unequipped %s." % (self._name, item.getName()))
             
         else:
-            print "Cannot unequip %s." % item.getName()
+            self._io.output("Cannot unequip %s." % item.getName())
 
     def getWeapon(self):
         """
@@ -247,28 +259,36 @@ class Player(object):
         """
         return self._equipped
     
-    def addToInventory(self, item):
+    def addToInventory(self, item, quantity = 1):
         """
         Adds an item to inventory.
 
-        @param item:   The item to be added to inventory.
+        @param item:        The item to be added to inventory.
+        @keyword quantity:  (Optional) Number of identical items to add.
         """
-        if (isinstance(item, Item) and (item not in self._inventory)):
-            print "Added %s to inventory." % item.getName()
-            self._inventory.addItem(item)
+        if isinstance(item, Item) and quantity > 0:
+            if quantity == 1:
+                self._io.output("Added %s to inventory." % item.getName())
+            else:
+                self._io.output("Added %s %s to inventory." % (quantity, item.getName()))
+            self._inventory.addItem(item, quantity)
         else:
-            print "Cannot add %s to inventory." % item
+            self._io.output("Cannot add %s to inventory." % item)
 
-    def removeFromInventory(self, item):
+    def removeFromInventory(self, item, quantity = 1):
         """
-        Removes an item from inventory. If item is currently equipped, unequips item.
+        Removes an item from inventory. If no identical item is left
+        and item is currently equipped, unequips item.
 
-        @param item:   The item to be removed.
+        @param item:        The item to be removed.
+        @keyword quantity:  (Optional) Number of identical items to remove.
         """
-        if item in self._inventory:
-            if item in self._equipped:
+        count = self._inventory.getCount(item)
+        if count:
+            quantity = min(quantity, count)
+            if quantity == count and item in self._equipped:
                 self.unequip(item)
-            self._inventory.removeItem(item)
+            self._inventory.removeItem(item, quantity)
     
     def getInventory(self):
         """
@@ -365,7 +385,7 @@ class Player(object):
         if not northSpace:
             return
         #...otherwise, move to new space 
-        self._location = northSpace
+        self.setLocation(northSpace)
 
     def moveSouth(self):
         """
@@ -377,7 +397,7 @@ class Player(object):
         if not southSpace:
             return
         #...otherwise, move to new space 
-        self._location = southSpace 
+        self.setLocation(southSpace)
 
     def moveEast(self):
         """
@@ -389,7 +409,7 @@ class Player(object):
         if not eastSpace:
             return
         #...otherwise, move to new space 
-        self._location = eastSpace 
+        self.setLocation(eastSpace)
 
     def moveWest(self):
         """
@@ -401,7 +421,19 @@ class Player(object):
         if not westSpace:
             return
         #...otherwise, move to new space 
-        self._location = westSpace 
+        self.setLocation(westSpace)
+
+    def setLocation(self, space):
+        """
+        Puts player in a space. If the world is paged out by region
+        (see region_pager), the space's region is loaded.
+
+        @param space:   New location.
+        """
+        self._location = space
+        pager = space.getGraph().getPager()
+        if pager is not None:
+            pager.arrive(self, space)
 
     def getLocation(self):
         """
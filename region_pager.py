@@ -0,0 +1,284 @@
+#!/usr/bin/python
+
+"""
+Pages idle regions of a world out of memory.
+
+The world's spaces are partitioned into regions of neighbouring
+spaces. The state of a region that players can change or that takes
+room (descriptions of its spaces, items on the ground and the stock of
+shops in its cities) is written to disk, and a PagedOut marker is left
+in its place; rendered text of its spaces is dropped as well (see
+util/render_cache.py). Touching a marker, or a player moving into the
+region, loads the region again. Checking the version of a paged-out
+space does not. Once the loaded regions take more than the memory
+budget, the least recently used region nobody is in is paged out.
+Space objects and exits stay in memory, so references to spaces remain
+valid.
+"""
+
+import cPickle
+import os
+import shutil
+import tempfile
+import weakref
+from collections import OrderedDict
+from array import array
+
+from space_graph import NO_EXIT
+from util import render_cache
+import constants
+
+class PagedOut(object):
+    """
+    Stands in for the state of a paged-out region.
+    """
+    __slots__ = ("_pager", "_region")
+
+    def __init__(self, pager, region):
+        """
+        Initializes marker.
+
+        @param pager:   The RegionPager.
+        @param region:  Number of the region.
+        """
+        self._pager = pager
+        self._region = region
+
+    def load(self):
+        """
+        Loads the region back into memory.
+        """
+        self._pager.load(self._region)
+
+    def getVersion(self, space):
+        """
+        Returns the version a space of the region had when paged out,
+        without loading the region.
+
+        @param space:   Space in the region.
+        """
+        return self._pager._versions[space.getIndex()]
+
+class RegionPager(object):
+    """
+    Partitions a world into regions and keeps at most a memory budget's
+    worth of them loaded, paging out the least recently used.
+    """
+    def __init__(self, world, budget = None, regionSize = None, directory = None):
+        """
+        Partitions world into regions and pages them all out; each is
+        loaded again when first needed.
+
+        @param world:           The World.
+        @keyword budget:        (Optional) Memory budget for loaded regions
+                                (in bytes, measured as the size of their
+                                paged-out state). By default,
+                                constants.REGION_MEMORY_BUDGET.
+        @keyword regionSize:    (Optional) Maximum number of spaces per
+                                region. By default, constants.REGION_SIZE.
+        @keyword directory:     (Optional) Directory to page regions out
+                                to. By default, a temporary directory,
+                                removed by close().
+        """
+        if budget is None:
+            budget = constants.REGION_MEMORY_BUDGET
+        if regionSize is None:
+            regionSize = constants.REGION_SIZE
+        if regionSize < 1:
+            errorMsg = "Region size must be at least 1; got %s." % regionSize
+            raise AssertionError(errorMsg)
+
+        self._graph = world.getGraph()
+        if self._graph.getPager() is not None:
+            errorMsg = "World is already paged by another RegionPager."
+            raise AssertionError(errorMsg)
+        self._budget = budget
+        self._temporary = directory is None
+        if self._temporary:
+            directory = tempfile.mkdtemp(suffix=".regions")
+        self._directory = directory
+
+        #Region number by space number, and spaces and shops by region
+        self._regionOf = array('l')
+        self._spaces = []
+        self._shops = []
+        self._partition(world, regionSize)
+
+        #Versions of spaces when last paged out, by space number
+        self._versions = array('l', [0]) * len(self._regionOf)
+
+        #Maps loaded regions to their size, least recently used first
+        self._loaded = OrderedDict()
+        self._loadedSize = 0
+
+        #Maps players to the region they are in
+        self._players = weakref.WeakKeyDictionary()
+
+        self._graph.setPager(self)
+        for region in range(len(self._spaces)):
+            self._loaded[region] = 0
+            self._pageOut(region)
+
+    def getRegion(self, space):
+        """
+        Returns number of the region a space is in, or None if the space
+        was added after partitioning (it is never paged out).
+        """
+        index = space.getIndex()
+        if index >= len(self._regionOf):
+            return None
+        return self._regionOf[index]
+
+    def getRegionCount(self):
+        """
+        Returns number of regions.
+        """
+        return len(self._spaces)
+
+    def getLoadedRegions(self):
+        """
+        Returns numbers of loaded regions, least recently used first.
+        """
+        return self._loaded.keys()
+
+    def getLoadedSize(self):
+        """
+        Returns size of loaded regions (in bytes).
+        """
+        return self._loadedSize
+
+    def load(self, region):
+        """
+        Loads a region if it is paged out, and marks it as used.
+        Other regions may be paged out to stay within budget.
+
+        @param region:  Number of region.
+        """
+        if region in self._loaded:
+            self._loaded[region] = self._loaded.pop(region)
+            return
+
+        with open(self._getFilename(region), "rb") as regionFile:
+            data = regionFile.read()
+        spaceStates, shopStates = cPickle.loads(data)
+        for space, state in zip(self._spaces[region], spaceStates):
+            space.pageIn(state)
+        for shop, state in zip(self._shops[region], shopStates):
+            shop.pageIn(state)
+
+        self._loaded[region] = len(data)
+        self._loadedSize += len(data)
+        self._evict(region)
+
+    def arrive(self, player, space):
+        """
+        Records that a player moved into a space, loading its region.
+        Regions with players in them are not paged out.
+
+        @param player:  Player.
+        @param space:   Player's new location.
+        """
+        region = self.getRegion(space)
+        if region is None:
+            self._players.pop(player, None)
+            return
+        self._players[player] = region
+        self.load(region)
+
+    def close(self):
+        """
+        Loads every region and stops paging.
+        """
+        for region in range(len(self._spaces)):
+            if region not in self._loaded:
+                self.load(region)
+        self._budget = None
+        self._graph.setPager(None)
+        if self._temporary:
+            shutil.rmtree(self._directory, ignore_errors = True)
+
+    def _partition(self, world, regionSize):
+        """
+        Splits spaces into regions of neighbouring spaces, breadth first,
+        and assigns each shop to the first region one of its cities is in.
+        """
+        graph = self._graph
+        exits = graph.getExitArrays()
+        numSpaces = graph.getSpaceCount()
+        regionOf = array('l', [-1]) * numSpaces
+        shopsSeen = set()
+
+        for first in range(numSpaces):
+            if regionOf[first] != -1:
+                continue
+            region = len(self._spaces)
+            regionOf[first] = region
+            members = [first]
+            for current in members:
+                if len(members) >= regionSize:
+                    break
+                for targets in exits:
+                    target = targets[current]
+                    if target != NO_EXIT and regionOf[target] == -1 and len(members) < regionSize:
+                        regionOf[target] = region
+                        members.append(target)
+
+            spaces = [graph.getSpace(index) for index in members]
+            shops = []
+            for space in spaces:
+                for city in _toList(space.getCity()):
+                    for building in city.getBuildings() or []:
+                        if hasattr(building, "pageIn") and building not in shopsSeen:
+                            shopsSeen.add(building)
+                            shops.append(building)
+            self._spaces.append(spaces)
+            self._shops.append(shops)
+
+        self._regionOf = regionOf
+
+    def _pageOut(self, region):
+        """
+        Writes a loaded region to disk and leaves markers in its place.
+        """
+        marker = PagedOut(self, region)
+        for space in self._spaces[region]:
+            self._versions[space.getIndex()] = space.getVersion()
+            #Rendered text would keep the description in memory
+            render_cache.discard(space)
+        spaceStates = [space.pageOut(marker) for space in self._spaces[region]]
+        shopStates = [shop.pageOut(marker) for shop in self._shops[region]]
+        data = cPickle.dumps((spaceStates, shopStates), cPickle.HIGHEST_PROTOCOL)
+        with open(self._getFilename(region), "wb") as regionFile:
+            regionFile.write(data)
+
+        self._loadedSize -= self._loaded.pop(region)
+
+    def _evict(self, keep):
+        """
+        Pages out least recently used regions without players until
+        loaded regions fit the budget.
+
+        @param keep:    Region that must stay loaded.
+        """
+        if self._budget is None:
+            return
+        occupied = set(self._players.values())
+        occupied.add(keep)
+        for region in self._loaded.keys():
+            if self._loadedSize <= self._budget:
+                break
+            if region not in occupied:
+                self._pageOut(region)
+
+    def _getFilename(self, region):
+        return os.path.join(self._directory, "%s.region" % region)
+
+def _toList(places):
+    """
+    Returns places as a list; a space may hold one place or a list.
+    """
+    if places is None:
+        return []
+    if isinstance(places, list):
+        return places
+    return [places]
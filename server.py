@@ -0,0 +1,477 @@
+#!/usr/bin/python
+
+import asynchat
+import asyncore
+import errno
+import gc
+import os
+import signal
+import socket
+import sys
+import threading
+import traceback
+import Queue
+
+from game import Game
+from game_io import GameIO
+import game_loader
+import world_reloader
+import shared_world
+import compressed_world
+from region_pager import RegionPager
+from util.latency import commandLatency
+import constants
+
+#Only one session executes game logic at a time; a session gives up
+#the lock while it waits for its player's next line of input.
+_worldLock = threading.Lock()
+
+class Session(GameIO):
+    """
+    A single player's game, played over a network connection.
+
+    Each session has its own Player and CommandWords but shares the
+    server's world. The session is also the player's input/output
+    channel: input lines are fed in by the event loop, and game logic
+    runs on a small worker thread that blocks only on the session's
+    own input queue.
+    """
+    def __init__(self, channel, server):
+        """
+        Initializes new session.
+
+        @param channel:     The SessionChannel connected to the player.
+        @param server:      The GameServer, whose world all sessions share.
+        """
+        GameIO.__init__(self)
+
+        self._channel = channel
+        self._server = server
+        self._input = Queue.Queue()
+        self._game = None
+
+    def start(self):
+        """
+        Starts the session's worker thread.
+        """
+        thread = threading.Thread(target=self._run)
+        thread.daemon = True
+        thread.start()
+
+    def feed(self, line):
+        """
+        Receives a line of input from the player.
+
+        @param line:        Line of input (without line terminator).
+        """
+        self._input.put(line)
+
+    def getPlayer(self):
+        """
+        Returns the session's player, or None if the game has not started.
+        """
+        if self._game is None:
+            return None
+        return self._game.getPlayer()
+
+    def disconnect(self):
+        """
+        Signals that the player has disconnected.
+        """
+        self._input.put(None)
+
+    def _write(self, data):
+        self._channel.sendFromThread(data)
+
+    def _readLine(self):
+        """
+        Waits for the player's next line of input. Other sessions
+        may run while waiting.
+        """
+        _worldLock.release()
+        try:
+            line = self._input.get()
+        finally:
+            _worldLock.acquire()
+
+        #Player has disconnected
+        if line is None:
+            raise EOFError()
+
+        return line
+
+    def _run(self):
+        """
+        Plays the game until the player quits or disconnects.
+        """
+        _worldLock.acquire()
+        try:
+            self._game = Game(self._server.getWorld(), self, admin = False)
+            self._server.addSession(self)
+            self._game.play()
+        except (EOFError, SystemExit):
+            pass
+        except Exception:
+            traceback.print_exc()
+        finally:
+            self._server.removeSession(self)
+            self.flush()
+            _worldLock.release()
+            self._channel.closeFromThread()
+
+class SessionChannel(asynchat.async_chat):
+    """
+    Line-based connection between the server and a single player.
+    """
+    ac_out_buffer_size = 65536
+
+    def __init__(self, server, sock):
+        """
+        Initializes new session channel.
+
+        @param server:      The GameServer that accepted the connection.
+        @param sock:        The connected socket.
+        """
+        asynchat.async_chat.__init__(self, sock, map=server.getMap())
+        self.set_terminator("\n")
+
+        self._server = server
+        self._buffer = []
+        self._session = Session(self, server)
+        self._session.start()
+
+    def collect_incoming_data(self, data):
+        self._buffer.append(data)
+
+    def found_terminator(self):
+        line = "".join(self._buffer).rstrip("\r")
+        self._buffer = []
+        self._session.feed(line)
+
+    def handle_close(self):
+        self._session.disconnect()
+        self.close()
+
+    def sendFromThread(self, data):
+        """
+        Sends data to the player from a session thread.
+
+        @param data:        String to send.
+        """
+        self._server.callFromThread(self.push, data)
+
+    def closeFromThread(self):
+        """
+        Closes the connection (after sending pending data) from a
+        session thread.
+        """
+        self._server.callFromThread(self.close_when_done)
+
+class _Trigger(asyncore.file_dispatcher):
+    """
+    Lets other threads schedule calls on the event loop thread.
+    """
+    def __init__(self, map):
+        """
+        Initializes new trigger.
+
+        @param map:         The event loop's socket map.
+        """
+        readFd, self._writeFd = os.pipe()
+        asyncore.file_dispatcher.__init__(self, readFd, map=map)
+        os.close(readFd)
+
+        self._lock = threading.Lock()
+        self._calls = []
+
+    def writable(self):
+        return False
+
+    def pull(self, func, args):
+        """
+        Schedules a call on the event loop thread.
+
+        @param func:        Callable to invoke.
+        @param args:        Arguments to pass to func.
+        """
+        with self._lock:
+            wake = not self._calls
+            self._calls.append((func, args))
+        if wake:
+            try:
+                os.write(self._writeFd, "x")
+            except OSError:
+                #Event loop has already shut down
+                pass
+
+    def handle_read(self):
+        try:
+            self.recv(8192)
+        except (OSError, socket.error):
+            return
+
+        with self._lock:
+            calls = self._calls
+            self._calls = []
+        for func, args in calls:
+            func(*args)
+
+    def close(self):
+        asyncore.file_dispatcher.close(self)
+        os.close(self._writeFd)
+
+class GameServer(asyncore.dispatcher):
+    """
+    Multi-session game server. Every connection gets its own player
+    and commands, while all sessions share one event loop and one world.
+    """
+    def __init__(self, host = constants.SERVER_HOST, port = constants.SERVER_PORT):
+        """
+        Initializes new game server and starts listening.
+
+        @keyword host:      (Optional) Address to listen on.
+        @keyword port:      (Optional) Port to listen on. Use 0 to
+                            pick any free port.
+        """
+        self._map = {}
+        asyncore.dispatcher.__init__(self, map=self._map)
+
+        self._world = game_loader.getWorld()
+        self._trigger = _Trigger(self._map)
+
+        #Sessions that are playing; only changed while holding _worldLock
+        self._sessions = set()
+
+        self.create_socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.set_reuse_addr()
+        self.bind((host, port))
+        self.listen(constants.SERVER_BACKLOG)
+
+    def getMap(self):
+        """
+        Returns the event loop's socket map.
+        """
+        return self._map
+
+    def getWorld(self):
+        """
+        Returns the world shared by all sessions.
+        """
+        return self._world
+
+    def addSession(self, session):
+        """
+        Registers a playing session. Caller must hold the world lock.
+        """
+        self._sessions.add(session)
+
+    def removeSession(self, session):
+        """
+        Unregisters a session. Caller must hold the world lock.
+        """
+        self._sessions.discard(session)
+
+    def reloadWorld(self, filename = None):
+        """
+        Reloads the world from its data file without dropping sessions.
+
+        The new world is built on a background thread while sessions
+        keep playing, then patched into the live world while holding
+        the world lock (see world_reloader.patchWorld()). Changes are
+        printed. (May be called from any thread.)
+
+        @keyword filename:  (Optional) World data file. By default,
+                            constants.WORLD_FILE.
+        @return:            The background thread.
+        """
+        thread = threading.Thread(target=self._reloadWorld, args=(filename,))
+        thread.daemon = True
+        thread.start()
+
+        return thread
+
+    def reloadOnSignal(self):
+        """
+        Reloads the world whenever the process receives SIGHUP, so the
+        world can be redeployed by editing its data file and sending
+        SIGHUP. Must be called from the main thread.
+        """
+        signal.signal(signal.SIGHUP, lambda signum, frame: self.reloadWorld())
+
+    def _reloadWorld(self, filename):
+        try:
+            updated = game_loader.getWorld(filename)
+            with _worldLock:
+                players = [session.getPlayer() for session in self._sessions]
+                changes = world_reloader.patchWorld(self._world, updated, players)
+            for change in changes:
+                print change
+            print "World reloaded; %s change(s)." % len(changes)
+        except Exception:
+            traceback.print_exc()
+        sys.stdout.flush()
+
+    def getAddress(self):
+        """
+        Returns the (host, port) the server is listening on.
+        """
+        return self.socket.getsockname()
+
+    def handle_accept(self):
+        pair = self.accept()
+        if pair is None:
+            return
+        sock, address = pair
+        SessionChannel(self, sock)
+
+    def callFromThread(self, func, *args):
+        """
+        Schedules a call on the event loop thread.
+
+        @param func:        Callable to invoke.
+        """
+        self._trigger.pull(func, args)
+
+    def shutdown(self):
+        """
+        Closes all connections and stops the event loop.
+        (May be called from any thread.)
+        """
+        self.callFromThread(self._closeAll)
+
+    def _closeAll(self):
+        for dispatcher in self._map.values():
+            if isinstance(dispatcher, SessionChannel):
+                dispatcher.handle_close()
+            else:
+                dispatcher.close()
+
+    def serveForever(self, perfReport = None):
+        """
+        Runs the event loop until shutdown() is called.
+
+        @keyword perfReport:    (Optional) File to write command latencies
+                                to once the loop stops.
+        """
+        threading.stack_size(constants.SESSION_STACK_SIZE)
+        try:
+            asyncore.loop(timeout=constants.SERVER_POLL_TIMEOUT, use_poll=True, map=self._map)
+        finally:
+            if perfReport is not None:
+                commandLatency.writeReport(perfReport)
+
+    def serveWorkers(self, workers, perfReport = None):
+        """
+        Forks worker processes that all accept connections on this
+        server's socket, and waits for them to exit.
+
+        The world's read-only data is first moved into shared memory
+        (see shared_world.shareWorld()), so workers keep sharing it
+        instead of each copying it; workers also rarely run full garbage
+        collections (see shared_world.prepareWorker()). Each worker has
+        its own items on the ground and shop stock. SIGHUP and SIGTERM are passed on to the
+        workers. Must be called from the main thread.
+
+        @param workers:         Number of worker processes.
+        @keyword perfReport:    (Optional) File to write command latencies
+                                to; each worker writes its own, named
+                                after it (e.g. perf_report.txt.1234).
+        """
+        shared_world.shareWorld(self._world)
+
+        #Workers start with the world in the oldest generation and no garbage
+        gc.collect()
+
+        pids = []
+        for i in range(workers):
+            pid = os.fork()
+            if pid == 0:
+                #The wake-up pipe must not be shared with other workers
+                try:
+                    shared_world.prepareWorker()
+                    self._trigger.close()
+                    self._trigger = _Trigger(self._map)
+                    if perfReport is not None:
+                        perfReport = "%s.%s" % (perfReport, os.getpid())
+                    self.serveForever(perfReport)
+                finally:
+                    os._exit(0)
+            pids.append(pid)
+
+        def forward(signum, frame):
+            for pid in pids:
+                try:
+                    os.kill(pid, signum)
+                except OSError:
+                    pass
+        signal.signal(signal.SIGHUP, forward)
+        signal.signal(signal.SIGTERM, forward)
+
+        while pids:
+            try:
+                pid, status = os.wait()
+            except OSError, e:
+                if e.errno == errno.EINTR:
+                    continue
+                raise
+            pids.remove(pid)
+
+def addArguments(argParser, prefix = ""):
+    """
+    Adds the server's command line options to a parser.
+
+    @param argParser:   argparse.ArgumentParser.
+    @keyword prefix:    (Optional) Text put before each option's help,
+                        e.g. "With --server, ".
+    """
+    def describe(text):
+        text = prefix + text
+        return text[0].upper() + text[1:]
+
+    argParser.add_argument("--host", default=constants.SERVER_HOST)
+    argParser.add_argument("--port", type=int, default=constants.SERVER_PORT)
+    argParser.add_argument("--workers", type=int, default=1,
+                           help=describe("number of worker processes."))
+    argParser.add_argument("--compress", action="store_true",
+                           help=describe("keep space and city descriptions compressed in memory."))
+    argParser.add_argument("--region-budget", type=int, metavar="MB",
+                           help=describe("page idle world regions out of memory beyond this budget."))
+
+def serve(argParser, args):
+    """
+    Checks the options added by addArguments(), then sets up a server
+    and serves until it is stopped.
+
+    @param argParser:   argparse.ArgumentParser that parsed args; reports
+                        options that cannot be used together.
+    @param args:        Parsed options.
+    """
+    #Workers share the world uncompressed and unpaged (see serveWorkers())
+    if args.workers > 1:
+        if args.region_budget is not None:
+            argParser.error("--region-budget cannot be used with --workers.")
+        if args.compress:
+            argParser.error("--compress cannot be used with --workers.")
+
+    server = GameServer(args.host, args.port)
+    if args.compress:
+        compressed_world.compressWorld(server.getWorld())
+    if args.region_budget is not None:
+        RegionPager(server.getWorld(), args.region_budget * 1024 * 1024)
+    server.reloadOnSignal()
+    #Stop cleanly, so that the latency report is written once, at
+    #shutdown; workers inherit this before their signals are forwarded
+    signal.signal(signal.SIGTERM, lambda signum, frame: server.shutdown())
+    print "Serving on %s:%s" % server.getAddress()
+    sys.stdout.flush()
+    if args.workers > 1:
+        server.serveWorkers(args.workers, constants.PERF_REPORT_FILE)
+    else:
+        server.serveForever(constants.PERF_REPORT_FILE)
+
+if __name__ == '__main__':
+    import argparse
+
+    argParser = argparse.ArgumentParser(description="Lord of the Rings game server.")
+    addArguments(argParser)
+    serve(argParser, argParser.parse_args())
@@ -0,0 +1,155 @@
+#!/usr/bin/python
+
+"""
+Moves a world's read-only data into memory shared between processes.
+
+When a server forks worker processes, each worker starts with the
+parent's memory shared copy-on-write. Python objects do not stay shared
+for long: reading a description changes its reference count, which
+copies its page into the worker. shareWorld() writes descriptions,
+greetings, Square talk and exits into a file that every process maps,
+and leaves only a number in each object. Texts are read out of the
+mapping when they are needed. Items on the ground and shop stock stay
+ordinary, per-process objects.
+
+The garbage collector also writes to every object it examines;
+prepareWorker() keeps workers' collections off the world.
+"""
+
+import ctypes
+import gc
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+
+from compressed_world import CompressedText, decompressText
+import constants
+
+MAGIC = "LOTRWLD1"
+
+#Header: magic, number of spaces, number of exit arrays
+_HEADER = struct.Struct("<8sII")
+
+#Each text is stored as its length followed by its bytes
+_LENGTH = struct.Struct("<I")
+
+#Shared texts are numbered offset * _MAX_BLOBS + blob number
+_MAX_BLOBS = 256
+
+#Mapped blobs, by number
+_blobs = []
+
+def resolveText(text):
+    """
+    Returns a text, reading it from shared memory if it was shared,
+    or decompressing it if it was compressed (see compressed_world).
+
+    @param text:    A string, the number of a shared text or a
+                    CompressedText.
+    @return:        The string.
+    """
+    if type(text) is CompressedText:
+        return decompressText(text)
+    if isinstance(text, (int, long)):
+        offset, blob = divmod(text, _MAX_BLOBS)
+        mapping = _blobs[blob]
+        length = _LENGTH.unpack_from(mapping, offset)[0]
+        offset += _LENGTH.size
+        return mapping[offset:offset + length]
+    return text
+
+def prepareWorker():
+    """
+    Keeps a forked worker's garbage collector away from objects it
+    shares with its parent. Call in the worker, right after fork(), with
+    the parent's garbage collected before forking.
+
+    Young objects are still collected as usual, but full collections,
+    which examine every object and so copy all of their pages, only run
+    after constants.WORKER_GC_FULL_THRESHOLD collections of the younger
+    generations.
+    """
+    threshold0, threshold1, threshold2 = gc.get_threshold()
+    gc.set_threshold(threshold0, threshold1, constants.WORKER_GC_FULL_THRESHOLD)
+
+def shareWorld(world, filename = None):
+    """
+    Moves the read-only data of a world into a shared, memory-mapped file.
+
+    Every registered space, city, building and unique place is asked to
+    share its texts (see their shareText() methods); identical texts are
+    stored once. The exits of the world's SpaceGraph are replaced by
+    arrays in the mapping. Processes forked afterwards share the mapping.
+
+    @param world:       The World.
+    @keyword filename:  (Optional) File to write. By default, a temporary
+                        file, removed once mapped.
+    @return:            Size of the shared data, in bytes.
+    """
+    if len(_blobs) >= _MAX_BLOBS:
+        errorMsg = "Cannot share world; too many worlds shared."
+        raise AssertionError(errorMsg)
+
+    places = world.getSpaces()
+    for ids, get in [(world.getCityIds, world.getCity), (world.getBuildingIds, world.getBuilding),
+                     (world.getUniquePlaceIds, world.getUniquePlace)]:
+        places.extend(get(placeId) for placeId in ids())
+
+    graph = world.getGraph()
+    exitArrays = graph.getExitArrays()
+    numSpaces = graph.getSpaceCount()
+    textStart = _HEADER.size + len(exitArrays) * numSpaces * 4
+
+    #First pass: collect texts, leaving objects as they are
+    offsets = {}
+    texts = []
+    size = [textStart]
+    def collect(text):
+        if text not in offsets:
+            offsets[text] = size[0]
+            texts.append(text)
+            size[0] += _LENGTH.size + len(text)
+        return text
+    for place in places:
+        place.shareText(collect)
+
+    #Write and map
+    temporary = filename is None
+    if temporary:
+        fd, filename = tempfile.mkstemp(suffix=".world")
+        blobFile = os.fdopen(fd, "wb")
+    else:
+        blobFile = open(filename, "wb")
+    try:
+        with blobFile:
+            blobFile.write(_HEADER.pack(MAGIC, numSpaces, len(exitArrays)))
+            for exits in exitArrays:
+                blobFile.write(array('i', exits[:numSpaces]).tostring())
+            for text in texts:
+                blobFile.write(_LENGTH.pack(len(text)))
+                blobFile.write(text)
+
+        with open(filename, "rb") as blobFile:
+            #Copy-on-write mapping, so exits can be viewed as ctypes arrays;
+            #pages stay shared as long as nothing writes to them
+            mapping = mmap.mmap(blobFile.fileno(), 0, access=mmap.ACCESS_COPY)
+    finally:
+        if temporary:
+            os.remove(filename)
+
+    blob = len(_blobs)
+    _blobs.append(mapping)
+
+    #Second pass: replace texts by their numbers
+    for place in places:
+        place.shareText(lambda text: offsets[text] * _MAX_BLOBS + blob)
+
+    sharedExits = []
+    for index in range(len(exitArrays)):
+        offset = _HEADER.size + index * numSpaces * 4
+        sharedExits.append((ctypes.c_int32 * numSpaces).from_buffer(mapping, offset))
+    graph.setExitArrays(sharedExits)
+
+    return len(mapping)
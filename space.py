@@ -2,13 +2,23 @@
 
 from constants import Direction
 from items.item_set import ItemSet
+from space_graph import SpaceGraph, DIRECTIONS, NO_EXIT
+from util.helpers import sameObjects
+from shared_world import resolveText
+from region_pager import PagedOut
 
 class Space(object):
     """
     A given location on the map. Connects with other spaces
     to form larger geographic areas.
+
+    Exits are kept in a SpaceGraph shared by all spaces of a world,
+    and attributes are slots, so that million-space worlds stay small.
     """
-    def __init__(self, name, description, items = None, city = None, uniquePlaces = None):
+    __slots__ = ("_graph", "_index", "_name", "_description", "_items", "_city", "_uniquePlaces",
+                 "_revision", "__weakref__")
+
+    def __init__(self, name, description, items = None, city = None, uniquePlaces = None, graph = None):
         """
         Initialize a Space object.
 
@@ -21,12 +31,15 @@ class Space(object):
                                 May be a reference to an object or a list.
         @keyword uniquePlaces:  (Optional) Reerence to city/cities. 
                                 May be a reference to an object or a list.
-
+        @keyword graph:         (Optional) SpaceGraph holding the exits of this
+                                space's world. By default, a new graph
+                                holding only this space; connecting spaces
+                                of different graphs merges the graphs.
         """
-        self._exits = { Direction.NORTH : None,
-                        Direction.SOUTH : None,
-                        Direction.EAST : None,
-                        Direction.WEST : None }
+        if graph is None:
+            graph = SpaceGraph()
+        self._graph = graph
+        self._index = graph.addSpace(self)
 
         self._name = name
         self._description = description
@@ -34,10 +47,14 @@ class Space(object):
         #      Will need to check if items refers to single object or to an ItemSet.
         #      If it points to an ItemSet, you can just set self._items to that ItemSet. 
         #      (self._items = items)
-        self._items = ItemSet()
+        #Created on first use; most spaces never hold items
+        self._items = None
         self._city = city
         self._uniquePlaces = uniquePlaces
 
+        #Incremented whenever the space itself changes
+        self._revision = 0
+
     def getName(self):
         """
         Returns the name of the room.
@@ -52,7 +69,9 @@ class Space(object):
 
         @return:    Description of room.
         """
-        return self._description
+        if type(self._description) is PagedOut:
+            self._description.load()
+        return resolveText(self._description)
         
     def getItems(self):
         """
@@ -60,23 +79,98 @@ class Space(object):
 
         @return:    Items in Space (as ItemSet).
         """
+        if type(self._items) is PagedOut:
+            self._items.load()
+        if self._items is None:
+            self._items = ItemSet()
         return self._items
         
-    def addItem(self, item):
+    def getVersion(self):
+        """
+        Returns version number, which changes whenever the space
+        or its contents change.
+
+        @return:    Version of the space and its items.
+        """
+        if type(self._items) is PagedOut:
+            return self._items.getVersion(self)
+        if self._items is None:
+            return self._revision
+        return self._revision + self._items.getVersion()
+
+    def shareText(self, share):
+        """
+        Hands the description to a share function (of
+        shared_world.shareWorld() or compressed_world.compressWorld()),
+        and keeps what it returns.
+        """
+        self._description = share(self.getDescription())
+
+    def pageOut(self, marker):
+        """
+        Hands over the state region_pager keeps on disk (description and
+        items) and replaces it by marker.
+
+        @param marker:  region_pager.PagedOut.
+        @return:        The state.
+        """
+        state = (self._description, self._items)
+        self._description = marker
+        self._items = marker
+        return state
+
+    def pageIn(self, state):
+        """
+        Takes back state handed over by pageOut().
+        """
+        self._description, self._items = state
+
+    def touch(self):
+        """
+        Changes the version number, e.g. after a place in this space
+        was renamed.
+        """
+        self._revision += 1
+
+    def update(self, other):
+        """
+        Copies name, description and places from other, an updated
+        version of this space. Items and exits are kept.
+
+        @param other:   Space.
+        @return:        True if anything changed, False otherwise.
+        """
+        if type(self._items) is PagedOut:
+            self._items.load()
+        changed = (self._name, self.getDescription()) != (other._name, other.getDescription()) or \
+                  not sameObjects(self._city, other._city) or \
+                  not sameObjects(self._uniquePlaces, other._uniquePlaces)
+        self._name = other._name
+        self._description = other._description
+        self._city = other._city
+        self._uniquePlaces = other._uniquePlaces
+        if changed:
+            self.touch()
+
+        return changed
+
+    def addItem(self, item, quantity = 1):
         """
         Adds an item to the room.
 
-        @param item:    Item to add.
+        @param item:        Item to add.
+        @keyword quantity:  (Optional) Number of identical items to add.
         """
-        self._items.addItem(item)
+        self.getItems().addItem(item, quantity)
 
-    def removeItem(self, item):
+    def removeItem(self, item, quantity = 1):
         """
         Removes an item from the room.
 
-        @param item:    Item to remove.
+        @param item:        Item to remove.
+        @keyword quantity:  (Optional) Number of identical items to remove.
         """
-        self._items.removeItem(item)
+        self.getItems().removeItem(item, quantity)
 
     def containsItem(self, item):
         """
@@ -86,6 +180,10 @@ class Space(object):
 
         @return:    True if item is contained in Space, False otherwise.
         """
+        if type(self._items) is PagedOut:
+            self._items.load()
+        if self._items is None:
+            return False
         return self._items.containsItem(item)
 
     def containsItemString(self, string):
@@ -96,13 +194,11 @@ class Space(object):
 
         @return:    True if item is contained in Space, False otherwise.
         """
-        #TODO: Use ItemSet's containsItemWithName() instead here. 
-
-        for item in self._items:
-            if item.getName() == string:
-                return True
-            
-        return False
+        if type(self._items) is PagedOut:
+            self._items.load()
+        if self._items is None:
+            return False
+        return self._items.containsItemWithName(string)
     
     def getCity(self):
         """
@@ -113,6 +209,24 @@ class Space(object):
         """
         return self._city
 
+    def setCity(self, city):
+        """
+        Replaces city object(s).
+
+        @param city:    Reference to city/cities, or None.
+        """
+        self._city = city
+        self.touch()
+
+    def setUniquePlace(self, uniquePlace):
+        """
+        Replaces unique place object(s).
+
+        @param uniquePlace:     Reference to unique place(s), or None.
+        """
+        self._uniquePlaces = uniquePlace
+        self.touch()
+
     def getUniquePlace(self):
         """
         Returns uniquePlace object(s).
@@ -130,7 +244,8 @@ class Space(object):
         using I{outgoingOnly}).
 
         @param direction:       Direction of exit.
-        @param space:           Adjacent space.
+        @param space:           Adjacent space. If it is in another SpaceGraph,
+                                the two graphs are merged.
         @keyword outgoingOnly:  By default, this method creates the appropriate
                                 exit in the second space. Set I{outgoingOnly}
                                 to False to supress this behavior.
@@ -139,14 +254,19 @@ class Space(object):
         if not self._isExit(direction):
             errorMsg = "Direction not valid: %s" % direction 
             raise AssertionError(errorMsg)
+        #Spaces made apart (e.g. without a graph) are joined into one
+        #graph, moving the smaller graph's spaces into the larger
+        if space._graph is not self._graph:
+            graphs = sorted([self._graph, space._graph], key = lambda graph: graph.getSpaceCount())
+            graphs[1].merge(graphs[0])
 
         #Set exit to other space
-        self._exits[direction] = space
+        self._graph.setExit(self._index, direction, space._index)
 
         #Create exit from other space to this space
         if not outgoingOnly:
             oppositeDirection = self._oppositeDirection(direction)
-            space._exits[oppositeDirection] = self
+            self._graph.setExit(space._index, oppositeDirection, self._index)
 
     def clearExit(self, direction, outgoingOnly):
         """
@@ -166,19 +286,17 @@ class Space(object):
             raise AssertionError(errorMsg)
 
         #If exit has not been set, there is nothing to do
-        if self._exits[direction] == None:
+        adjIndex = self._graph.getExitIndex(self._index, direction)
+        if adjIndex == NO_EXIT:
             return
 
-        #Create a temporary copy of adjacent space
-        adjSpace = self._exits[direction]
-
         #Clear exit from this space
-        self._exits[direction] = None
+        self._graph.setExit(self._index, direction, NO_EXIT)
 
         #Clear exit from other space to this space
         if not outgoingOnly:
             oppositeDirection = self._oppositeDirection(direction)
-            adjSpace._exits[oppositeDirection] = None
+            self._graph.setExit(adjIndex, oppositeDirection, NO_EXIT)
 
     def getExit(self, direction):
         """
@@ -193,8 +311,24 @@ class Space(object):
                             (Returns None if no exit is defined
                             for given direction).
         """
-        space = self._exits[direction]
-        return space
+        #Inlined SpaceGraph.getExit(); this is the hottest call in the game
+        graph = self._graph
+        target = graph._exits[direction][self._index]
+        if target == NO_EXIT:
+            return None
+        return graph._spaces[target]
+
+    def getGraph(self):
+        """
+        Returns the SpaceGraph holding this space's exits.
+        """
+        return self._graph
+
+    def getIndex(self):
+        """
+        Returns this space's number in its SpaceGraph.
+        """
+        return self._index
 
     def _isExit(self, exit):
         """
@@ -204,8 +338,7 @@ class Space(object):
 
         @return:            True if valid exit, False otherwise.
         """
-        availableExits = self._exits.keys()
-        if exit not in availableExits:
+        if exit not in DIRECTIONS:
             return False
         return True
 
@@ -223,7 +356,7 @@ class Space(object):
             return Direction.NORTH
         elif direction == Direction.EAST:
             return Direction.WEST
-        elif direciton == Direction.WEST:
+        elif direction == Direction.WEST:
             return Direction.EAST
         else:
             raise AssertionError("Not a valid direction: %s" % direction)
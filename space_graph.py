@@ -0,0 +1,187 @@
+#!/usr/bin/python
+
+from array import array
+from constants import Direction
+
+DIRECTIONS = (Direction.NORTH, Direction.SOUTH, Direction.EAST, Direction.WEST)
+
+#Exit index meaning "no exit"
+NO_EXIT = -1
+
+class SpaceGraph(object):
+    """
+    Exits between spaces, stored compactly.
+
+    Spaces are numbered in the order they are added. For each direction,
+    a flat array holds the number of the space that exit leads to, or
+    NO_EXIT. Large worlds thus need a few machine words per space for
+    their exits, instead of a dictionary per space.
+    """
+    def __init__(self):
+        """
+        Initializes new graph without spaces.
+        """
+        #Space objects by number
+        self._spaces = []
+
+        #Maps direction to array of target space numbers
+        self._exits = dict((direction, array('l')) for direction in DIRECTIONS)
+
+        #Incremented whenever spaces or exits change
+        self._version = 0
+
+        #RegionPager paging out this graph's spaces, if any
+        self._pager = None
+
+    def addSpace(self, space):
+        """
+        Adds a space without exits.
+
+        @param space:   Space to add.
+        @return:        The space's number.
+        """
+        self._spaces.append(space)
+        for direction, exits in self._exits.items():
+            #Fixed-size (e.g. shared) arrays are copied before growing
+            if not isinstance(exits, array):
+                exits = array('l', exits)
+                self._exits[direction] = exits
+            exits.append(NO_EXIT)
+        self._version += 1
+
+        return len(self._spaces) - 1
+
+    def getSpace(self, index):
+        """
+        Returns space by number.
+        """
+        return self._spaces[index]
+
+    def getSpaceCount(self):
+        """
+        Returns number of spaces.
+        """
+        return len(self._spaces)
+
+    def getVersion(self):
+        """
+        Returns version number, which changes whenever
+        spaces are added or exits change.
+        """
+        return self._version
+
+    def getPager(self):
+        """
+        Returns the RegionPager paging out this graph's spaces, or None.
+        """
+        return self._pager
+
+    def setPager(self, pager):
+        """
+        Sets the RegionPager paging out this graph's spaces (or None).
+        """
+        self._pager = pager
+
+    def getExitArrays(self):
+        """
+        Returns exit arrays, in the order of DIRECTIONS. Entry i of
+        each array is the number of the space that exit of space i
+        leads to, or NO_EXIT. The arrays must not be changed.
+        """
+        return [self._exits[direction] for direction in DIRECTIONS]
+
+    def setExitArrays(self, exitArrays):
+        """
+        Replaces exit arrays, e.g. with arrays in shared memory.
+        Arrays that cannot grow are copied when a space is added.
+
+        @param exitArrays:  Arrays of target space numbers, in the order
+                            of DIRECTIONS, each as long as the number of
+                            spaces.
+        """
+        for direction, exits in zip(DIRECTIONS, exitArrays):
+            if len(exits) != len(self._spaces):
+                errorMsg = "SpaceGraph.setExitArrays() passed array of wrong length."
+                raise AssertionError(errorMsg)
+            self._exits[direction] = exits
+        self._version += 1
+
+    def getExit(self, index, direction):
+        """
+        Returns space an exit leads to.
+
+        @param index:       Number of space.
+        @param direction:   Direction of exit (from constants.Direction).
+        @return:            Adjacent space, or None if there is no exit.
+        """
+        target = self._exits[direction][index]
+        if target == NO_EXIT:
+            return None
+        return self._spaces[target]
+
+    def getExitIndex(self, index, direction):
+        """
+        Returns number of the space an exit leads to, or NO_EXIT.
+        """
+        return self._exits[direction][index]
+
+    def getReachable(self, index):
+        """
+        Finds every space reachable from a space, breadth first.
+        Works on space numbers only, without touching Space objects.
+
+        @param index:   Number of starting space.
+        @return:        Numbers of reachable spaces, in the order found
+                        (starting with index).
+        """
+        exits = self.getExitArrays()
+        seen = bytearray(len(self._spaces))
+        seen[index] = 1
+        found = [index]
+        for current in found:
+            for targets in exits:
+                target = targets[current]
+                if target != NO_EXIT and not seen[target]:
+                    seen[target] = 1
+                    found.append(target)
+
+        return found
+
+    def merge(self, other):
+        """
+        Moves every space of another graph, with its exits, into this
+        graph, leaving the other graph empty. Moved spaces are numbered
+        after this graph's spaces.
+
+        @param other:   SpaceGraph to merge. Neither graph may be paged
+                        out (see region_pager.py).
+        """
+        if self._pager is not None or other._pager is not None:
+            errorMsg = "Cannot merge SpaceGraphs while their regions are paged out."
+            raise AssertionError(errorMsg)
+
+        offset = len(self._spaces)
+        otherExits = other.getExitArrays()
+        for space in other._spaces:
+            space._graph = self
+            space._index = self.addSpace(space)
+        for direction, exits in zip(DIRECTIONS, otherExits):
+            targets = self._exits[direction]
+            for index, target in enumerate(exits):
+                if target != NO_EXIT:
+                    targets[offset + index] = target + offset
+
+        other._spaces = []
+        other._exits = dict((direction, array('l')) for direction in DIRECTIONS)
+        other._version += 1
+
+    def setExit(self, index, direction, target):
+        """
+        Sets an exit.
+
+        @param index:       Number of space.
+        @param direction:   Direction of exit (from constants.Direction).
+        @param target:      Number of adjacent space, or NO_EXIT to clear exit.
+        """
+        self._exits[direction][index] = target
+        self._version += 1
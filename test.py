@@ -14,11 +14,103 @@ class GameTest(unittest.TestCase):
         #Create mock objects
         helpCommand = MagicMock()
         helpCommand.execute = MagicMock()
-        g._parser.getNextCommand = MagicMock(return_value=helpCommand)
+        g._parser.getNextCommand = MagicMock(return_value=(helpCommand, None))
 
         g._nextTurn()
         self.assertTrue(helpCommand.execute.called, "Game._nextTurn() failed to execute command")
 
+    def testNextTurnPassesArguments(self):
+        from game import Game
+        from game_io import ScriptIO
+        io = ScriptIO(["unequip Leather Tunic"])
+        g = Game(io=io)
+
+        #Unequipping by name needs no follow-up prompt
+        g._nextTurn()
+        equipped = g._player.getEquipped()
+        self.assertFalse(equipped.getItemByName("Leather Tunic"), "Game._nextTurn() did not pass arguments to command.")
+
+class TurnPipelineTest(unittest.TestCase):
+    """
+    Tests TurnPipeline class.
+    """
+    def testStagesRunAroundCommand(self):
+        from turn_pipeline import TurnPipeline, EXECUTE_STAGE
+        pipeline = TurnPipeline()
+        calls = []
+        command = MagicMock()
+        command.execute = MagicMock(side_effect=lambda arguments: calls.append(("execute", arguments)))
+
+        pipeline.addPreStage("tick", lambda command, arguments: calls.append(("tick", arguments)))
+        pipeline.addPostStage("save", lambda command, arguments: calls.append(("save", arguments)))
+        self.assertRaises(AssertionError, pipeline.addPostStage, "tick", MagicMock())
+
+        #Timing disabled
+        pipeline.run(command, "Sting")
+        self.assertEqual(calls, [("tick", "Sting"), ("execute", "Sting"), ("save", "Sting")],
+                "Stages did not run in order.")
+        self.assertEqual(pipeline.getTimings(), {}, "Timings recorded while disabled.")
+
+        #Timing enabled
+        pipeline.enableTiming()
+        pipeline.run(command)
+        pipeline.run(command)
+        timings = pipeline.getTimings()
+        for name in ["tick", EXECUTE_STAGE, "save"]:
+            self.assertEqual(timings[name][0], 2, "Wrong count for stage %s." % name)
+
+        #Removed stages no longer run
+        pipeline.removeStage("tick")
+        del calls[:]
+        pipeline.run(command)
+        self.assertEqual([call[0] for call in calls], ["execute", "save"], "Removed stage still ran.")
+
+class GameIOTest(unittest.TestCase):
+    """
+    Tests GameIO classes.
+    """
+    def testBufferedOutput(self):
+        from game_io import ScriptIO
+        io = ScriptIO(["yes"])
+
+        io.output("Leaving Bree.")
+        io.output()
+        self.assertEqual(io._output, [], "Output was written before flush.")
+
+        #Reading input sends pending output and prompt in a single write
+        line = io.readLine("Are you sure? ")
+        self.assertEqual(line, "yes", "ScriptIO returned wrong line.")
+        self.assertEqual(io._output, ["Leaving Bree.\n\nAre you sure? "], "Output not sent as single write.")
+
+        #Script exhausted
+        self.assertRaises(EOFError, io.readLine)
+
+    def testScriptedGame(self):
+        from game import Game
+        from game_io import ScriptIO
+        io = ScriptIO(["money", "north"])
+        g = Game(io=io)
+
+        g._nextTurn()
+        g._nextTurn()
+
+        output = io.getOutput()
+        self.assertTrue("Russian currently has 20 rubbles!" in output, "Missing output from money command.")
+        self.assertTrue("Cannot move North." in output, "Missing output from north command.")
+
+    def testBatchRunner(self):
+        from batch_runner import BatchRunner
+        runner = BatchRunner(["money", "inventory", "money", "quit", "yes"], keepOutput=True)
+        runner.run()
+
+        #Quit stops the runner
+        self.assertEqual(runner.getTurns(), 2 + 1, "Wrong number of commands executed.")
+        commandTimes = runner.getCommandTimes()
+        self.assertEqual(commandTimes["money"][0], 2, "Wrong count for money command.")
+        self.assertEqual(commandTimes["inventory"][0], 1, "Wrong count for inventory command.")
+        self.assertTrue("Commands per second" in runner.getReport(), "Report missing throughput.")
+        self.assertTrue("Russian currently has 20 rubbles!" in runner.getOutput(), "Output not kept.")
+
 class ParserTest(unittest.TestCase):
     """
     Tests Parser class.
@@ -29,34 +121,182 @@ class ParserTest(unittest.TestCase):
         p = Parser(commandWords)
 
         #Create mock objects
-        #raw_input = MagicMock(side_effect=["unrecognized command", "good command"])
-        p._commandRecognized = MagicMock(side_effect=[False, True])
+        p._splitCommand = MagicMock(side_effect=[(None, None), ("valid", "cmd")])
         fakeCommand = MagicMock()
         p._commandWords.getCommand = MagicMock(return_value=fakeCommand) 
 
-        #Patch raw_input and call getNextCommand()
+        #Patch readLine and call getNextCommand()
         rawInputMock = MagicMock(side_effect=["unrecognized cmd", "valid cmd"])
-        with patch('parser.raw_input', create=True, new=rawInputMock):
-            command = p.getNextCommand()
+        with patch.object(p._io, 'readLine', new=rawInputMock):
+            command, arguments = p.getNextCommand()
 
         #Assert calls made
-        errorMsg = "Expected raw_input to be called twice."
+        errorMsg = "Expected readLine to be called twice."
         self.assertEqual(rawInputMock.call_count, 2, errorMsg)
-        errorMsg = "Expected Parser._commandRecognized() to be called twice."
-        self.assertEqual(p._commandRecognized.call_count, 2, errorMsg)
+        errorMsg = "Expected Parser._splitCommand() to be called twice."
+        self.assertEqual(p._splitCommand.call_count, 2, errorMsg)
         errorMsg = "Parser.getNextCommand() did not respond expected command."
         self.assertEqual(command, fakeCommand, errorMsg)
+        errorMsg = "Parser.getNextCommand() did not respond expected arguments."
+        self.assertEqual(arguments, "cmd", errorMsg)
 
-    def testCommandRecognized(self):
+    def testSplitCommand(self):
         from parser import Parser
-        commandWords = MagicMock()
-        commandWords.isCommand = MagicMock(return_value=True)
+        from commands.command_words import CommandWords
+        commandWords = CommandWords()
+        for name in ["equip", "pick up", "north", "money"]:
+            commandWords.addCommand(name, MagicMock())
+        commandWords.addAlias("n", "north")
         p = Parser(commandWords)
 
-        result = p._commandRecognized("valid command")
+        #Verb is case-insensitive, arguments keep their case
+        self.assertEqual(p._splitCommand("Equip Legendary Axe of Domination"),
+                ("equip", "Legendary Axe of Domination"), "Arguments not split from command.")
+        #Multi-word command names
+        self.assertEqual(p._splitCommand("  pick  up Sting "), ("pick up", "Sting"),
+                "Multi-word command not matched.")
+        #No arguments
+        self.assertEqual(p._splitCommand("money"), ("money", None), "Expected no arguments.")
+        #Aliases and prefixes
+        self.assertEqual(p._splitCommand("N"), ("north", None), "Alias not expanded.")
+        self.assertEqual(p._splitCommand("eq Rock"), ("equip", "Rock"), "Prefix not expanded.")
+        #Unrecognized, with suggestions
+        self.assertEqual(p._splitCommand("dance wildly"), (None, None), "Expected unrecognized command.")
+        self.assertEqual(p._getSuggestions("pik up Sting")[0], "pick up", "Expected suggestion for typo.")
+        self.assertEqual(p._splitCommand(""), (None, None), "Expected unrecognized command.")
+
+class CommandWordsTest(unittest.TestCase):
+    """
+    Tests CommandWords class.
+    """
+    def testResolve(self):
+        from commands.command_words import CommandWords
+        commandWords = CommandWords()
+        for name in ["equip", "equipment", "drop", "describe", "inventory", "north"]:
+            commandWords.addCommand(name, MagicMock())
+        commandWords.addAlias("n", "north")
+
+        #Exact names, aliases and unambiguous prefixes
+        self.assertEqual(commandWords.resolve("drop"), "drop", "Exact name not resolved.")
+        self.assertEqual(commandWords.resolve("n"), "north", "Alias not resolved.")
+        self.assertEqual(commandWords.resolve("inv"), "inventory", "Prefix not resolved.")
+        self.assertEqual(commandWords.resolve("desc"), "describe", "Prefix not resolved.")
+        self.assertEqual(commandWords.resolve("eq"), "equip", "Prefix of nested names not resolved.")
+        self.assertEqual(commandWords.resolve("equipm"), "equipment", "Prefix not resolved.")
+
+        #Suggestions for typos, with aliases mapped to their command
+        self.assertEqual(commandWords.getSuggestions("dorp"), ["drop"], "Wrong suggestions.")
+        self.assertEqual(commandWords.getSuggestions("equp")[0], "equip", "Closest suggestion not first.")
+        self.assertTrue("north" in commandWords.getSuggestions("m"), "Alias not mapped to command.")
+        self.assertEqual(commandWords.getSuggestions("xylophone"), [], "Unexpected suggestions.")
+
+        #Ambiguous and unknown input
+        self.assertEqual(commandWords.resolve("d"), None, "Ambiguous prefix resolved.")
+        self.assertEqual(commandWords.resolve("dance"), None, "Unknown command resolved.")
+        self.assertEqual(commandWords.resolve(""), None, "Empty input resolved.")
+
+        #Aliases are exact matches only for isCommand()
+        self.assertFalse(commandWords.isCommand("n"), "Alias reported as command.")
+        self.assertRaises(AssertionError, commandWords.addCommand, "n", MagicMock())
+
+        #Removing command removes its aliases and frees its prefixes
+        commandWords.removeCommand("north")
+        self.assertEqual(commandWords.resolve("n"), None, "Alias of removed command resolved.")
+        commandWords.removeCommand("describe")
+        self.assertEqual(commandWords.resolve("d"), "drop", "Prefix not resolved after removal.")
+        self.assertFalse("describe" in commandWords.getSuggestions("describ"), "Removed command suggested.")
+
+class LatencyTest(unittest.TestCase):
+    """
+    Tests LatencyHistogram and LatencyStats classes.
+    """
+    def testPercentiles(self):
+        from util.latency import LatencyHistogram
+        histogram = LatencyHistogram()
+        for i in range(1, 101):
+            histogram.record(i / 1000.0)
+
+        self.assertEqual(histogram.getCount(), 100, "Wrong count.")
+        self.assertEqual(histogram.getMax(), .1, "Wrong max.")
+        #Percentiles are accurate to the bucket width (about 9%)
+        for fraction in [.50, .95, .99]:
+            expected = fraction / 10
+            self.assertTrue(expected <= histogram.getPercentile(fraction) <= expected * 1.1,
+                    "Wrong p%s." % int(fraction * 100))
+
+    def testPerfAndQuitCommands(self):
+        import os
+        import shutil
+        import tempfile
+        import constants
+        from game import Game
+        from game_io import ScriptIO
+        from util.latency import commandLatency
+
+        commandLatency.reset()
+        io = ScriptIO(["money", "money", "perf", "quit", "yes"])
+        g = Game(io=io)
+        directory = tempfile.mkdtemp()
+        filename = os.path.join(directory, "perf.txt")
+        try:
+            with patch.object(constants, "PERF_REPORT_FILE", filename):
+                g._nextTurn()
+                g._nextTurn()
+                g._nextTurn()
+                self.assertRaises(SystemExit, g._nextTurn)
+
+            #perf shows commands executed before it
+            self.assertTrue("Command latencies (ms):" in io.getOutput(), "Missing perf output.")
+            self.assertEqual(commandLatency.getHistogram("money").getCount(), 2, "Wrong count for money.")
+
+            #Quitting writes report
+            with open(filename) as report:
+                self.assertTrue(report.read().split("\n")[1].startswith("money "), "Report not written.")
+        finally:
+            shutil.rmtree(directory)
+            commandLatency.reset()
+
+    def testPerfOnlyForAdmins(self):
+        from game import Game
+        from game_io import ScriptIO
 
-        errorMsg = "Expected Parser._commandRecognized() to return True."
-        self.assertTrue(result, errorMsg) 
+        #Server players neither see nor write the process-wide latencies
+        g = Game(io=ScriptIO(), admin = False)
+        self.assertFalse(g._commandList.isCommand("perf"), "perf available to non-admin.")
+        self.assertEqual(g._commandList.getCommand("quit")._latencyStats, None, "Quit writes latency report.")
+
+class RenderCacheTest(unittest.TestCase):
+    """
+    Tests RenderCache class.
+    """
+    def testRender(self):
+        from util.render_cache import RenderCache
+        from space import Space
+        cache = RenderCache()
+        owner = Space("Shire", "Home of the Hobbits.")
+        renderer = MagicMock(return_value=["line one", "line two"])
+
+        #Rendered once per version
+        self.assertEqual(cache.render(owner, 1, renderer), "line one\nline two", "Lines not joined.")
+        cache.render(owner, 1, renderer)
+        self.assertEqual(renderer.call_count, 1, "Unchanged block rendered again.")
+        cache.render(owner, 2, renderer)
+        self.assertEqual(renderer.call_count, 2, "Changed block not rendered again.")
+
+    def testBounded(self):
+        from util.render_cache import RenderCache
+        from space import Space
+        cache = RenderCache(maxSize = 2)
+        shire, bree, rivendell = [Space(name, "A place.") for name in ("Shire", "Bree", "Rivendell")]
+        renderer = MagicMock(return_value=["line"])
+
+        #Least recently used block is dropped beyond the maximum size
+        for owner in (shire, bree, shire, rivendell):
+            cache.render(owner, 1, renderer)
+        self.assertEqual(renderer.call_count, 3, "Recently used block rendered again.")
+        self.assertEqual(len(cache._entries), 2, "Cache not bounded.")
+        cache.render(bree, 1, renderer)
+        self.assertEqual(renderer.call_count, 4, "Dropped block not rendered again.")
 
 class ItemTest(unittest.TestCase):
     """
@@ -160,6 +400,94 @@ class ItemSetTest(unittest.TestCase):
         actualWeight = self._items.weight()
         self.assertEqual(expectedWeight, actualWeight, errorMsg)
 
+    def testNameIndex(self):
+        from items.item import Item
+
+        sword = self._itemList[0]
+        otherSword = Item("Sword", "made by dwarves", 3)
+        self._items.addItem(otherSword)
+
+        #Lookups ignore case and extra whitespace; duplicates are kept in order
+        self.assertTrue(self._items.getItemByName(" SWORD ") is sword, "Wrong item found by name.")
+        self.assertEqual(self._items.getItemsByName("sword"), [sword, otherSword], "Duplicates not found.")
+        self.assertTrue(self._items.containsItemWithName("Helmet"), "Item not found by name.")
+
+        self._items.removeItem(sword)
+        self.assertTrue(self._items.getItemByName("sword") is otherSword, "Removed item still indexed.")
+        self._items.removeItem(otherSword)
+        self.assertFalse(self._items.containsItemWithName("sword"), "Removed name still indexed.")
+        self.assertEqual(self._items.getItemsByName("sword"), [], "Removed items still indexed.")
+
+    def testTypeIndex(self):
+        from items.weapon import Weapon
+        from items.armor import Armor
+        from constants import ItemType
+
+        sword = Weapon("Sting", "glows blue", 1, 3, 10)
+        axe = Weapon("Axe", "for chopping", 3, 4, 10)
+        mail = Armor("Mithril Mail", "light as a feather", 1, 5, 100)
+        for item in [sword, mail, axe]:
+            self._items.addItem(item)
+
+        self.assertEqual(self._items.getItemsByType(ItemType.WEAPON), [sword, axe], "Weapons not grouped in order.")
+        self.assertTrue(self._items.getFirstItemOfType(ItemType.ARMOR) is mail, "Wrong first armor.")
+        self.assertEqual(self._items.getItemTypes(), sorted([ItemType.GENERIC, ItemType.ARMOR, ItemType.WEAPON]),
+                "Wrong item types.")
+
+        self._items.removeItem(sword)
+        self._items.removeItem(mail)
+        self.assertTrue(self._items.getFirstItemOfType(ItemType.WEAPON) is axe, "Removed weapon still grouped.")
+        self.assertEqual(self._items.getItemsByType(ItemType.ARMOR), [], "Removed armor still grouped.")
+
+    def testRemovalKeepsOrder(self):
+        import cPickle
+        from items.item import Item
+
+        added = [Item("pebble %s" % i, "small", 1) for i in range(10)]
+        for item in added:
+            self._items.addItem(item)
+
+        #Removing most items compacts storage; order is kept throughout
+        for item in self._itemList + added[:7]:
+            self._items.removeItem(item)
+        self.assertEqual(self._items.getItems(), added[7:], "Order changed by removal.")
+        self.assertRaises(ValueError, self._items.removeItem, added[0])
+
+        copy = cPickle.loads(cPickle.dumps(self._items, cPickle.HIGHEST_PROTOCOL))
+        removed = copy.getItems()[0]
+        copy.removeItem(removed)
+        self.assertEqual([item.getName() for item in copy], ["pebble 8", "pebble 9"], "Copy not removable.")
+        self.assertEqual(copy.weight(), 2, "Copy has wrong weight.")
+
+    def testStacks(self):
+        from items.potion import Potion
+        from factories import shop_factory
+
+        #Identical items, generated or not, share a stack
+        potion = shop_factory.genPotion(1, 0)
+        self.assertTrue(shop_factory.genPotion(1, 0) is potion, "Identical potions not shared.")
+        other = Potion(potion.getName(), potion.getDescription(), potion.getWeight(),
+                potion.getHealing(), potion.getCost())
+        count = self._items.count()
+        weight = self._items.weight()
+        self._items.addItem(potion, 30)
+        self._items.addItem(other)
+
+        errorMsg = "Stack not counted correctly."
+        self.assertEqual(len(self._items.getItemsByName(potion.getName())), 1, errorMsg)
+        self.assertEqual(self._items.getCount(other), 31, errorMsg)
+        self.assertEqual(self._items.count(), count + 31, errorMsg)
+        self.assertEqual(self._items.weight(), weight + 31, errorMsg)
+
+        #Removing part of a stack keeps the rest
+        self._items.removeItem(other, 30)
+        self.assertEqual(self._items.getCount(potion), 1, errorMsg)
+        self.assertEqual(self._items.weight(), weight + 1, errorMsg)
+        self.assertRaises(ValueError, self._items.removeItem, potion, 2)
+        self._items.removeItem(potion)
+        self.assertFalse(potion in self._items, "Empty stack still contained.")
+        self.assertEqual(self._items.count(), count, errorMsg)
+
     def testItemSetIter(self):
         #Verify iterator returns by ItemSet object visits the exact
         #collection of objects added to ItemSet
@@ -229,7 +557,55 @@ class SpaceTest(unittest.TestCase):
         self.assertFalse(items.containsItem(blade), 
                 "Blade found in room (even though it was removed).")
         self.assertTrue(items.containsItem(bow), "Could not find bow in room's set of items.")
-        
+
+    def testExits(self):
+        import cPickle
+        from space import Space
+        from space_graph import SpaceGraph
+
+        graph = SpaceGraph()
+        shire = Space("Shire", "Home of the Hobbits.", graph = graph)
+        oldForest = Space("Old Forest", "Trees.", graph = graph)
+        bree = Space("Bree", "A village.", graph = graph)
+        self.assertEqual(graph.getSpaceCount(), 3, "Spaces not added to graph.")
+
+        #Exits in both directions, or only one
+        shire.createExit("east", oldForest)
+        oldForest.createExit("north", bree, outgoingOnly = True)
+        self.assertTrue(shire.getExit("east") is oldForest, "Exit not created.")
+        self.assertTrue(oldForest.getExit("west") is shire, "Exit not created in both directions.")
+        self.assertEqual(bree.getExit("south"), None, "Outgoing-only exit created in both directions.")
+        self.assertEqual(shire.getExit("north"), None, "Space should have no north exit.")
+        self.assertEqual(graph.getReachable(shire.getIndex()), [0, 1, 2], "Wrong spaces reachable.")
+        self.assertEqual(graph.getReachable(bree.getIndex()), [2], "One-way exit followed backwards.")
+
+        #Clearing
+        shire.clearExit("east", False)
+        self.assertEqual(shire.getExit("east"), None, "Exit not cleared.")
+        self.assertEqual(oldForest.getExit("west"), None, "Exit not cleared in both directions.")
+
+        #Invalid direction
+        self.assertRaises(AssertionError, shire.createExit, "up", bree)
+
+        #Pickled spaces keep their exits
+        copy = cPickle.loads(cPickle.dumps(oldForest, cPickle.HIGHEST_PROTOCOL))
+        self.assertEqual(copy.getExit("north").getName(), "Bree", "Exit lost when pickled.")
+
+        #Spaces made without a graph each get their own, merged when connected
+        mordor = Space("Mordor", "Ash.")
+        ithilien = Space("Ithilien", "Green.")
+        self.assertEqual(mordor.getGraph().getSpaceCount(), 1, "Standalone space shares a graph.")
+        mordor.createExit("west", ithilien)
+        self.assertTrue(mordor.getGraph() is ithilien.getGraph(), "Graphs not merged.")
+        self.assertTrue(mordor.getExit("west") is ithilien, "Exit not created.")
+        self.assertTrue(ithilien.getExit("east") is mordor, "Exit not created in both directions.")
+
+        #A standalone space joins a world's graph, which keeps its exits
+        ithilien.createExit("north", oldForest)
+        self.assertTrue(mordor.getGraph() is graph, "Smaller graph not merged into larger.")
+        self.assertTrue(mordor.getExit("west").getExit("north").getExit("north") is bree, "Exits lost in merge.")
+        self.assertTrue(shire.getExit("east") is None and oldForest.getExit("north") is bree, "Exits lost in merge.")
+
 class PickUpTest(unittest.TestCase):
     """
     Test PickUp class.
@@ -259,7 +635,7 @@ class PickUpTest(unittest.TestCase):
         #Assert item in player inventory but not in space and not in equipment
         rawInputMock = MagicMock(return_value="Dagger")
         
-        with patch('commands.pick_up_command.raw_input', create=True, new=rawInputMock):
+        with patch.object(player.getIO(), 'readLine', new=rawInputMock):
             pickUpCmd.execute()
             
         self.assertFalse(space.containsItem(item), "Space should not have item but does.")
@@ -299,7 +675,7 @@ class DropTest(unittest.TestCase):
         #Assert item in space but not in player inventory and not in equipment
         rawInputMock = MagicMock(return_value="Dagger")
 
-        with patch('commands.drop_command.raw_input', create=True, new=rawInputMock):
+        with patch.object(player.getIO(), 'readLine', new=rawInputMock):
             dropCmd.execute()
             
         self.assertTrue(space.containsItemString("Dagger"), "Space should have item but does not.")
@@ -330,6 +706,28 @@ class DescribeTest(unittest.TestCase):
             "Describe command gave incorrect description.")
         """
 
+    def testCachedDescriptionFollowsItems(self):
+        from space import Space
+        from player import Player
+        from items.item import Item
+        from game_io import ScriptIO
+        from commands.describe_command import DescribeCommand
+
+        space = Space("Shire", "Home of the Hobbits.")
+        io = ScriptIO()
+        player = Player("Frodo", space, io)
+        describeCmd = DescribeCommand("describe", "Describes space", player)
+
+        describeCmd.execute()
+        first = io.getOutput()
+        describeCmd.execute()
+        self.assertEqual(io.getOutput(), first * 2, "Cached description differs.")
+
+        #Adding an item changes the description
+        space.addItem(Item("Pipe", "Full of Longbottom Leaf", 1))
+        describeCmd.execute()
+        self.assertTrue("\tPipe" in io.getOutput()[len(first) * 2:], "Description not updated after item added.")
+
 class EquipTest(unittest.TestCase):
     """
     Tests Equip Command.
@@ -354,7 +752,7 @@ class EquipTest(unittest.TestCase):
         weapon = Weapon("Dagger", "A trusty blade", 2, 2, 1)
 
         rawInputMock = MagicMock(return_value="Dagger")
-        with patch('commands.equip_command.raw_input', create=True, new=rawInputMock):
+        with patch.object(player.getIO(), 'readLine', new=rawInputMock):
             equipCmd.execute()
         
         equipped = player.getEquipped()
@@ -371,7 +769,7 @@ class EquipTest(unittest.TestCase):
         inventory.addItem(item)
 
         rawInputMock = MagicMock(return_value="Charm")
-        with patch('commands.equip_command.raw_input', create=True, new=rawInputMock):
+        with patch.object(player.getIO(), 'readLine', new=rawInputMock):
             equipCmd.execute()
         
         equipped = player.getEquipped()
@@ -388,7 +786,7 @@ class EquipTest(unittest.TestCase):
         inventory.addItem(weapon)
         
         rawInputMock = MagicMock(return_value="Dagger")
-        with patch('commands.equip_command.raw_input', create=True, new=rawInputMock):
+        with patch.object(player.getIO(), 'readLine', new=rawInputMock):
             equipCmd.execute()
             
         equipped = player.getEquipped()
@@ -409,7 +807,7 @@ class EquipTest(unittest.TestCase):
         equipped.addItem(weapon)
         
         rawInputMock = MagicMock(return_value="Dagger")
-        with patch('commands.equip_command.raw_input', create=True, new=rawInputMock):
+        with patch.object(player.getIO(), 'readLine', new=rawInputMock):
             equipCmd.execute() 
             
         numberInInventory = 0
@@ -444,7 +842,7 @@ class UnequipTest(unittest.TestCase):
         weapon = Weapon("Dagger", "A trusty blade", 2, 2, 1)
 
         rawInputMock = MagicMock(return_value="Dagger")
-        with patch('commands.unequip_command.raw_input', create=True, new=rawInputMock):
+        with patch.object(player.getIO(), 'readLine', new=rawInputMock):
             unequipCmd.execute()
 
         ###TODO: FIND SOME WAY TO MAKE SURE THAT PRINT STATEMENT PRINTED
@@ -459,7 +857,7 @@ class UnequipTest(unittest.TestCase):
         player.equip(weapon)
 
         rawInputMock = MagicMock(return_value="Dagger")
-        with patch('commands.unequip_command.raw_input', create=True, new=rawInputMock):
+        with patch.object(player.getIO(), 'readLine', new=rawInputMock):
             unequipCmd.execute()
 
         equipped = player.getInventory()
@@ -683,7 +1081,7 @@ class InnTest(unittest.TestCase):
         #Player chooses to stay at the inn
         rawInputMock = MagicMock(return_value=1)
         
-        with patch('cities.inn.raw_input', create=True, new=rawInputMock):
+        with patch.object(player.getIO(), 'readLine', new=rawInputMock):
             testinn.enter(player)
         
         #Player's money should decrease by the cost of the inn, in our case 5.
@@ -692,6 +1090,33 @@ class InnTest(unittest.TestCase):
         #Player's health should increase to maximum.
         self.assertEqual(player._hp, player._maxHp, "Player's health not increased to full health.")
 
+    def testSharedByPlayers(self):
+        from player import Player
+        from space import Space
+        from cities.inn import Inn
+        from cities.city import City
+
+        testinn = Inn("Chris' testing Inn", "Come test here", "hi", 5)
+        space = Space("Shire", "Home of the Hobbits.", city = City("Test City", "testing city", "hello", testinn))
+        frodo = Player("Frodo", space)
+        sam = Player("Sam", space)
+        for player in (frodo, sam):
+            player._hp = 1
+            player._money = 10
+
+        #Sam enters and leaves the inn while Frodo is choosing
+        def frodoChoice(prompt):
+            with patch.object(sam.getIO(), 'readLine', new=MagicMock(return_value=2)):
+                testinn.enter(sam)
+            return 1
+
+        with patch.object(frodo.getIO(), 'readLine', new=frodoChoice):
+            testinn.enter(frodo)
+
+        self.assertEqual(frodo._money, 5, "Wrong player charged.")
+        self.assertEqual(frodo._hp, frodo._maxHp, "Wrong player healed.")
+        self.assertEqual((sam._money, sam._hp), (10, 1), "Player who left was charged or healed.")
+
 #TODO make test for verifying the stats of items in the shop, and put into 1 shop test class with multiple methods
         
 class ShopSellItems(unittest.TestCase):
@@ -722,7 +1147,7 @@ class ShopSellItems(unittest.TestCase):
         #Player chooses to: 3(sell items), to sell leather tunic, yes, 5(Quit) the shop
         rawInputMock = MagicMock(side_effect = ["3", "Leather Tunic", "yes", "5"])
         
-        with patch('cities.shop.raw_input', create = True, new = rawInputMock):
+        with patch.object(player.getIO(), 'readLine', new=rawInputMock):
             testshop.enter(player)
         
         #Player's money should increase by the half the cost of item; in our case this is half of 1, which is 0.5.
@@ -734,7 +1159,7 @@ class ShopSellItems(unittest.TestCase):
         #Player chooses to: gobbledigook, 5(Quit) the shop
         rawInputMock = MagicMock(side_effect = ["gobbledigook", "5"])
         
-        with patch('cities.shop.raw_input', create = True, new = rawInputMock):
+        with patch.object(player.getIO(), 'readLine', new=rawInputMock):
             testshop.enter(player)
 
 class ShopPurchaseItems(unittest.TestCase):
@@ -759,11 +1184,11 @@ class ShopPurchaseItems(unittest.TestCase):
         player_money = player._money
        
         #Our shop should currently have 5 items (this was designed when it was created)
-        self.assertEqual(len(testshop._items), 5, "Our test shop was generated with the wrong number of items")
+        self.assertEqual(testshop.getItems().count(), 5, "Our test shop was generated with the wrong number of items")
 
         #Add Potion to Shop inventory. weight=1, healing=5, cost=3.
         testpotion = Potion ("Medium Potion of Healing", "A good concoction. Made by Master Wang.", 1, 5, 3)
-        testshop._items.append(testpotion)
+        testshop.getItems().addItem(testpotion)
        
         #Player should start with 20 rubles
         self.assertEqual(player._money, 20, "Player does not start with 20 rubles")
@@ -771,7 +1196,7 @@ class ShopPurchaseItems(unittest.TestCase):
         #Player chooses to: 4(purchase item), to purchase medium potion of healing, 4(purchase item), gobbledigook, 5(Quit) the shop
         rawInputMock = MagicMock(side_effect = ["4", "Medium Potion of Healing", "5"])
        
-        with patch('cities.shop.raw_input', create = True, new = rawInputMock):
+        with patch.object(player.getIO(), 'readLine', new=rawInputMock):
             testshop.enter(player)
        
         #Player's money should decrease by the cost of medium potion, which is 3.
@@ -782,12 +1207,12 @@ class ShopPurchaseItems(unittest.TestCase):
 
         #Add superduperlegendary Potion to Shop inventory. weight=1, healing=35, cost=28.
         testpotion2 = Potion ("SuperDuperLegendary Potion of Healing", "A Wang concoction. Made by Master Wang.", 1, 35, 28)
-        testshop._items.append(testpotion2)
+        testshop.getItems().addItem(testpotion2)
 
         #Player chooses to: 4(purchase item), SuperDuperLegendary Potion of Healing, 4(purchase item) , fake item, 5(Quit) the shop
         rawInputMock = MagicMock(side_effect = ["4", "SuperDuperLegendary Potion of Healing", "5"])
        
-        with patch('cities.shop.raw_input', create = True, new = rawInputMock):
+        with patch.object(player.getIO(), 'readLine', new=rawInputMock):
             testshop.enter(player)
        
         #Player's money should not decrease by the cost of SuperDuperLegendary Potion of Healing, which is 28.
@@ -799,7 +1224,7 @@ class ShopPurchaseItems(unittest.TestCase):
         #Player chooses to: 4(purchase item), fake item, 5(Quit) the shop
         rawInputMock = MagicMock(side_effect = ["4", "Fake Item", "5"])
        
-        with patch('cities.shop.raw_input', create = True, new = rawInputMock):
+        with patch.object(player.getIO(), 'readLine', new=rawInputMock):
             testshop.enter(player)
        
         #Player's money should not change.
@@ -811,9 +1236,55 @@ class ShopPurchaseItems(unittest.TestCase):
         #Player chooses to: gobbledigook, 5(Quit) the shop
         rawInputMock = MagicMock(side_effect = ["gobbledigook", "5"])
        
-        with patch('cities.shop.raw_input', create = True, new = rawInputMock):
+        with patch.object(player.getIO(), 'readLine', new=rawInputMock):
             testshop.enter(player)
         
+class ShopStock(unittest.TestCase):
+    """
+    Tests generation of shop items.
+    """
+    def testItemsGeneratedOnDemand(self):
+        from cities.shop import Shop
+
+        shop = Shop("Chris' testing Shop", "Come test here", "hi", 5, 10)
+        self.assertEqual(shop._items, None, "Items generated before they were needed.")
+        self.assertEqual(shop.getItems().count(), 5, "Wrong number of items generated.")
+
+        #Same seed, same items, regardless of visit order
+        names = [item.getName() for item in shop.getItems()]
+        otherShop = Shop("Chris' testing Shop", "Come test here", "hi", 5, 10)
+        otherNames = [item.getName() for item in otherShop.getItems()]
+        self.assertEqual(names, otherNames, "Same seed generated different items.")
+
+        seededShop = Shop("Chris' testing Shop", "Come test here", "hi", 50, 10, seed = "other")
+        seededNames = [item.getName() for item in seededShop.getItems()]
+        self.assertNotEqual(names, seededNames[:5], "Seed ignored.")
+
+    def testQuantities(self):
+        from player import Player
+        from space import Space
+        from cities.shop import Shop
+        from cities.city import City
+        from factories import shop_factory
+        import constants
+
+        shop = Shop("Chris' testing Shop", "Come test here", "hi", 0, 1)
+        player = Player("Frodo", Space("Shire", "Home of the Hobbits.", city = City("Test City", "testing city", "hello", shop)))
+        player._money = 100
+        potion = shop_factory.genPotion(1, 0)
+        shop.getItems().addItem(potion, 30)
+
+        #Player buys 10 potions, sells 4 back, and quits
+        rawInputMock = MagicMock(side_effect = ["4", "10 %s" % potion.getName(), "3", "4 %s" % potion.getName(), "yes", "5"])
+        with patch.object(player.getIO(), 'readLine', new=rawInputMock):
+            shop.enter(player)
+
+        self.assertEqual(player.getInventory().getCount(potion), 6, "Wrong number of potions bought or sold.")
+        self.assertEqual(shop.getItems().count(), 24, "Wrong number of potions in stock.")
+        self.assertEqual(shop.getItems().getItems(), [potion], "Stock not kept as one stack.")
+        self.assertEqual(player._money, 100 - 10 * potion.getCost() + 4 * constants.SELL_LOSS_PERCENTAGE * potion.getCost(),
+                "Wrong amount paid.")
+
 class SquareDoesNotCrash(unittest.TestCase):
     """
     Tests the ability of Square Object.
@@ -832,12 +1303,11 @@ class SquareDoesNotCrash(unittest.TestCase):
         #Player chooses to: 1(talk), to Master Wang, 1(talk), to Miles, 2(Leave) the square
         rawInputMock = MagicMock(side_effect = ["1", "Master Wang", "1", "Miles", "gobbledigook", "2"])
         
-        with patch('cities.square.raw_input', create = True, new = rawInputMock):
+        with patch.object(player.getIO(), 'readLine', new=rawInputMock):
             testsquare.enter(player)
         
         #If the code gets here, then it hasn't crashed yet; test something arbitrary here, like player's money.
         self.assertEqual(player._money, 20, "Why does player's money not equal 20?")
-        
 
 class City(unittest.TestCase):
     """
@@ -855,13 +1325,11 @@ class City(unittest.TestCase):
         player = Player("Frodo", space)
         
         #Player chooses to "gobbledigook", enter Inn, 2(Leave)s the inn, enters inn again, 2(Leave)s inn again, leaves city
-        cityInputMock = MagicMock(side_effect = ["gobbledigook", "Seth n Breakfast Test Inn", 
-                                                "Seth n Breakfast Test Inn", 'leave city' ])
-        innInputMock = MagicMock(side_effect = ["2", "2"])
+        rawInputMock = MagicMock(side_effect = ["gobbledigook", "Seth n Breakfast Test Inn", "2",
+                                                "Seth n Breakfast Test Inn", "2", 'leave city' ])
         
-        with patch('cities.city.raw_input', create = True, new = cityInputMock):
-            with patch('cities.inn.raw_input', create = True, new = innInputMock):
-                testCity.enter(player)
+        with patch.object(player.getIO(), 'readLine', new=rawInputMock):
+            testCity.enter(player)
         
 class UniquePlace(unittest.TestCase):
     """
@@ -896,7 +1364,7 @@ class EnterCommand(unittest.TestCase):
         #Player chooses to "gobbledigook", enter, "Jdlskfjsd City", stop entering a city
         rawInputMock = MagicMock(side_effect = ["gobbledigook", "enter", "Jdlskfjsd City", "stop"])
         
-        with patch('commands.enter_command.raw_input', create = True, new = rawInputMock):
+        with patch.object(player.getIO(), 'readLine', new=rawInputMock):
                 testEnterCommand.execute()
         
         #If the code gets here, then it hasn't crashed yet; test something arbitrary here, like player's money.
@@ -921,14 +1389,12 @@ class EnterCommand(unittest.TestCase):
         testEnterCommand = EnterCommand("Test Enter Command", "Tests Entering", player)
         
         #Player chooses to go to testCity1, leave, testCity2, leave, testCity3, leave, testUniquePlace, stop
-        spaceInputMock = MagicMock(side_effect = 
-                ["Jim's Mobile Fun City", "Seth's Sans-Shabbiness Shack Sh-City", 
-                "Miles' Magical Cookie Jail City", "Master Wang's Magical Testing Place", "stop"])
-        cityInputMock = MagicMock(side_effect = ["leave city", "leave city", "leave city"])
+        rawInputMock = MagicMock(side_effect = 
+                ["Jim's Mobile Fun City", "leave city", "Seth's Sans-Shabbiness Shack Sh-City", "leave city",
+                "Miles' Magical Cookie Jail City", "leave city", "Master Wang's Magical Testing Place", "stop"])
         
-        with patch('commands.enter_command.raw_input', create = True, new = spaceInputMock):
-            with patch('cities.city.raw_input', create = True, new = cityInputMock):
-                testEnterCommand.execute()
+        with patch.object(player.getIO(), 'readLine', new=rawInputMock):
+            testEnterCommand.execute()
         
         #If the code gets here, then it hasn't crashed yet; test something arbitrary here, like player's money.
         self.assertEqual(player._money, 20, "Why does player's money not equal 20?")
@@ -954,12 +1420,636 @@ class DescribeCommand(unittest.TestCase):
         #Player chooses to "gobbledigook", describe, "gobbledigook"
         rawInputMock = MagicMock(side_effect = ["gobbledigook", "enter", "Jdlskfjsd City", "stop"])
         
-        with patch('commands.describe_command.raw_input', create = True, new = rawInputMock):
+        with patch.object(player.getIO(), 'readLine', new=rawInputMock):
                 testDescribeCommand.execute()
         
         #If the code gets here, then it hasn't crashed yet; test something arbitrary here, like player's money.
         self.assertEqual(player._money, 20, "Why does player's money not equal 20?")
 
+class TravelCommandTest(unittest.TestCase):
+    """
+    Tests the ability of Travel Command.
+    """
+    def testTravel(self):
+        from game import Game
+        from game_io import ScriptIO
+        io = ScriptIO(["travel to Mirkwood", "travel mordor"])
+        g = Game(io=io)
+
+        g._nextTurn()
+        self.assertEqual(g._player.getLocation().getName(), "Mirkwood", "Player did not travel.")
+        g._nextTurn()
+        output = io.getOutput()
+        self.assertTrue("Welcome to Mirkwood." in output, "Missing arrival from travel command.")
+        self.assertTrue("There is no place called mordor." in output, "Missing unknown place message.")
+
+class WorldLoaderTest(unittest.TestCase):
+    """
+    Tests loading the world from its data file.
+    """
+    def _getData(self):
+        return {"start": "shire",
+                "spaces": [{"id": "shire", "name": "Shire", "description": "Home of the Hobbits.",
+                            "city": "hobbiton"},
+                           {"id": "oldForest", "name": "Old Forest", "description": "Trees."}],
+                "cities": {"hobbiton": {"name": "Hobbiton", "description": "A village.",
+                                        "greeting": "Hi!", "buildings": ["sallyInn"]}},
+                "buildings": {"sallyInn": {"type": "inn", "name": "Sally's Inn",
+                                           "description": "A place for strangers.",
+                                           "greeting": "Welcome!", "cost": 2}},
+                "exits": [["shire", "east", "oldForest"]]}
+
+    def testBuildWorld(self):
+        from game_loader import buildWorld
+        world = buildWorld(self._getData())
+        shire = world.getStart()
+
+        self.assertEqual(shire.getName(), "Shire", "Wrong starting space.")
+        self.assertEqual(shire.getCity().getBuildings()[0].getName(), "Sally's Inn", "City not built.")
+        oldForest = shire.getExit("east")
+        self.assertEqual(oldForest.getName(), "Old Forest", "Exit not created.")
+        self.assertEqual(oldForest.getExit("west"), shire, "Exit not created in both directions.")
+
+        #Everything built is registered
+        self.assertEqual(world.getSpace("oldForest"), oldForest, "Space not registered.")
+        self.assertEqual(world.getCity("hobbiton"), shire.getCity(), "City not registered.")
+        self.assertEqual(world.getBuilding("sallyInn"), shire.getCity().getBuildings()[0],
+                "Building not registered.")
+
+        #Unknown references are reported
+        data = self._getData()
+        data["exits"].append(["shire", "north", "mordor"])
+        self.assertRaises(AssertionError, buildWorld, data)
+
+    def testSnapshot(self):
+        import json
+        import os
+        import cPickle
+        import shutil
+        import tempfile
+        import game_loader
+
+        directory = tempfile.mkdtemp()
+        filename = os.path.join(directory, "world.json")
+        try:
+            with open(filename, "w") as dataFile:
+                json.dump(self._getData(), dataFile)
+
+            #Cold start writes snapshot; warm start does not build
+            cold = game_loader.getWorld(filename)
+            self.assertTrue(os.path.exists(os.path.join(directory, "world.snapshot")), "Snapshot not written.")
+            with patch.object(game_loader, "buildWorld") as buildWorld:
+                warm = game_loader.getWorld(filename)
+                self.assertFalse(buildWorld.called, "World built despite current snapshot.")
+            self.assertEqual(warm.getStart().getExit("east").getName(), "Old Forest", "Snapshot world not linked.")
+            self.assertEqual(warm.findSpaces("old forest"), [warm.getSpace("oldForest")],
+                    "Snapshot world not indexed.")
+            self.assertFalse(warm is cold, "Snapshot should load a new world.")
+
+            #Changing the source of a pickled class invalidates snapshot
+            with open(os.path.join(directory, "world.snapshot"), "rb") as snapshot:
+                cPickle.load(snapshot)
+                fingerprints = cPickle.load(snapshot)
+            self.assertTrue("space" in fingerprints and "cities.building" in fingerprints,
+                    "Modules of pickled classes not fingerprinted.")
+            changed = lambda moduleNames: dict.fromkeys(moduleNames, "changed")
+            with patch.object(game_loader, "_getModuleFingerprints", changed):
+                with patch.object(game_loader, "buildWorld", wraps=game_loader.buildWorld) as buildWorld:
+                    game_loader.getWorld(filename)
+                    self.assertTrue(buildWorld.called, "Snapshot used after class source changed.")
+
+            #Changing the data file invalidates snapshot
+            data = self._getData()
+            data["spaces"][1]["name"] = "Older Forest"
+            with open(filename, "w") as dataFile:
+                json.dump(data, dataFile)
+            world = game_loader.getWorld(filename)
+            self.assertEqual(world.getStart().getExit("east").getName(), "Older Forest", "Out of date snapshot used.")
+            self.assertTrue(isinstance(world.getStart().getName(), str), "Strings not converted from unicode.")
+        finally:
+            shutil.rmtree(directory)
+
+class WorldTest(unittest.TestCase):
+    """
+    Tests World registry.
+    """
+    def testLookup(self):
+        from world import World, normalizeName
+        from space import Space
+        from cities.city import City
+        from unique_place import UniquePlace
+
+        world = World()
+        shire = Space("Shire", "Home of the Hobbits.")
+        mitheithel = Space("Mitheithel", "A river.")
+        dunland = Space("Mitheithel", "Not a river.")
+        helmsDeep = UniquePlace("Helm's Deep", "A fortress.")
+        for spaceId, space in [("shire", shire), ("mitheithel", mitheithel), ("dunland", dunland)]:
+            world.addSpace(spaceId, space)
+        world.addUniquePlace("helmsDeep", helmsDeep)
+        world.addCity("shire", City("Hobbiton", "A village.", "Hi!"))
+
+        #By id; kinds have separate ids
+        self.assertEqual(world.getSpace("dunland"), dunland, "Space not found by id.")
+        self.assertEqual(world.getCity("shire").getName(), "Hobbiton", "City not found by id.")
+        self.assertEqual(world.getSpace("mordor"), None, "Unknown id should give None.")
+        self.assertEqual(world.getId(dunland), "dunland", "Wrong id for space.")
+
+        #By normalized name
+        self.assertEqual(normalizeName("  Helm's   DEEP "), "helms deep", "Name not normalized.")
+        self.assertEqual(world.findUniquePlaces("helms deep"), [helmsDeep], "Place not found by name.")
+        self.assertEqual(world.findSpaces("MITHEITHEL"), [mitheithel, dunland], "Duplicate names not kept.")
+        self.assertEqual(world.findSpaces("Mordor"), [], "Unknown name should give no spaces.")
+
+        #Ids are unique; start must exist
+        self.assertRaises(AssertionError, world.addSpace, "shire", Space("Shire", "Again."))
+        self.assertRaises(AssertionError, world.setStart, "mordor")
+        world.setStart("shire")
+        self.assertEqual(world.getStart(), shire, "Wrong starting space.")
+
+class PathfinderTest(unittest.TestCase):
+    """
+    Tests Pathfinder class.
+    """
+    def testFindPath(self):
+        from space import Space
+        from space_graph import SpaceGraph
+        from pathfinder import Pathfinder
+
+        graph = SpaceGraph()
+        shire, oldForest, bree, weatherHills, island = \
+                [Space(name, "", graph = graph) for name in ["Shire", "Old Forest", "Bree", "Weather Hills", "Island"]]
+        shire.createExit("east", oldForest)
+        oldForest.createExit("east", bree)
+        shire.createExit("north", weatherHills)
+        weatherHills.createExit("east", bree, outgoingOnly = True)
+
+        #Same routes with and without next-hop table, and with A*
+        for pathfinder in [Pathfinder(graph), Pathfinder(graph, nextHopLimit = 0)]:
+            self.assertEqual(pathfinder.findPath(oldForest, bree), ["east"], "Wrong route.")
+            self.assertEqual(pathfinder.getDistance(shire, bree), 2, "Route not shortest.")
+            self.assertEqual(pathfinder.findPath(bree, weatherHills), ["west", "west", "north"],
+                    "One-way exit followed backwards.")
+            self.assertEqual(pathfinder.findPath(shire, shire), [], "Route to start should be empty.")
+            self.assertEqual(pathfinder.findPath(shire, island), None, "Route found to unreachable space.")
+        self.assertEqual(Pathfinder(graph).findPath(weatherHills, bree, heuristic = lambda index: 0), ["east"],
+                "Wrong A* route.")
+
+        #Table follows changes to exits
+        pathfinder = Pathfinder(graph)
+        self.assertEqual(pathfinder.getDistance(bree, island), None, "Route found to unreachable space.")
+        bree.createExit("south", island)
+        self.assertEqual(pathfinder.getDistance(shire, island), 3, "Next-hop table not rebuilt.")
+
+    def testStockWorld(self):
+        import game_loader
+        from pathfinder import Pathfinder
+        world = game_loader.getWorld()
+        tablePathfinder = Pathfinder(world.getGraph())
+        searchPathfinder = Pathfinder(world.getGraph(), nextHopLimit = 0)
+
+        #Following a route arrives at the goal; both methods agree on its length
+        start = world.getStart()
+        for goal in world.getSpaces():
+            path = tablePathfinder.findPath(start, goal)
+            self.assertEqual(len(path), searchPathfinder.getDistance(start, goal), "Route not shortest.")
+            space = start
+            for direction in path:
+                space = space.getExit(direction)
+            self.assertTrue(space is goal, "Route does not lead to goal.")
+
+class WorldReloaderTest(unittest.TestCase):
+    """
+    Tests patching a live world.
+    """
+    def _getData(self):
+        return {"start": "shire",
+                "spaces": [{"id": "shire", "name": "Shire", "description": "Home of the Hobbits.",
+                            "city": "hobbiton"},
+                           {"id": "oldForest", "name": "Old Forest", "description": "Trees."},
+                           {"id": "barrowDowns", "name": "Barrow Downs", "description": "Fog."}],
+                "cities": {"hobbiton": {"name": "Hobbiton", "description": "A village.",
+                                        "greeting": "Hi!", "buildings": ["sallyInn", "bagEnd"]}},
+                "buildings": {"sallyInn": {"type": "inn", "name": "Sally's Inn",
+                                           "description": "A place for strangers.",
+                                           "greeting": "Welcome!", "cost": 2},
+                              "bagEnd": {"type": "square", "name": "Bag End", "description": "A hole.",
+                                         "greeting": "Hello", "talk": {"Bilbo": "Good morning"}}},
+                "exits": [["shire", "east", "oldForest"], ["oldForest", "south", "barrowDowns"]]}
+
+    def testPatchWorld(self):
+        from game_loader import buildWorld
+        from player import Player
+        from items.item import Item
+        from game_io import ScriptIO
+        from world_reloader import patchWorld
+
+        world = buildWorld(self._getData())
+        shire = world.getStart()
+        oldForest = world.getSpace("oldForest")
+        inn, square = shire.getCity().getBuildings()
+        sword = Item("Sword", "Sharp", 1)
+        oldForest.addItem(sword)
+        walker = Player("Walker", oldForest, ScriptIO())
+        lost = Player("Lost", world.getSpace("barrowDowns"), ScriptIO())
+        version = oldForest.getVersion()
+
+        #Edit greeting, cost, talk and a description; move an exit; remove a space
+        data = self._getData()
+        data["buildings"]["sallyInn"]["cost"] = 5
+        data["buildings"]["bagEnd"]["talk"]["Bilbo"] = "Good evening"
+        data["spaces"][1]["description"] = "Old trees."
+        data["spaces"][2] = {"id": "bree", "name": "Bree", "description": "A village."}
+        data["exits"][1] = ["oldForest", "east", "bree"]
+        changes = patchWorld(world, buildWorld(data), [walker, lost])
+
+        #Live objects patched in place
+        self.assertTrue(world.getStart() is shire, "Start replaced instead of patched.")
+        self.assertTrue(walker.getLocation() is oldForest, "Player location no longer valid.")
+        self.assertEqual(oldForest.getDescription(), "Old trees.", "Description not patched.")
+        self.assertTrue(oldForest.getVersion() > version, "Version unchanged; descriptions cached.")
+        self.assertEqual(shire.getCity().getBuildings(), [inn, square], "Buildings replaced.")
+        self.assertEqual(inn.getCost(), 5, "Inn not patched.")
+        self.assertEqual(square._talk["Bilbo"], "Good evening", "Talk not patched.")
+        self.assertTrue(oldForest.containsItem(sword), "Items on the ground lost.")
+
+        #Graph and registry follow the data
+        bree = world.getSpace("bree")
+        self.assertTrue(oldForest.getExit("east") is bree, "Exit not added.")
+        self.assertTrue(bree.getExit("west") is oldForest, "Exit not added in both directions.")
+        self.assertEqual(oldForest.getExit("south"), None, "Exit to removed space kept.")
+        self.assertEqual(world.getSpace("barrowDowns"), None, "Removed space still registered.")
+        self.assertEqual(world.findSpaces("Barrow Downs"), [], "Removed space still indexed.")
+
+        #Players in removed spaces go to start
+        self.assertTrue(lost.getLocation() is shire, "Player left in removed space.")
+        for change in ["Updated building 'sallyInn'.", "Updated building 'bagEnd'.", "Added space 'bree'.",
+                       "Removed space 'barrowDowns'.", "Moved Lost to 'Shire'."]:
+            self.assertTrue(change in changes, "Change not reported: %s" % change)
+
+        #Nothing to do the second time
+        self.assertEqual(patchWorld(world, buildWorld(data)), [], "Changes reported for same data.")
+
+class SharedWorldTest(unittest.TestCase):
+    """
+    Tests moving a world's read-only data into shared memory.
+    """
+    def _describe(self, world):
+        #Everything shareWorld() moves, as seen through getters
+        lines = []
+        for space in sorted(world.getSpaces(), key=lambda space: space.getIndex()):
+            lines.append(space.getDescription())
+            lines.extend(str(space.getExit(direction) and space.getExit(direction).getName())
+                         for direction in ["north", "south", "east", "west"])
+        for buildingId in sorted(world.getBuildingIds()):
+            building = world.getBuilding(buildingId)
+            lines.extend([building.getDescription(), building.greetings(), getattr(building, "getTalk", list)()])
+        for cityId in sorted(world.getCityIds()):
+            lines.extend([world.getCity(cityId).getDescription(), world.getCity(cityId).greetings()])
+        return lines
+
+    def testShareWorld(self):
+        import game_loader
+        from space import Space
+        from shared_world import shareWorld
+        from world_reloader import patchWorld
+
+        world = game_loader.getWorld()
+        before = self._describe(world)
+        size = shareWorld(world)
+
+        self.assertTrue(size > 0, "Nothing shared.")
+        self.assertEqual(self._describe(world), before, "Shared world reads differently.")
+        self.assertTrue(isinstance(world.getStart()._description, (int, long)), "Description not shared.")
+
+        #Shared worlds can still change
+        self.assertEqual(patchWorld(world, game_loader.getWorld()), [], "Changes reported for same data.")
+        shire = world.getStart()
+        tower = Space("Tower", "Tall.", graph = world.getGraph())
+        shire.createExit("north", tower)
+        self.assertTrue(tower.getExit("south") is shire, "Exit to new space not created.")
+
+    def testPrepareWorker(self):
+        import gc
+        import constants
+        from shared_world import prepareWorker
+
+        threshold = gc.get_threshold()
+        try:
+            prepareWorker()
+            self.assertEqual(gc.get_threshold(), threshold[:2] + (constants.WORKER_GC_FULL_THRESHOLD,),
+                    "Full collections not made rare.")
+            self.assertTrue(gc.isenabled(), "Young objects no longer collected.")
+        finally:
+            gc.set_threshold(*threshold)
+
+class StringTableTest(unittest.TestCase):
+    """
+    Tests normalizing and interning world and item text.
+    """
+    def testIntern(self):
+        from util.string_table import StringTable
+
+        strings = StringTable()
+        text = strings.intern("""
+            Trees crowd the road.   
+              Paths move.
+            """)
+        self.assertEqual(text, "Trees crowd the road.\n  Paths move.", "Text not normalized.")
+        self.assertTrue(strings.intern("\n  Trees crowd the road.\n    Paths move.\n") is text,
+                "Equal texts not shared.")
+        self.assertEqual(strings.getTextCount(), 1, "Text stored twice.")
+        self.assertEqual(strings.internData({" a ": [" b", 1]}), {"a": ["b", 1]}, "Data not interned.")
+
+    def testBuildWorld(self):
+        import game_loader
+        from factories import shop_factory
+
+        building = {"type": "shop", "name": "ElvenWares", "greeting": "Welcome!", "numItems": 20, "quality": 6}
+        data = {"start": "lorien",
+                "spaces": [{"id": "lorien", "name": "Lorien", "description": "\n    Golden woods.\n    ",
+                            "city": "caras"}],
+                "cities": {"caras": {"name": "Caras Galadhon", "description": "Golden woods.",
+                                     "greeting": "Hi.", "buildings": ["shop1", "shop2"]}},
+                "buildings": {"shop1": dict(building, description="Elven gear! "),
+                              "shop2": dict(building, description=" Elven gear!")}}
+        world = game_loader.buildWorld(data)
+
+        lorien = world.getStart()
+        self.assertEqual(lorien.getDescription(), "Golden woods.", "Description not normalized.")
+        self.assertTrue(lorien.getDescription() is lorien.getCity().getDescription(), "Descriptions not shared.")
+        shop1 = world.getBuilding("shop1")
+        shop2 = world.getBuilding("shop2")
+        self.assertTrue(shop1.getDescription() is shop2.getDescription(), "Shop descriptions not shared.")
+
+        #Generated items share their names
+        items = shop1.getItems().getItems() + shop2.getItems().getItems()
+        for item in items:
+            self.assertTrue(item.getName() is shop_factory.itemText.intern(item.getName()),
+                    "Item name not shared.")
+
+class CompressedWorldTest(unittest.TestCase):
+    """
+    Tests keeping descriptions compressed in memory.
+    """
+    def testCompressWorld(self):
+        import game_loader
+        import compressed_world
+        from compressed_world import CompressedText, compressWorld
+
+        self.addCleanup(setattr, compressed_world, "_cacheSize", compressed_world._cacheSize)
+        world = game_loader.getWorld()
+        shire = world.getStart()
+        description = shire.getDescription()
+        greetings = shire.getCity() and shire.getCity().greetings()
+
+        saved = compressWorld(world, cacheSize = 2)
+        self.assertTrue(saved > 0, "Nothing saved.")
+        self.assertTrue(type(shire._description) is CompressedText, "Description not compressed.")
+        self.assertEqual(shire.getDescription(), description, "Description changed.")
+        if greetings is not None:
+            self.assertEqual(shire.getCity().greetings(), greetings, "Greetings changed.")
+
+        #Only the most recently used texts stay decompressed
+        for space in world.getSpaces():
+            space.getDescription()
+        self.assertEqual(len(compressed_world._cache), 2, "Cache not bounded.")
+        self.assertEqual(shire.getDescription(), description, "Evicted description changed.")
+
+        #Short texts are left as they are
+        self.assertEqual(compressed_world.compressText("Fog."), "Fog.", "Short text compressed.")
+
+class RegionPagerTest(unittest.TestCase):
+    """
+    Tests paging idle regions of a world out of memory.
+    """
+    def testPaging(self):
+        from factories import world_factory
+        from region_pager import RegionPager, PagedOut
+        from items.item import Item
+        from player import Player
+        from game_io import ScriptIO
+        from commands import describe_command
+        from commands.describe_command import DescribeCommand
+
+        world = world_factory.getGridWorld(10, 10, cityDensity = 1.0, shopDensity = 1.0)
+        start = world.getStart()
+        description = start.getDescription()
+        shop = [building for building in start.getCity().getBuildings() if hasattr(building, "pageOut")][0]
+        stock = [item.getName() for item in shop.getItems()]
+        count = shop.getItems().count()
+        start.addItem(Item("Pipe", "Smells of leaf.", 1))
+
+        #Budget of one region
+        pager = RegionPager(world, budget = 1, regionSize = 10)
+        self.addCleanup(pager.close)
+        self.assertTrue(pager.getRegionCount() >= 10, "Regions too large.")
+        self.assertEqual(pager.getLoadedRegions(), [], "Regions loaded before use.")
+        self.assertTrue(type(start._items) is PagedOut, "Items not paged out.")
+
+        #Regions load when touched, or when a player moves into them
+        self.assertTrue(start.containsItemString("Pipe"), "Items lost.")
+        self.assertEqual(start.getDescription(), description, "Description lost.")
+        self.assertEqual([item.getName() for item in shop.getItems()], stock, "Stock lost.")
+        shop.getItems().removeItem(shop.getItems().getItems()[-1])
+
+        walker = Player("Walker", start, ScriptIO())
+        DescribeCommand("describe", "Describes the current space.", walker).execute()
+        version = start.getVersion()
+        region = pager.getRegion(start)
+        while pager.getRegion(walker.getLocation()) == region:
+            walker.moveSouth()
+        self.assertEqual(pager.getLoadedRegions(), [pager.getRegion(walker.getLocation())],
+                "Idle region not paged out, or occupied region paged out.")
+
+        #Rendered text is dropped; the version is known without loading
+        self.assertFalse(start in describe_command._renderCache._entries, "Rendered text kept.")
+        self.assertEqual(start.getVersion(), version, "Version changed by paging out.")
+        self.assertTrue(type(start._items) is PagedOut, "Region loaded for its version.")
+
+        #Changes survive paging out and in
+        self.assertEqual(shop.getItems().count(), count - 1, "Stock change lost.")
+        self.assertTrue(start.containsItemString("Pipe"), "Items lost after paging.")
+        self.assertEqual(start.getVersion(), version, "Version changed by paging in.")
+        self.assertEqual(len(pager.getLoadedRegions()), 2, "Occupied region paged out.")
+
+class WorldValidatorTest(unittest.TestCase):
+    """
+    Tests world validator.
+    """
+    def testValidateWorldData(self):
+        import os
+        import json
+        import constants
+        from world_validator import validateWorldData
+
+        filename = os.path.join(os.path.dirname(os.path.abspath(__file__)), constants.WORLD_FILE)
+        with open(filename) as dataFile:
+            problems = validateWorldData(json.load(dataFile))
+
+        #Known defects in the world
+        expected = ["Spaces 'mitheithel' and 'dunland' are both named 'Mitheithel'.",
+                    "Exit east of 'fangorn' to 'fieldOfCelebrant' is overwritten by exit to 'theWold'.",
+                    "Exit west of 'fieldOfCelebrant' to 'fangorn' has no exit back.",
+                    "Unique place 'tombombadilhouse' is defined but not placed in the world."]
+        for problem in expected:
+            self.assertTrue(problem in problems, "Validator missed: %s" % problem)
+
+        #Undefined references and unreachable spaces
+        data = {"start": "shire",
+                "spaces": [{"id": "shire", "name": "Shire", "description": "", "city": "hobbiton"},
+                           {"id": "oldForest", "name": "Old Forest", "description": ""}],
+                "exits": [["shire", "east", "bree"]]}
+        problems = validateWorldData(data)
+        self.assertTrue("Space 'shire' refers to undefined city 'hobbiton'." in problems, "Missed undefined city.")
+        self.assertTrue("Exit shire east bree refers to undefined space 'bree'." in problems, "Missed undefined space.")
+        self.assertTrue("Space 'oldForest' cannot be reached from 'shire'." in problems, "Missed unreachable space.")
+
+    def testValidateWorld(self):
+        from space import Space
+        from world_validator import validateWorld
+
+        shire = Space("Shire", "Home of the Hobbits.")
+        oldForest = Space("Old Forest", "Trees.")
+        copy = Space("Shire", "Another Shire.")
+        island = Space("Island", "Far away.")
+        shire.createExit("east", oldForest)
+        self.assertEqual(validateWorld(shire), [], "Problems reported for valid world.")
+
+        oldForest.createExit("south", copy, outgoingOnly = True)
+
+        problems = validateWorld(oldForest, [shire, oldForest, copy, island])
+        self.assertTrue("More than one space is named 'Shire'." in problems, "Missed duplicate name.")
+        self.assertTrue("Exit south of 'Old Forest' to 'Shire' has no exit back." in problems, "Missed one-way exit.")
+        self.assertTrue("Space 'Island' cannot be reached from 'Old Forest'." in problems, "Missed unreachable space.")
+
+class WorldFactoryTest(unittest.TestCase):
+    """
+    Tests generated worlds.
+    """
+    def _getSpaces(self, start):
+        #Every space reachable from start
+        spaces = [start]
+        seen = set([id(start)])
+        for space in spaces:
+            for direction in ["north", "south", "east", "west"]:
+                other = space.getExit(direction)
+                if other is not None and id(other) not in seen:
+                    seen.add(id(other))
+                    spaces.append(other)
+        return spaces
+
+    def testGridWorld(self):
+        from factories.world_factory import getGridWorld
+        world = getGridWorld(4, 3, cityDensity = 1.0, shopDensity = 1.0, itemDensity = 1.0)
+        start = world.getStart()
+
+        spaces = self._getSpaces(start)
+        self.assertEqual(len(spaces), 12, "Grid world has wrong number of spaces.")
+        self.assertEqual(world.getSpaceCount(), 12, "Grid world spaces not registered.")
+        self.assertEqual(world.getSpace("Space 3,2").getName(), "Space 3,2", "Space not registered by name.")
+        self.assertEqual(start.getExit("east").getExit("south").getName(), "Space 1,1", "Grid not linked.")
+        self.assertEqual(start.getExit("north"), None, "Corner should have no north exit.")
+        for space in spaces:
+            self.assertEqual(len(space.getCity().getBuildings()), 2, "City missing buildings.")
+            self.assertEqual(len(space.getItems().getItems()), 1, "Space missing item.")
+
+    def testRandomWorld(self):
+        from factories.world_factory import getRandomWorld
+        start = getRandomWorld(500, extraExits = 1.0, seed = 7).getStart()
+
+        #Connected, and every exit works both ways
+        spaces = self._getSpaces(start)
+        self.assertEqual(len(spaces), 500, "Random world not connected.")
+        opposites = {"north": "south", "south": "north", "east": "west", "west": "east"}
+        for space in spaces:
+            for direction, opposite in opposites.items():
+                other = space.getExit(direction)
+                if other is not None:
+                    self.assertTrue(other.getExit(opposite) is space, "Exit only works one way.")
+
+        #Same seed, same world
+        names = [space.getName() for space in spaces]
+        otherNames = [space.getName() for space in self._getSpaces(getRandomWorld(500, extraExits = 1.0, seed = 7).getStart())]
+        self.assertEqual(names, otherNames, "Same seed generated different world.")
+
+class ServerTest(unittest.TestCase):
+    """
+    Tests GameServer class.
+    """
+    def testSessionsShareWorld(self):
+        import socket
+        import threading
+        from server import GameServer
+
+        server = GameServer(port=0)
+        loop = threading.Thread(target=server.serveForever)
+        loop.start()
+
+        def play(commands):
+            sock = socket.create_connection(server.getAddress())
+            sock.sendall(commands)
+            output = ""
+            while True:
+                data = sock.recv(65536)
+                if not data:
+                    break
+                output += data
+            sock.close()
+            return output
+
+        try:
+            #Each session gets its own player
+            output = play("money\nquit\nyes\n")
+            self.assertTrue("Russian currently has 20 rubbles!" in output, "Session did not run command.")
+            self.assertTrue("Exiting" in output, "Session did not quit.")
+
+            #Sessions share the server's world
+            output = play("east\nquit\nyes\n")
+            self.assertTrue("Welcome to Old Forest." in output, "Session did not move through world.")
+        finally:
+            server.shutdown()
+            loop.join(5)
+
+        self.assertFalse(loop.is_alive(), "Server event loop did not stop.")
+
+    def testMenuTypoKeepsSession(self):
+        import socket
+        import threading
+        from server import GameServer
+        from game_loader import buildWorld
+
+        server = GameServer(port=0)
+        server._world = buildWorld({"start": "shire",
+                "spaces": [{"id": "shire", "name": "Shire", "description": "Home of the Hobbits.",
+                            "city": "hobbiton"}],
+                "cities": {"hobbiton": {"name": "Hobbiton", "description": "A village.",
+                                        "greeting": "Hi!", "buildings": ["sallyInn"]}},
+                "buildings": {"sallyInn": {"type": "inn", "name": "Sally's Inn",
+                                           "description": "A place for strangers.",
+                                           "greeting": "Welcome!", "cost": 2}}})
+        loop = threading.Thread(target=server.serveForever)
+        loop.start()
+
+        try:
+            sock = socket.create_connection(server.getAddress())
+            sock.sendall("enter Hobbiton\nSally's Inn\ngobbledigook\n2\nleave city\nmoney\nquit\nyes\n")
+            output = ""
+            while True:
+                data = sock.recv(65536)
+                if not data:
+                    break
+                output += data
+            sock.close()
+        finally:
+            server.shutdown()
+            loop.join(5)
+
+        #Non-numeric choice is rejected, and the session goes on
+        self.assertTrue("What?" in output, "Invalid menu choice not reported.")
+        self.assertTrue("Russian currently has 20 rubbles!" in output, "Session did not survive menu typo.")
+        self.assertTrue("Exiting" in output, "Session did not quit.")
+
 if __name__ == '__main__':
     #Supress output from game with "buffer=true"
     unittest.main()
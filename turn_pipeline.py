@@ -0,0 +1,157 @@
+#!/usr/bin/python
+
+from timeit import default_timer
+
+#Name under which the command itself is timed
+EXECUTE_STAGE = "execute"
+
+class TurnPipeline(object):
+    """
+    Runs a turn's command together with registered stages.
+
+    Pre-turn stages run after the command is read and before it executes;
+    post-turn stages run after it executes. Each stage is a function taking
+    (command, arguments). Timing of each stage may be switched on; when it
+    is off, no timers are read.
+    """
+    def __init__(self):
+        """
+        Initializes new pipeline with no stages and timing switched off.
+        """
+        self._preStages = []
+        self._postStages = []
+
+        #Maps stage names to [count, total seconds]; None while disabled
+        self._timings = None
+
+    def addPreStage(self, name, function):
+        """
+        Adds stage to run before each command.
+
+        @precondition:      name not already used by another stage.
+
+        @param name:        Name of stage.
+        @param function:    Function taking (command, arguments).
+        """
+        self._checkName(name)
+        self._preStages.append((name, function))
+
+    def addPostStage(self, name, function):
+        """
+        Adds stage to run after each command.
+
+        @precondition:      name not already used by another stage.
+
+        @param name:        Name of stage.
+        @param function:    Function taking (command, arguments).
+        """
+        self._checkName(name)
+        self._postStages.append((name, function))
+
+    def removeStage(self, name):
+        """
+        Removes a stage by name.
+
+        @precondition:      Stage with name exists.
+
+        @param name:        Name of stage.
+        """
+        for stages in (self._preStages, self._postStages):
+            for stage in stages:
+                if stage[0] == name:
+                    stages.remove(stage)
+                    return
+
+        errorMsg = "Cannot remove '%s' from TurnPipeline; stage not found." % name
+        raise AssertionError(errorMsg)
+
+    def getStageNames(self):
+        """
+        Returns names of all stages, in the order they run.
+        """
+        return [name for name, function in self._preStages + self._postStages]
+
+    def enableTiming(self):
+        """
+        Starts timing stages. Existing timings are kept.
+        """
+        if self._timings is None:
+            self._timings = {}
+
+    def disableTiming(self):
+        """
+        Stops timing stages and discards timings.
+        """
+        self._timings = None
+
+    def isTimingEnabled(self):
+        """
+        Returns True if stages are being timed, False otherwise.
+        """
+        return self._timings is not None
+
+    def getTimings(self):
+        """
+        Returns time spent per stage since timing was enabled.
+        The command itself is reported as EXECUTE_STAGE.
+
+        @return:    Dictionary mapping stage names to
+                    (count, total seconds) tuples.
+        """
+        if self._timings is None:
+            return {}
+
+        timings = {}
+        for name, (count, total) in self._timings.iteritems():
+            timings[name] = (count, total)
+        return timings
+
+    def run(self, command, arguments = None):
+        """
+        Runs pre-turn stages, the command and post-turn stages.
+
+        @param command:     Command to execute.
+        @keyword arguments: (Optional) Arguments for command.
+        """
+        if self._timings is not None:
+            self._runTimed(command, arguments)
+            return
+
+        for name, function in self._preStages:
+            function(command, arguments)
+
+        command.execute(arguments)
+
+        for name, function in self._postStages:
+            function(command, arguments)
+
+    def _runTimed(self, command, arguments):
+        """
+        Same as run(), but records time spent in each stage.
+        """
+        for name, function in self._preStages:
+            start = default_timer()
+            function(command, arguments)
+            self._record(name, default_timer() - start)
+
+        start = default_timer()
+        command.execute(arguments)
+        self._record(EXECUTE_STAGE, default_timer() - start)
+
+        for name, function in self._postStages:
+            start = default_timer()
+            function(command, arguments)
+            self._record(name, default_timer() - start)
+
+    def _record(self, name, elapsed):
+        timing = self._timings.get(name)
+        if timing is None:
+            self._timings[name] = [1, elapsed]
+        else:
+            timing[0] += 1
+            timing[1] += elapsed
+
+    def _checkName(self, name):
+        if name == EXECUTE_STAGE or name in self.getStageNames():
+            errorMsg = "Cannot add '%s' to TurnPipeline; stage name already in use." % name
+            raise AssertionError(errorMsg)
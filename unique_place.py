@@ -19,6 +19,7 @@ class UniquePlace(Place):
         Place.__init__(self, name, description)
     
     def enter(self, player):
-        print "Hello, and welcome to %s" % self._name
+        io = player.getIO()
+        io.output("Hello, and welcome to %s" % self._name)
 
         
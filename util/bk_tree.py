@@ -0,0 +1,92 @@
+#!/usr/bin/python
+
+def editDistance(first, second):
+    """
+    Returns the Levenshtein distance between two strings.
+
+    @param first:   First string.
+    @param second:  Second string.
+    @return:        Minimum number of single-character insertions,
+                    deletions and substitutions turning one into the other.
+    """
+    if len(first) < len(second):
+        first, second = second, first
+
+    previous = range(len(second) + 1)
+    for i, firstChar in enumerate(first):
+        current = [i + 1]
+        for j, secondChar in enumerate(second):
+            cost = previous[j] + (firstChar != secondChar)
+            current.append(min(previous[j + 1] + 1, current[j] + 1, cost))
+        previous = current
+
+    return previous[-1]
+
+class BKTree(object):
+    """
+    Burkhard-Keller tree of strings under edit distance.
+
+    Finds all words within a given distance of a query without comparing
+    the query to every word.
+    """
+    def __init__(self, words = None):
+        """
+        Initializes new tree.
+
+        @keyword words:     (Optional) Words to add.
+        """
+        #Each node is [word, {distance : child node}]
+        self._root = None
+
+        for word in words or []:
+            self.add(word)
+
+    def add(self, word):
+        """
+        Adds word to tree. Adding a word twice has no effect.
+
+        @param word:    Word to add.
+        """
+        if self._root is None:
+            self._root = [word, {}]
+            return
+
+        node = self._root
+        while True:
+            distance = editDistance(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = [word, {}]
+                return
+            node = child
+
+    def search(self, word, maxDistance):
+        """
+        Finds words within maxDistance of word.
+
+        @param word:        Query word.
+        @param maxDistance: Largest edit distance to accept.
+        @return:            List of (distance, word) tuples, closest first.
+        """
+        if self._root is None:
+            return []
+
+        results = []
+        pending = [self._root]
+        while pending:
+            node = pending.pop()
+            distance = editDistance(word, node[0])
+            if distance <= maxDistance:
+                results.append((distance, node[0]))
+
+            #Triangle inequality: only children in this range can match
+            low = distance - maxDistance
+            high = distance + maxDistance
+            for childDistance, child in node[1].iteritems():
+                if low <= childDistance <= high:
+                    pending.append(child)
+
+        results.sort()
+        return results
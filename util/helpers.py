@@ -1,17 +1,71 @@
 #!/usr/bin/python
 
-def generateMenu(prompt, options, appendQuit = False):
-    print prompt
-    print ""
+def generateMenu(io, prompt, options, appendQuit = False):
+    io.output(prompt)
+    io.output()
 
     if appendQuit:
         options.append("Quit")
 
     index = 1
     for option in options:
-        print "%s)\t%s" % (str(index), option) 
+        io.output("%s)\t%s" % (str(index), option))
         index += 1
 
-    choice = raw_input("Choice: ")
+    choice = io.readLine("Choice: ")
 
     return choice
+
+def sameObjects(first, second):
+    """
+    Returns True if two lists (or single objects, or None)
+    refer to the same objects, in order.
+    """
+    if isinstance(first, list) and isinstance(second, list):
+        if len(first) != len(second):
+            return False
+        for one, other in zip(first, second):
+            if one is not other:
+                return False
+        return True
+    return first is second
+
+def splitQuantity(text):
+    """
+    Splits a leading quantity from an item name.
+    (e.g. "3 potion" becomes (3, "potion"), and "potion" becomes (1, "potion"))
+
+    @param text:    Item name, optionally preceded by a number.
+    @return:        Quantity and item name.
+    """
+    words = text.split(None, 1)
+    if len(words) == 2 and words[0].isdigit():
+        return int(words[0]), words[1]
+    return 1, text
+
+def stackLabel(item, count):
+    """
+    Returns an item's name, followed by the size of its stack
+    if there are several. (e.g. "Light Potion of Healing (x3)")
+
+    @param item:    An item.
+    @param count:   Number of items in its stack.
+    @return:        Label for the stack.
+    """
+    if count > 1:
+        return "%s (x%s)" % (item.getName(), count)
+    return item.getName()
+
+def readChoice(io, prompt):
+    """
+    Reads a numbered menu choice.
+
+    @param io:      The player's input/output channel.
+    @param prompt:  Prompt to show.
+    @return:        Number chosen, or None if the input is not a number
+                    (menus treat it as an invalid choice).
+    """
+    try:
+        return int(io.readLine(prompt))
+    except ValueError:
+        return None
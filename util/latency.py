@@ -0,0 +1,158 @@
+#!/usr/bin/python
+
+import math
+
+#Buckets per power of two; each bucket spans about 9% of its value
+SUB_BUCKETS = 8
+
+class LatencyHistogram(object):
+    """
+    Histogram of latencies with logarithmic buckets.
+
+    Recording costs one frexp() and one dictionary update. Percentiles
+    are accurate to the width of a bucket; the maximum is exact.
+    """
+    def __init__(self):
+        """
+        Initializes new, empty histogram.
+        """
+        self._buckets = {}
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+
+    def record(self, seconds):
+        """
+        Records a latency.
+
+        @param seconds:     Latency, in seconds.
+        """
+        self._count += 1
+        self._total += seconds
+        if seconds > self._max:
+            self._max = seconds
+
+        #Bucket by microseconds; everything below 1 us shares bucket 0
+        mantissa, exponent = math.frexp(seconds * 1000000)
+        if exponent > 0:
+            bucket = exponent * SUB_BUCKETS + int((mantissa - .5) * 2 * SUB_BUCKETS)
+        else:
+            bucket = 0
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+
+    def getCount(self):
+        """
+        Returns number of latencies recorded.
+        """
+        return self._count
+
+    def getMean(self):
+        """
+        Returns mean latency, in seconds.
+        """
+        if not self._count:
+            return 0.0
+        return self._total / self._count
+
+    def getMax(self):
+        """
+        Returns largest latency, in seconds.
+        """
+        return self._max
+
+    def getPercentile(self, fraction):
+        """
+        Returns latency below which a given fraction of latencies fall.
+
+        @param fraction:    Fraction between 0 and 1 (e.g. .99 for p99).
+        @return:            Upper bound of the bucket holding the
+                            percentile, in seconds.
+        """
+        if not self._count:
+            return 0.0
+
+        rank = max(int(math.ceil(fraction * self._count)), 1)
+        seen = 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= rank:
+                break
+
+        exponent, sub = divmod(bucket, SUB_BUCKETS)
+        upper = (.5 + (sub + 1) / (2.0 * SUB_BUCKETS)) * 2 ** exponent / 1000000
+        return min(upper, self._max)
+
+class LatencyStats(object):
+    """
+    Latency histograms keyed by name (e.g. command name).
+    """
+    def __init__(self):
+        """
+        Initializes new, empty set of histograms.
+        """
+        self._histograms = {}
+
+    def record(self, name, seconds):
+        """
+        Records a latency.
+
+        @param name:        Name of histogram.
+        @param seconds:     Latency, in seconds.
+        """
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = LatencyHistogram()
+            self._histograms[name] = histogram
+        histogram.record(seconds)
+
+    def getHistogram(self, name):
+        """
+        Returns histogram by name.
+
+        @param name:        Name of histogram.
+        @return:            LatencyHistogram, or None if nothing recorded.
+        """
+        return self._histograms.get(name)
+
+    def getNames(self):
+        """
+        Returns sorted list of histogram names.
+        """
+        names = self._histograms.keys()
+        names.sort()
+
+        return names
+
+    def reset(self):
+        """
+        Discards all histograms.
+        """
+        self._histograms = {}
+
+    def getReport(self):
+        """
+        Returns a table of counts and latencies, in milliseconds.
+
+        @return:    Report, as a list of lines.
+        """
+        lines = ["%-16s%8s%10s%10s%10s%10s" % ("Command", "Count", "p50", "p95", "p99", "max")]
+        for name in self.getNames():
+            histogram = self._histograms[name]
+            lines.append("%-16s%8s%10.3f%10.3f%10.3f%10.3f" % (name, histogram.getCount(),
+                histogram.getPercentile(.50) * 1000, histogram.getPercentile(.95) * 1000,
+                histogram.getPercentile(.99) * 1000, histogram.getMax() * 1000))
+
+        return lines
+
+    def writeReport(self, filename):
+        """
+        Writes report to a file, replacing its contents.
+
+        @param filename:    Name of file.
+        """
+        with open(filename, "w") as report:
+            report.write("\n".join(self.getReport()))
+            report.write("\n")
+
+#Latencies of commands executed in this process
+commandLatency = LatencyStats()
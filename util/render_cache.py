@@ -0,0 +1,87 @@
+#!/usr/bin/python
+
+import weakref
+from collections import OrderedDict
+
+#Every RenderCache, so that blocks of an owner can be dropped from all
+_caches = weakref.WeakSet()
+
+def discard(owner):
+    """
+    Drops owner's blocks from every RenderCache, e.g. when the
+    owner's state is paged out of memory.
+
+    @param owner:   Object the blocks describe.
+    """
+    for cache in list(_caches):
+        cache.discard(owner)
+
+class RenderCache(object):
+    """
+    Caches blocks of output text.
+
+    Each block belongs to an owner object (e.g. a Space) and is rendered
+    again only when the owner's version changes. Blocks are stored as a
+    single pre-joined string, ready to be sent with one GameIO.output().
+    Entries disappear when their owner is garbage collected. With a
+    maximum size, the least recently used entries are removed beyond it.
+    """
+    def __init__(self, maxSize = None):
+        """
+        Initializes new, empty cache.
+
+        @keyword maxSize:   (Optional) Maximum number of blocks kept.
+                            By default, the cache is unbounded.
+        """
+        if maxSize is not None and maxSize < 1:
+            errorMsg = "RenderCache size must be at least 1; got %s." % maxSize
+            raise AssertionError(errorMsg)
+        self._entries = weakref.WeakKeyDictionary()
+        self._maxSize = maxSize
+
+        #Maps id of owner to weak reference to owner, least recently
+        #used first; only kept when bounded
+        self._order = OrderedDict()
+        _caches.add(self)
+
+    def render(self, owner, version, renderer):
+        """
+        Returns owner's text block, rendering it if out of date.
+
+        @param owner:       Object the text describes.
+        @param version:     Owner's current version. Any value that
+                            changes whenever the text would change.
+        @param renderer:    Function returning the block as a list of lines.
+        @return:            Lines joined by newlines.
+        """
+        entry = self._entries.get(owner)
+        if self._maxSize is not None:
+            self._order.pop(id(owner), None)
+            self._order[id(owner)] = weakref.ref(owner)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+
+        text = "\n".join(renderer())
+        self._entries[owner] = (version, text)
+        if self._maxSize is not None:
+            while len(self._order) > self._maxSize:
+                oldest = self._order.popitem(last = False)[1]()
+                if oldest is not None:
+                    self._entries.pop(oldest, None)
+        return text
+
+    def discard(self, owner):
+        """
+        Drops owner's block, if cached.
+
+        @param owner:   Object the block describes.
+        """
+        self._entries.pop(owner, None)
+        self._order.pop(id(owner), None)
+
+    def clear(self):
+        """
+        Removes all cached blocks.
+        """
+        self._entries.clear()
+        self._order.clear()
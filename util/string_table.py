@@ -0,0 +1,73 @@
+#!/usr/bin/python
+
+import sys
+import textwrap
+
+def normalizeText(text):
+    """
+    Normalizes whitespace in a text.
+
+    Texts in data files are often indented triple-quoted blocks. The
+    common indentation of their lines is removed, as are blank lines at
+    either end and whitespace at the end of each line.
+
+    @param text:    String.
+    @return:        Normalized string.
+    """
+    if "\n" not in text:
+        return text.strip()
+    lines = textwrap.dedent(text).strip().split("\n")
+    return "\n".join(line.rstrip() for line in lines)
+
+class StringTable(object):
+    """
+    Keeps a single copy of each distinct text.
+
+    Texts are normalized (see normalizeText()) before they are looked up,
+    so texts that only differ in indentation share one copy.
+    """
+    def __init__(self):
+        """
+        Initializes new, empty table.
+        """
+        self._texts = {}
+
+    def intern(self, text):
+        """
+        Returns the table's copy of a text, adding it if new.
+
+        @param text:    String. Anything else is returned as it is.
+        @return:        Normalized string, shared by all equal texts.
+        """
+        if not isinstance(text, basestring):
+            return text
+        text = normalizeText(text)
+        return self._texts.setdefault(text, text)
+
+    def internData(self, value):
+        """
+        Interns every string in data loaded from a data file, including
+        dictionary keys.
+
+        @param value:   String, list, dictionary or other value.
+        @return:        Value with strings interned.
+        """
+        if isinstance(value, basestring):
+            return self.intern(value)
+        if isinstance(value, list):
+            return [self.internData(item) for item in value]
+        if isinstance(value, dict):
+            return dict((self.intern(key), self.internData(item)) for key, item in value.iteritems())
+        return value
+
+    def getTextCount(self):
+        """
+        Returns number of distinct texts in the table.
+        """
+        return len(self._texts)
+
+    def getSize(self):
+        """
+        Returns memory used by the texts (in bytes), not counting the table.
+        """
+        return sum(sys.getsizeof(text) for text in self._texts)
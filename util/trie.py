@@ -0,0 +1,117 @@
+#!/usr/bin/python
+
+class _Node(object):
+    """
+    A single node of a Trie.
+    """
+    __slots__ = ("children", "value")
+
+    def __init__(self):
+        self.children = {}
+        self.value = None
+
+class Trie(object):
+    """
+    Prefix tree mapping string keys to values.
+
+    Lookups cost O(length of key), independent of the number of keys.
+    None cannot be stored as a value.
+    """
+    def __init__(self):
+        """
+        Initializes new, empty trie.
+        """
+        self._root = _Node()
+
+    def add(self, key, value):
+        """
+        Adds key to trie, replacing any existing value.
+
+        @param key:     String key.
+        @param value:   Value for key.
+        """
+        if value is None:
+            errorMsg = "Cannot store None in Trie."
+            raise AssertionError(errorMsg)
+
+        node = self._root
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                child = _Node()
+                node.children[char] = child
+            node = child
+        node.value = value
+
+    def remove(self, key):
+        """
+        Removes key from trie. Nodes that no longer lead to a key are pruned.
+
+        @precondition:  get(key) is not None
+
+        @param key:     String key.
+        """
+        path = []
+        node = self._root
+        for char in key:
+            path.append((node, char))
+            node = node.children.get(char)
+            if node is None:
+                break
+
+        if node is None or node.value is None:
+            errorMsg = "Cannot remove '%s' from Trie; key not found." % key
+            raise AssertionError(errorMsg)
+        node.value = None
+
+        #Prune branches that are now empty
+        for parent, char in reversed(path):
+            child = parent.children[char]
+            if child.value is not None or child.children:
+                break
+            del parent.children[char]
+
+    def get(self, key):
+        """
+        Returns value for exact key.
+
+        @param key:     String key.
+        @return:        Value, or None if key not found.
+        """
+        node = self._find(key)
+        if node is None:
+            return None
+        return node.value
+
+    def resolve(self, prefix):
+        """
+        Returns value for prefix if it identifies a single key.
+
+        An exact key always wins. Otherwise the prefix is extended while
+        there is only one way to continue it, and resolves to the first
+        key reached (so 'eq' resolves to 'equip' even when 'equipment'
+        also exists, while 'equipm' resolves to 'equipment').
+
+        @param prefix:  String prefix.
+        @return:        Value, or None if prefix is unknown or ambiguous.
+        """
+        node = self._find(prefix)
+        if node is None or not prefix:
+            return None
+
+        while node.value is None:
+            if len(node.children) != 1:
+                return None
+            node = node.children.itervalues().next()
+        return node.value
+
+    def _find(self, key):
+        """
+        Returns node reached by following key, or None.
+        """
+        node = self._root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
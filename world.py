@@ -0,0 +1,324 @@
+#!/usr/bin/python
+
+import re
+from space_graph import SpaceGraph
+from pathfinder import Pathfinder
+
+#Kinds of objects a World indexes
+SPACE = "space"
+CITY = "city"
+BUILDING = "building"
+UNIQUE_PLACE = "unique place"
+
+def normalizeName(name):
+    """
+    Normalizes a name for lookup: lowercase, punctuation removed and
+    whitespace collapsed. (e.g. "Helm's  Deep" becomes "helms deep")
+
+    @param name:    Name to normalize.
+    @return:        Normalized name.
+    """
+    return " ".join(re.sub(r"[^a-z0-9\s]", "", name.lower()).split())
+
+class World(object):
+    """
+    Registry of every space, city, building and unique place in a world.
+
+    Each object is registered under an id that is unique among objects
+    of its kind, and is indexed by its normalized name. Lookups by id
+    and by name take constant time. The world's spaces keep their exits
+    in the world's SpaceGraph.
+    """
+    def __init__(self):
+        """
+        Initializes new, empty world.
+        """
+        self._graph = SpaceGraph()
+
+        #Maps kind to {id : object}
+        self._byId = {SPACE : {}, CITY : {}, BUILDING : {}, UNIQUE_PLACE : {}}
+
+        #Maps kind to {normalized name : object or list of objects}
+        self._byName = {SPACE : {}, CITY : {}, BUILDING : {}, UNIQUE_PLACE : {}}
+
+        #Maps objects to (kind, id, normalized name)
+        self._ids = {}
+
+        self._start = None
+
+        #Created on first use
+        self._pathfinder = None
+
+    def getGraph(self):
+        """
+        Returns the SpaceGraph to create this world's spaces in.
+        """
+        return self._graph
+
+    def getPathfinder(self):
+        """
+        Returns the Pathfinder for this world's spaces.
+        """
+        if self._pathfinder is None:
+            self._pathfinder = Pathfinder(self._graph)
+        return self._pathfinder
+
+    def addSpace(self, spaceId, space):
+        """
+        Registers a space.
+
+        @precondition:      No other space registered under spaceId.
+
+        @param spaceId:     Unique id of space.
+        @param space:       Space object.
+        """
+        self._register(SPACE, spaceId, space)
+
+    def addCity(self, cityId, city):
+        """
+        Registers a city.
+
+        @precondition:      No other city registered under cityId.
+
+        @param cityId:      Unique id of city.
+        @param city:        City object.
+        """
+        self._register(CITY, cityId, city)
+
+    def addBuilding(self, buildingId, building):
+        """
+        Registers a building.
+
+        @precondition:      No other building registered under buildingId.
+
+        @param buildingId:  Unique id of building.
+        @param building:    Building object.
+        """
+        self._register(BUILDING, buildingId, building)
+
+    def addUniquePlace(self, uniquePlaceId, uniquePlace):
+        """
+        Registers a unique place.
+
+        @precondition:          No other unique place registered under uniquePlaceId.
+
+        @param uniquePlaceId:   Unique id of unique place.
+        @param uniquePlace:     UniquePlace object.
+        """
+        self._register(UNIQUE_PLACE, uniquePlaceId, uniquePlace)
+
+    def setStart(self, spaceId):
+        """
+        Sets the space new players start in.
+
+        @precondition:      Space registered under spaceId.
+
+        @param spaceId:     Id of starting space.
+        """
+        if spaceId not in self._byId[SPACE]:
+            errorMsg = "Cannot start World in '%s'; space not found." % spaceId
+            raise AssertionError(errorMsg)
+        self._start = self._byId[SPACE][spaceId]
+
+    def getStart(self):
+        """
+        Returns the space new players start in (None if not set).
+        """
+        return self._start
+
+    def getSpace(self, spaceId):
+        """
+        Returns space by id, or None if there is no such space.
+        """
+        return self._byId[SPACE].get(spaceId)
+
+    def getCity(self, cityId):
+        """
+        Returns city by id, or None if there is no such city.
+        """
+        return self._byId[CITY].get(cityId)
+
+    def getBuilding(self, buildingId):
+        """
+        Returns building by id, or None if there is no such building.
+        """
+        return self._byId[BUILDING].get(buildingId)
+
+    def getUniquePlace(self, uniquePlaceId):
+        """
+        Returns unique place by id, or None if there is no such place.
+        """
+        return self._byId[UNIQUE_PLACE].get(uniquePlaceId)
+
+    def findSpaces(self, name):
+        """
+        Returns spaces with a given name. Names are compared
+        after normalizing (see normalizeName()).
+
+        @param name:    Name of space.
+        @return:        List of spaces; empty if none found.
+        """
+        return self._find(SPACE, name)
+
+    def findCities(self, name):
+        """
+        Returns cities with a given (normalized) name, as a list.
+        """
+        return self._find(CITY, name)
+
+    def findBuildings(self, name):
+        """
+        Returns buildings with a given (normalized) name, as a list.
+        """
+        return self._find(BUILDING, name)
+
+    def findUniquePlaces(self, name):
+        """
+        Returns unique places with a given (normalized) name, as a list.
+        """
+        return self._find(UNIQUE_PLACE, name)
+
+    def getId(self, place):
+        """
+        Returns the id a space, city, building or unique place
+        is registered under.
+
+        @param place:   Registered object.
+        @return:        Its id, or None if not registered.
+        """
+        entry = self._ids.get(place)
+        if entry is None:
+            return None
+        return entry[1]
+
+    def removeSpace(self, spaceId):
+        """
+        Unregisters a space. Its exits are left alone.
+
+        @precondition:      Space registered under spaceId.
+
+        @param spaceId:     Id of space.
+        """
+        self._unregister(SPACE, spaceId)
+
+    def removeCity(self, cityId):
+        """
+        Unregisters a city.
+
+        @precondition:      City registered under cityId.
+        """
+        self._unregister(CITY, cityId)
+
+    def removeBuilding(self, buildingId):
+        """
+        Unregisters a building.
+
+        @precondition:      Building registered under buildingId.
+        """
+        self._unregister(BUILDING, buildingId)
+
+    def removeUniquePlace(self, uniquePlaceId):
+        """
+        Unregisters a unique place.
+
+        @precondition:      Unique place registered under uniquePlaceId.
+        """
+        self._unregister(UNIQUE_PLACE, uniquePlaceId)
+
+    def reindex(self, place):
+        """
+        Updates the name index after a registered object was renamed.
+
+        @param place:   Registered object.
+        """
+        kind, placeId, name = self._ids[place]
+        self._unindexName(kind, name, place)
+        name = normalizeName(place.getName())
+        self._ids[place] = (kind, placeId, name)
+        self._indexName(kind, name, place)
+
+    def getSpaceIds(self):
+        """
+        Returns ids of all spaces, in no particular order.
+        """
+        return self._byId[SPACE].keys()
+
+    def getCityIds(self):
+        """
+        Returns ids of all cities, in no particular order.
+        """
+        return self._byId[CITY].keys()
+
+    def getBuildingIds(self):
+        """
+        Returns ids of all buildings, in no particular order.
+        """
+        return self._byId[BUILDING].keys()
+
+    def getUniquePlaceIds(self):
+        """
+        Returns ids of all unique places, in no particular order.
+        """
+        return self._byId[UNIQUE_PLACE].keys()
+
+    def getSpaces(self):
+        """
+        Returns list of all spaces, in no particular order.
+        """
+        return self._byId[SPACE].values()
+
+    def getSpaceCount(self):
+        """
+        Returns number of spaces.
+        """
+        return len(self._byId[SPACE])
+
+    def _register(self, kind, placeId, place):
+        byId = self._byId[kind]
+        if placeId in byId:
+            errorMsg = "Cannot add %s '%s' to World; id already in use." % (kind, placeId)
+            raise AssertionError(errorMsg)
+        name = normalizeName(place.getName())
+        byId[placeId] = place
+        self._ids[place] = (kind, placeId, name)
+        self._indexName(kind, name, place)
+
+    def _unregister(self, kind, placeId):
+        byId = self._byId[kind]
+        if placeId not in byId:
+            errorMsg = "Cannot remove %s '%s' from World; id not found." % (kind, placeId)
+            raise AssertionError(errorMsg)
+        place = byId.pop(placeId)
+        name = self._ids.pop(place)[2]
+        self._unindexName(kind, name, place)
+        if self._start is place:
+            self._start = None
+
+    def _indexName(self, kind, name, place):
+        #Names are nearly always unique; only store a list when they are not
+        byName = self._byName[kind]
+        other = byName.get(name)
+        if other is None:
+            byName[name] = place
+        elif isinstance(other, list):
+            other.append(place)
+        else:
+            byName[name] = [other, place]
+
+    def _unindexName(self, kind, name, place):
+        byName = self._byName[kind]
+        other = byName[name]
+        if isinstance(other, list):
+            other.remove(place)
+            if len(other) == 1:
+                byName[name] = other[0]
+        else:
+            del byName[name]
+
+    def _find(self, kind, name):
+        found = self._byName[kind].get(normalizeName(name))
+        if found is None:
+            return []
+        if isinstance(found, list):
+            return list(found)
+        return [found]
@@ -0,0 +1,163 @@
+#!/usr/bin/python
+
+"""
+Patches a live world to match a newer version of it.
+
+The newer world is built on the side (e.g. by game_loader.getWorld()),
+then compared with the live world id by id. Spaces, cities, buildings
+and unique places that still exist are updated in place, so players,
+commands and open menus keep valid references. Items on the ground
+and shop stock are kept.
+"""
+
+from space import Space
+from space_graph import DIRECTIONS
+from world import CITY, BUILDING, UNIQUE_PLACE
+
+#World methods for each kind of place, in the order places are patched;
+#cities refer to buildings, so buildings come first
+_PLACE_METHODS = [
+    (BUILDING, "getBuildingIds", "getBuilding", "addBuilding", "removeBuilding"),
+    (CITY, "getCityIds", "getCity", "addCity", "removeCity"),
+    (UNIQUE_PLACE, "getUniquePlaceIds", "getUniquePlace", "addUniquePlace", "removeUniquePlace"),
+    ]
+
+def patchWorld(world, updated, players = None):
+    """
+    Patches world to match updated.
+
+    Objects of updated that have no live counterpart (or whose class
+    changed) are moved into world as they are. Spaces that no longer
+    exist are cut off from the rest of the world; players in them are
+    moved to the starting space.
+
+    @param world:       The live World.
+    @param updated:     World built from newer data. It must not be
+                        used afterwards.
+    @keyword players:   (Optional) Players in world.
+    @return:            List of changes made (strings).
+    """
+    changes = []
+
+    #Maps objects of updated to the live objects that replace them
+    patched = {}
+
+    #Live places whose names changed
+    renamed = set()
+
+    def mapPlaces(places):
+        #A space may hold a single place or a list of places
+        if places is None:
+            return None
+        if isinstance(places, list):
+            return [patched[place] for place in places]
+        return patched[places]
+
+    def patch(live, new, kind, placeId):
+        name = live.getName()
+        if live.update(new):
+            changes.append("Updated %s '%s'." % (kind, placeId))
+        if live.getName() != name:
+            world.reindex(live)
+            renamed.add(live)
+        patched[new] = live
+
+    #Cities, buildings and unique places
+    for kind, getIds, get, add, remove in _PLACE_METHODS:
+        for placeId in getattr(updated, getIds)():
+            new = getattr(updated, get)(placeId)
+            if kind == CITY:
+                new.setBuildings(mapPlaces(new.getBuildings()))
+
+            live = getattr(world, get)(placeId)
+            if live is not None and type(live) is type(new):
+                patch(live, new, kind, placeId)
+                continue
+
+            if live is None:
+                changes.append("Added %s '%s'." % (kind, placeId))
+            else:
+                changes.append("Replaced %s '%s'." % (kind, placeId))
+                getattr(world, remove)(placeId)
+            getattr(world, add)(placeId, new)
+            patched[new] = new
+
+        for placeId in getattr(world, getIds)():
+            if getattr(updated, get)(placeId) is None:
+                changes.append("Removed %s '%s'." % (kind, placeId))
+                getattr(world, remove)(placeId)
+
+    #Spaces
+    for spaceId in updated.getSpaceIds():
+        new = updated.getSpace(spaceId)
+        city = mapPlaces(new.getCity())
+        uniquePlace = mapPlaces(new.getUniquePlace())
+
+        live = world.getSpace(spaceId)
+        if live is None:
+            live = Space(new.getName(), new.getDescription(), city = city, uniquePlaces = uniquePlace,
+                         graph = world.getGraph())
+            world.addSpace(spaceId, live)
+            changes.append("Added space '%s'." % spaceId)
+            patched[new] = live
+            continue
+
+        new.setCity(city)
+        new.setUniquePlace(uniquePlace)
+        patch(live, new, "space", spaceId)
+
+        #Descriptions show the names of places in a space
+        for place in _toList(city) + _toList(uniquePlace):
+            if place in renamed:
+                live.touch()
+                break
+
+    removed = set()
+    for spaceId in world.getSpaceIds():
+        if updated.getSpace(spaceId) is None:
+            space = world.getSpace(spaceId)
+            for direction in DIRECTIONS:
+                space.clearExit(direction, True)
+            world.removeSpace(spaceId)
+            removed.add(space)
+            changes.append("Removed space '%s'." % spaceId)
+
+    #Exits; each is set one way, as the updated world has both ways
+    for spaceId in updated.getSpaceIds():
+        new = updated.getSpace(spaceId)
+        live = patched[new]
+        changed = False
+        for direction in DIRECTIONS:
+            target = new.getExit(direction)
+            if target is not None:
+                target = patched[target]
+            if live.getExit(direction) is target:
+                continue
+            changed = True
+            if target is None:
+                live.clearExit(direction, True)
+            else:
+                live.createExit(direction, target, outgoingOnly = True)
+        if changed:
+            changes.append("Changed exits of space '%s'." % spaceId)
+
+    world.setStart(updated.getId(updated.getStart()))
+
+    for player in players or []:
+        if player.getLocation() in removed:
+            player.setLocation(world.getStart())
+            player.getIO().output("The land around you fades away. You find yourself in %s." % \
+                    world.getStart().getName())
+            changes.append("Moved %s to '%s'." % (player.getName(), world.getStart().getName()))
+
+    return changes
+
+def _toList(places):
+    """
+    Returns places as a list; a space may hold one place or a list.
+    """
+    if places is None:
+        return []
+    if isinstance(places, list):
+        return places
+    return [places]
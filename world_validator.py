@@ -0,0 +1,233 @@
+#!/usr/bin/python
+
+"""
+Checks worlds for defects.
+
+validateWorldData() checks the data a world is built from (see
+game_loader.buildWorld()), and validateWorld() checks an already
+linked Space graph, such as a generated world. Both run in time
+proportional to the number of spaces plus the number of exits.
+
+Usage:
+    python world_validator.py [data/world.json]
+"""
+
+import argparse
+import json
+from collections import OrderedDict
+
+from constants import Direction
+from space import Space
+from cities.city import City
+from cities.building import Building
+from unique_place import UniquePlace
+
+DIRECTIONS = [Direction.NORTH, Direction.SOUTH, Direction.EAST, Direction.WEST]
+OPPOSITES = {Direction.NORTH : Direction.SOUTH, Direction.SOUTH : Direction.NORTH,
+             Direction.EAST : Direction.WEST, Direction.WEST : Direction.EAST}
+
+def validateWorldData(data):
+    """
+    Checks world data for defects.
+
+    Reports duplicate ids and space names, exits that overwrite earlier
+    exits, exits that only work one way, spaces that cannot be reached
+    from the start, references to undefined ids and places that nothing
+    refers to.
+
+    @param data:    World data, as passed to game_loader.buildWorld().
+    @return:        List of problems (strings). Empty if none were found.
+    """
+    problems = []
+    cities = data.get("cities", {})
+    buildings = data.get("buildings", {})
+    uniquePlaces = data.get("uniquePlaces", {})
+
+    #Spaces: duplicate ids and names
+    spaceIds = set()
+    namesSeen = {}
+    for space in data.get("spaces", []):
+        spaceId = space.get("id")
+        if spaceId in spaceIds:
+            problems.append("Space id '%s' is defined more than once." % spaceId)
+        spaceIds.add(spaceId)
+
+        name = space.get("name")
+        if name in namesSeen:
+            problems.append("Spaces '%s' and '%s' are both named '%s'." % (namesSeen[name], spaceId, name))
+        else:
+            namesSeen[name] = spaceId
+
+    if data.get("start") not in spaceIds:
+        problems.append("Start space '%s' is not defined." % data.get("start"))
+
+    #References from spaces and cities
+    usedCities = set()
+    usedBuildings = set()
+    usedUniquePlaces = set()
+    for space in data.get("spaces", []):
+        for cityId in _getIds(space.get("city")):
+            usedCities.add(cityId)
+            if cityId not in cities:
+                problems.append("Space '%s' refers to undefined city '%s'." % (space.get("id"), cityId))
+        for uniquePlaceId in _getIds(space.get("uniquePlaces")):
+            usedUniquePlaces.add(uniquePlaceId)
+            if uniquePlaceId not in uniquePlaces:
+                problems.append("Space '%s' refers to undefined unique place '%s'." % \
+                        (space.get("id"), uniquePlaceId))
+
+    for cityId, city in cities.iteritems():
+        for buildingId in city.get("buildings") or []:
+            if cityId in usedCities:
+                usedBuildings.add(buildingId)
+            if buildingId not in buildings:
+                problems.append("City '%s' refers to undefined building '%s'." % (cityId, buildingId))
+
+    for kind, table, used in [("City", cities, usedCities), ("Building", buildings, usedBuildings),
+                              ("Unique place", uniquePlaces, usedUniquePlaces)]:
+        for placeId in sorted(table):
+            if placeId not in used:
+                problems.append("%s '%s' is defined but not placed in the world." % (kind, placeId))
+
+    #Exits: replay them as Space.createExit() would; kept in the order
+    #first set, so problems are reported in data order without sorting
+    exits = OrderedDict()
+    for exit in data.get("exits", []):
+        fromId, direction, toId = exit[:3]
+        outgoingOnly = len(exit) > 3 and exit[3]
+
+        if direction not in OPPOSITES:
+            problems.append("Exit from '%s' has invalid direction '%s'." % (fromId, direction))
+            continue
+        undefined = [spaceId for spaceId in (fromId, toId) if spaceId not in spaceIds]
+        for spaceId in undefined:
+            problems.append("Exit %s %s %s refers to undefined space '%s'." % (fromId, direction, toId, spaceId))
+        if undefined:
+            continue
+
+        slots = [(fromId, direction, toId)]
+        if not outgoingOnly:
+            slots.append((toId, OPPOSITES[direction], fromId))
+        for spaceId, slotDirection, target in slots:
+            previous = exits.get((spaceId, slotDirection))
+            if previous is not None and previous != target:
+                problems.append("Exit %s of '%s' to '%s' is overwritten by exit to '%s'." % \
+                        (slotDirection, spaceId, previous, target))
+            exits[(spaceId, slotDirection)] = target
+
+    #Exits that do not lead back
+    adjacency = {}
+    for (spaceId, direction), target in exits.iteritems():
+        adjacency.setdefault(spaceId, []).append(target)
+        if exits.get((target, OPPOSITES[direction])) != spaceId:
+            problems.append("Exit %s of '%s' to '%s' has no exit back." % (direction, spaceId, target))
+
+    #Reachability from start
+    start = data.get("start")
+    if start in spaceIds:
+        reached = set([start])
+        pending = [start]
+        while pending:
+            for target in adjacency.get(pending.pop(), []):
+                if target not in reached:
+                    reached.add(target)
+                    pending.append(target)
+        for space in data.get("spaces", []):
+            if space.get("id") not in reached:
+                problems.append("Space '%s' cannot be reached from '%s'." % (space.get("id"), start))
+
+    return problems
+
+def validateWorld(start, spaces = None):
+    """
+    Checks a linked world for defects.
+
+    Reports duplicate space names, exits that only work one way and
+    references to objects of the wrong type. If all spaces are given,
+    also reports spaces that cannot be reached from start.
+
+    @param start:       The starting space.
+    @keyword spaces:    (Optional) Every space in the world.
+    @return:            List of problems (strings). Empty if none were found.
+    """
+    problems = []
+    namesSeen = {}
+    directionPairs = OPPOSITES.items()
+
+    reached = set([id(start)])
+    pending = [start]
+    while pending:
+        space = pending.pop()
+
+        name = space.getName()
+        if name in namesSeen:
+            problems.append("More than one space is named '%s'." % name)
+        else:
+            namesSeen[name] = space
+
+        city = space.getCity()
+        if city is not None:
+            problems.extend(_checkCity(name, city))
+        uniquePlace = space.getUniquePlace()
+        if uniquePlace is not None:
+            for place in _getIds(uniquePlace):
+                if not isinstance(place, UniquePlace):
+                    problems.append("Space '%s' refers to %r as a unique place." % (name, place))
+
+        for direction, opposite in directionPairs:
+            other = space.getExit(direction)
+            if other is None:
+                continue
+            if not isinstance(other, Space):
+                problems.append("Exit %s of '%s' refers to %r." % (direction, name, other))
+                continue
+            if other.getExit(opposite) is not space:
+                problems.append("Exit %s of '%s' to '%s' has no exit back." % (direction, name, other.getName()))
+            if id(other) not in reached:
+                reached.add(id(other))
+                pending.append(other)
+
+    for space in spaces or []:
+        if id(space) not in reached:
+            problems.append("Space '%s' cannot be reached from '%s'." % (space.getName(), start.getName()))
+
+    return problems
+
+def _checkCity(spaceName, city):
+    """
+    Returns problems with a space's city (or list of cities).
+    """
+    problems = []
+    for place in _getIds(city):
+        if not isinstance(place, City):
+            problems.append("Space '%s' refers to %r as its city." % (spaceName, place))
+            continue
+        for building in _getIds(place.getBuildings()):
+            if not isinstance(building, Building):
+                problems.append("City '%s' refers to %r as a building." % (place.getName(), building))
+    return problems
+
+def _getIds(value):
+    """
+    Returns value as a list; a space may refer to one place or a list.
+    """
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+if __name__ == '__main__':
+    import os
+    import constants
+
+    argParser = argparse.ArgumentParser(description="Checks a world data file for defects.")
+    argParser.add_argument("file", nargs="?",
+            default=os.path.join(os.path.dirname(os.path.abspath(__file__)), constants.WORLD_FILE))
+    args = argParser.parse_args()
+
+    with open(args.file) as dataFile:
+        problems = validateWorldData(json.load(dataFile))
+    for problem in problems:
+        print problem
+    print "%s problem(s) found." % len(problems)